@@ -40,6 +40,25 @@ LICENSE="https://wordnetcode.princeton.edu/${VER}/LICENSE"
 ILIMAP="${CILIDIR}/older-wn-mappings/ili-map-pwn${SHORTVER}.tab"
 ENTRY_INDEX="all"  # all | partial | none
 
+# Space-separated sidecar artifacts to write next to each lexicon; see
+# scripts/sidecars.py for the options (e.g., SIDECARS="hypernyms")
+SIDECAR_ARGS=()
+for SIDECAR in ${SIDECARS:-}; do
+    SIDECAR_ARGS+=("--sidecar=${SIDECAR}")
+done
+
+# Set SUBSET=core to only include the core synsets (etc/wn-core-ili.tab);
+# this is built separately from the full release (see scripts/build.py)
+SUBSET_ARGS=()
+if [ "${SUBSET:-}" = "core" ]; then
+    BLDDIR="${BLDDIR}-core"
+    OMWVER="${OMWVER}+core"
+    SUBSET_ARGS+=("--subset-ili=etc/wn-core-ili.tab")
+elif [ -n "${SUBSET:-}" ]; then
+    echo "Invalid subset: ${SUBSET}"
+    exit 1
+fi
+
 
 # Data Preparation #####################################################
 
@@ -215,7 +234,9 @@ python -m scripts.wndb2lmf \
        --url="${URL}" \
        --citation="${CITATION}" \
        --ili-map="${ILIMAP}" \
-       --entry-indexes="${ENTRY_INDEX}"
+       --entry-indexes="${ENTRY_INDEX}" \
+       "${SUBSET_ARGS[@]}" \
+       "${SIDECAR_ARGS[@]}"
 
 # below: cat instead of cp to reset permissions
 cat "${WNDIR}/LICENSE" > "${BLDDIR}/${WNID}/LICENSE"
@@ -18,7 +18,8 @@ fi
 
 OMWVER="$1"
 
-BUILD="build/omw-${OMWVER}"
+# SUBSET (e.g., SUBSET=core) and SIDECARS are also read by build-en.sh
+BUILD="build/omw-${OMWVER}${SUBSET:+-${SUBSET}}"
 mkdir -p "${BUILD}"
 
 # Princeton WordNet ####################################################
@@ -34,4 +35,17 @@ mkdir -p "${BUILD}"
 
 # Other OMW Lexicons ###################################################
 
-python -m scripts.build --version="${OMWVER}"
+SIDECAR_ARGS=()
+for SIDECAR in ${SIDECARS:-}; do
+    SIDECAR_ARGS+=("--sidecar=${SIDECAR}")
+done
+
+python -m scripts.build --version="${OMWVER}" ${SUBSET:+--subset="${SUBSET}"} \
+       "${SIDECAR_ARGS[@]}"
+
+# Release Artifacts ####################################################
+
+# combine the per-package columnar tables into one file per table
+if [[ " ${SIDECARS:-} " == *" columnar "* ]]; then
+    python -m scripts.columnar "${BUILD}" "${BUILD}"
+fi
@@ -0,0 +1,135 @@
+"""
+Compressed sparse row (CSR) export of a lexicon's relation graphs.
+
+The synset graph (synset relations) and the sense graph (sense
+relations) are each stored as:
+
+- `<graph>_ids_offsets`, `<graph>_ids_data`: the sorted node IDs (see
+  :class:`scripts.arrays.StringArray`)
+- `<graph>_indptr`: the start of each node's edges in the arrays
+  below, with one more item than there are nodes
+- `<graph>_indices`: the target node of each edge
+- `<graph>_reltypes`: the relation type code of each edge
+
+Relation type codes index the `reltypes` string array, which lists
+the relation types of :data:`scripts.wndb.POINTER_MAP` in order
+followed by any others used by the lexicon. The arrays returned by
+:func:`scripts.arrays.load` can be wrapped without copying by
+`numpy.asarray()` or used to build a `scipy.sparse.csr_matrix`.
+"""
+
+import array
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+from wn.lmf import Lexicon, Relation
+
+from . import arrays, wndb
+from .util import PathLike
+
+log = logging.getLogger("adjacency")
+
+RELATION_TYPES = list(dict.fromkeys(wndb.POINTER_MAP.values()))
+
+
+def write_graph(lexicon: Lexicon, directory: Path) -> None:
+    """Write the relation graphs of *lexicon* into *directory*."""
+    path = directory / f"{lexicon['id']}.graph.npz"
+    arrays.save(path, build_graph(lexicon))
+
+
+def build_graph(lexicon: Lexicon) -> dict[str, arrays.Array]:
+    synsets = lexicon.get("synsets", [])
+    senses = [s for e in lexicon.get("entries", []) for s in e.get("senses", [])]
+    reltypes = list(RELATION_TYPES)
+    reltypes.extend(sorted(
+        {
+            rel["relType"]
+            for obj in (*synsets, *senses)
+            for rel in obj.get("relations", [])
+        }.difference(reltypes)
+    ))
+    codes = {reltype: code for code, reltype in enumerate(reltypes)}
+
+    reltype_offsets, reltype_data = arrays.encode_strings(reltypes)
+    result: dict[str, arrays.Array] = {
+        "reltypes_offsets": reltype_offsets,
+        "reltypes_data": reltype_data,
+    }
+    for name, nodes in (("synset", synsets), ("sense", senses)):
+        ids, indptr, indices, types = _csr(
+            ((node["id"], node.get("relations", [])) for node in nodes), codes
+        )
+        ids_offsets, ids_data = arrays.encode_strings(ids)
+        result.update({
+            f"{name}_ids_offsets": ids_offsets,
+            f"{name}_ids_data": ids_data,
+            f"{name}_indptr": indptr,
+            f"{name}_indices": indices,
+            f"{name}_reltypes": types,
+        })
+    return result
+
+
+def _csr(
+    nodes: Iterable[tuple[str, list[Relation]]],
+    codes: dict[str, int],
+) -> tuple[list[str], array.array, array.array, array.array]:
+    adjacency = dict(sorted(nodes, key=lambda node: node[0]))
+    index = {node_id: i for i, node_id in enumerate(adjacency)}
+    indptr = array.array("q", [0])
+    indices = array.array("i")
+    types = array.array("B" if len(codes) <= 256 else "H")
+    missing = 0
+    for relations in adjacency.values():
+        for rel in relations:
+            target = index.get(rel["target"])
+            if target is None:
+                missing += 1
+                continue
+            indices.append(target)
+            types.append(codes[rel["relType"]])
+        indptr.append(len(indices))
+    if missing:
+        log.warning("Ignored %d relations with targets of another type", missing)
+    return list(adjacency), indptr, indices, types
+
+
+class Graph(NamedTuple):
+    ids: arrays.StringArray
+    indptr: memoryview
+    indices: memoryview
+    reltypes: memoryview
+
+
+class RelationGraphs:
+    """Load the relation graphs written by :func:`write_graph`."""
+
+    def __init__(self, path: PathLike):
+        a = arrays.load(path)
+        self.reltypes = arrays.StringArray(a["reltypes_offsets"], a["reltypes_data"])
+        self.synsets = self._graph(a, "synset")
+        self.senses = self._graph(a, "sense")
+
+    @staticmethod
+    def _graph(a: dict[str, memoryview], name: str) -> Graph:
+        return Graph(
+            arrays.StringArray(a[f"{name}_ids_offsets"], a[f"{name}_ids_data"]),
+            a[f"{name}_indptr"],
+            a[f"{name}_indices"],
+            a[f"{name}_reltypes"],
+        )
+
+    def neighbors(self, node_id: str) -> list[tuple[str, str]]:
+        """Return the (relation type, target ID) pairs of a synset or sense."""
+        for graph in (self.synsets, self.senses):
+            i = graph.ids.find(node_id)
+            if i >= 0:
+                start, end = graph.indptr[i], graph.indptr[i + 1]
+                return [
+                    (self.reltypes[t], graph.ids[j])
+                    for j, t in zip(graph.indices[start:end], graph.reltypes[start:end])
+                ]
+        raise KeyError(node_id)
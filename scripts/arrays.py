@@ -0,0 +1,166 @@
+"""
+Compact, memory-mappable array files for build artifacts.
+
+Arrays are stored in the NumPy `.npy` format inside an uncompressed
+`.npz` (zip) archive, so they can be read with `numpy.load()` where
+NumPy is available. NumPy is not required, however: :func:`save`
+writes :class:`array.array` objects directly and :func:`load`
+memory-maps the archive and returns a :class:`memoryview` for each
+array without copying or parsing the data.
+
+Lists of strings are stored as two arrays: the UTF-8 encoded strings
+concatenated into one byte array and the offsets of each string in
+that array (see :func:`encode_strings` and :class:`StringArray`).
+"""
+
+import array
+import ast
+import mmap
+import struct
+import sys
+import zipfile
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Union, overload
+
+from .util import PathLike
+
+Array = Union[array.array, bytes, bytearray]
+
+_BYTEORDER = "<" if sys.byteorder == "little" else ">"
+_NPY_MAGIC = b"\x93NUMPY"
+_NPY_ALIGNMENT = 64
+
+# array typecode -> NumPy dtype kind (itemsize is added when writing)
+_KINDS = {
+    "b": "i", "h": "i", "i": "i", "l": "i", "q": "i",
+    "B": "u", "H": "u", "I": "u", "L": "u", "Q": "u",
+    "f": "f", "d": "f",
+}
+# NumPy dtype (without byte order) -> struct format for memoryview.cast()
+_FORMATS = {
+    "i1": "b", "i2": "h", "i4": "i", "i8": "q",
+    "u1": "B", "u2": "H", "u4": "I", "u8": "Q",
+    "f4": "f", "f8": "d",
+}
+
+
+class ArrayFileError(Exception):
+    """Raised on invalid or unsupported array files."""
+
+
+# Writing ##############################################################
+
+def save(path: PathLike, arrays: dict[str, Array]) -> None:
+    """Write *arrays* to an uncompressed `.npz` archive at *path*."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, data in arrays.items():
+            if isinstance(data, (bytes, bytearray)):
+                data = array.array("B", data)
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as npy:
+                npy.write(_npy_header(data))
+                npy.write(memoryview(data).cast("B"))
+
+
+def _npy_header(data: array.array) -> bytes:
+    itemsize = data.itemsize
+    byteorder = "|" if itemsize == 1 else _BYTEORDER
+    descr = f"{byteorder}{_KINDS[data.typecode]}{itemsize}"
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(data)},), }}"
+    # pad so the data is aligned; 10 = magic (6) + version (2) + length (2)
+    padding = -(10 + len(header) + 1) % _NPY_ALIGNMENT
+    encoded = (header + " " * padding + "\n").encode("latin1")
+    return _NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(encoded)) + encoded
+
+
+def encode_strings(strings: Iterable[str]) -> tuple[array.array, bytes]:
+    """Return the offsets and concatenated UTF-8 data of *strings*.
+
+    The offsets array has one more item than there are strings, so
+    string *i* is `data[offsets[i]:offsets[i + 1]]`.
+    """
+    offsets = array.array("q", [0])
+    chunks: list[bytes] = []
+    end = 0
+    for s in strings:
+        encoded = s.encode("utf-8")
+        chunks.append(encoded)
+        end += len(encoded)
+        offsets.append(end)
+    return offsets, b"".join(chunks)
+
+
+# Reading ##############################################################
+
+def load(path: PathLike) -> dict[str, memoryview]:
+    """Memory-map the `.npz` archive at *path* and return its arrays.
+
+    Each array is a one-dimensional :class:`memoryview` over the
+    mapped file, so nothing is read until it is accessed.
+    """
+    with open(path, "rb") as file, zipfile.ZipFile(file) as zf:
+        infos = zf.infolist()
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(mm)
+    arrays: dict[str, memoryview] = {}
+    for info in infos:
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ArrayFileError(f"cannot memory-map compressed array: {info.filename}")
+        # the local file header has 30 fixed bytes then the name and extra fields
+        name_len, extra_len = struct.unpack_from("<HH", mm, info.header_offset + 26)
+        start = info.header_offset + 30 + name_len + extra_len
+        name = info.filename.removesuffix(".npy")
+        arrays[name] = _npy_view(buffer[start:start + info.file_size], name)
+    return arrays
+
+
+def _npy_view(buffer: memoryview, name: str) -> memoryview:
+    if buffer[:6] != _NPY_MAGIC:
+        raise ArrayFileError(f"not a .npy array: {name}")
+    major = buffer[6]
+    if major == 1:
+        (header_len,) = struct.unpack_from("<H", buffer, 8)
+        start = 10
+    else:
+        (header_len,) = struct.unpack_from("<I", buffer, 8)
+        start = 12
+    header = ast.literal_eval(bytes(buffer[start:start + header_len]).decode("latin1"))
+    descr: str = header["descr"]
+    if descr[0] not in ("|", _BYTEORDER) or descr[1:] not in _FORMATS:
+        raise ArrayFileError(f"unsupported dtype for {name}: {descr}")
+    if header["fortran_order"] or len(header["shape"]) != 1:
+        raise ArrayFileError(f"only one-dimensional arrays are supported: {name}")
+    return buffer[start + header_len:].cast(_FORMATS[descr[1:]])
+
+
+class StringArray(Sequence[str]):
+    """A read-only sequence of strings stored by :func:`encode_strings`."""
+
+    def __init__(self, offsets: Sequence[int], data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return bytes(self._data[start:end]).decode("utf-8")
+
+    def find(self, s: str) -> int:
+        """Return the index of *s* in a sorted array, or -1 if not found."""
+        i = bisect_left(self, s)
+        if i < len(self) and self[i] == s:
+            return i
+        return -1
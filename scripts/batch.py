@@ -0,0 +1,220 @@
+"""
+Convert directories of small OMW TSV files in one process pool.
+
+Collections such as `wns/wikt/` and `wns/cldr/` have hundreds of
+`wn-<collection>-<code>.tab` files (which may be compressed, e.g.,
+`.tab.gz`) that are not listed in `index.toml`. Their lexicon
+metadata comes from the TSV headers: the file `wn-wikt-fra.tab`
+becomes the lexicon `omw-wikt-fra` with the header's label,
+language, URL, and license (if it is a known open license, see
+:data:`scripts.tsv2lmf.OPEN_LICENSES`). Languages
+written like `*bh` become private-use tags (`x-bh`).
+
+The files are converted by a pool of worker processes which receive
+the ILI map and other shared data once, when they start, and keep
+their caches (e.g., of escaped lemmas) from one file to the next.
+Larger files are submitted first so the pool stays busy. Workers send
+their log records to the main process, which writes them to one log
+file prefixed with the lexicon ID, and a manifest lists each lexicon
+with its status, size, and conversion time.
+"""
+
+import csv
+import logging
+import logging.handlers
+import multiprocessing
+import time
+from collections.abc import Container, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from wn.lmf import Dependency
+
+from . import compression, coverage, shard, sidecars, tabfile, tsv2lmf
+from .util import PathLike
+
+log = logging.getLogger("batch")
+
+LOG_FORMAT = "%(lexid)s: %(levelname)s:%(name)s:%(message)s"
+
+
+class BatchJob(NamedTuple):
+    lexid: str
+    source: Path
+    label: str
+    language: str
+    url: str
+    license: str
+
+
+class BatchResult(NamedTuple):
+    lexid: str
+    source: str
+    status: str  # "ok" or "error"
+    synsets: int
+    entries: int
+    senses: int
+    seconds: float
+    # lexicalized and unlexicalized ILIs (see scripts.coverage)
+    ilis: Optional[tuple[set[str], set[str]]] = None
+
+
+MANIFEST_FIELDS = BatchResult._fields[:-1]
+
+
+def find_jobs(directory: Path) -> list[BatchJob]:
+    """Return a job for each `wn-*.tab` file in *directory*.
+
+    The files may be compressed (e.g., `wn-*.tab.gz`).
+    """
+    jobs = []
+    suffixes = (".tab", *(f".tab{suffix}" for suffix in compression.SUFFIXES))
+    for path in sorted(directory.glob("wn-*.tab*")):
+        if not path.name.endswith(suffixes):
+            continue
+        header = tabfile.read_header(path).lstrip("#").strip()
+        try:
+            label, language, url, license = header.split("\t")
+        except ValueError:
+            log.error("Skipping %s with invalid header: %s", path, header)
+            continue
+        code = path.name.removeprefix("wn-").partition(".tab")[0]
+        language = language.replace("*", "x-")
+        jobs.append(BatchJob(
+            f"omw-{code}",
+            path,
+            f"{label} ({language})",
+            language,
+            url,
+            tsv2lmf.OPEN_LICENSES.get(license, license),
+        ))
+    return jobs
+
+
+def run_batch(
+    jobs: Sequence[BatchJob],
+    builddir: Path,
+    version: str,
+    email: str,
+    logfile: PathLike,
+    manifest: PathLike,
+    requires: Optional[Dependency] = None,
+    ilimap: Optional[dict[str, str]] = None,
+    relations: Optional[tsv2lmf.SynsetRelations] = None,
+    subset: Optional[Container[str]] = None,
+    shard_by: Optional[str] = None,
+    sidecar_names: Iterable[str] = (),
+    processes: Optional[int] = None,
+) -> list[BatchResult]:
+    """Convert *jobs* into packages in *builddir*.
+
+    The results are returned and written to *manifest* in the order of
+    *jobs*; the log records of all jobs are written to *logfile*.
+    """
+    shared = {
+        "builddir": builddir,
+        "version": version,
+        "email": email,
+        "requires": requires,
+        "ilimap": ilimap or {},
+        "relations": relations,
+        "subset": subset,
+        "shard_by": shard_by,
+        "sidecars": list(sidecar_names),
+    }
+    queue: Any = multiprocessing.Queue()
+    handler = logging.FileHandler(logfile, mode="w")
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(queue, handler)
+    listener.start()
+    # biggest first, so a large file does not start last
+    order = sorted(jobs, key=lambda job: job.source.stat().st_size, reverse=True)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(shared, queue),
+        ) as executor:
+            results = dict(zip(order, executor.map(_convert, order)))
+    finally:
+        listener.stop()
+        handler.close()
+
+    ordered = [results[job] for job in jobs]
+    with open(manifest, "w", newline="") as manifestfile:
+        writer = csv.writer(manifestfile, dialect="excel-tab")
+        writer.writerow(MANIFEST_FIELDS)
+        for result in ordered:
+            writer.writerow((*result[:-2], f"{result.seconds:.3f}"))
+    failed = sum(result.status != "ok" for result in ordered)
+    if failed:
+        log.warning("%d of %d lexicons failed; see %s", failed, len(jobs), logfile)
+    return ordered
+
+
+# Worker processes #####################################################
+
+_shared: dict[str, Any] = {}
+_current_lexid = "-"
+
+
+class _LexiconFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.lexid = _current_lexid
+        return True
+
+
+def _init_worker(shared: dict[str, Any], queue: Any) -> None:
+    _shared.update(shared)
+    handler = logging.handlers.QueueHandler(queue)
+    handler.addFilter(_LexiconFilter())
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(logging.INFO)
+    logging.captureWarnings(True)  # e.g., from escape_lemma()
+
+
+def _convert(job: BatchJob) -> BatchResult:
+    global _current_lexid
+    _current_lexid = job.lexid
+    start = time.perf_counter()
+    packagedir = _shared["builddir"] / job.lexid
+    packagedir.mkdir(exist_ok=True)
+    try:
+        lexicon = tsv2lmf.convert(
+            job.source,
+            packagedir / f"{job.lexid}.xml",
+            job.lexid,
+            job.label,
+            job.language,
+            _shared["email"],
+            job.license,
+            _shared["version"],
+            url=job.url,
+            requires=_shared["requires"],
+            ilimap=_shared["ilimap"],
+            relations=_shared["relations"],
+            subset=_shared["subset"],
+        )
+        if _shared["shard_by"]:
+            shard.write_package_shards(
+                lexicon, packagedir, _shared["shard_by"], tsv2lmf.LMF_VERSION
+            )
+        sidecars.write(_shared["sidecars"], lexicon, packagedir)
+    except Exception:
+        log.exception("Failed to convert %s", job.source)
+        seconds = time.perf_counter() - start
+        return BatchResult(job.lexid, str(job.source), "error", 0, 0, 0, seconds)
+    finally:
+        _current_lexid = "-"
+    return BatchResult(
+        job.lexid,
+        str(job.source),
+        "ok",
+        len(lexicon["synsets"]),
+        len(lexicon["entries"]),
+        sum(len(entry["senses"]) for entry in lexicon["entries"]),
+        time.perf_counter() - start,
+        coverage.lexicon_ilis(lexicon),
+    )
@@ -2,16 +2,35 @@
 from typing import Optional, Any
 from pathlib import Path
 import argparse
+import os
 
 import tomli
 
-from . import tsv2lmf
-from .util import load_ili_map
+from . import batch, coverage, shard, sidecars, tsv2lmf
+from .util import load_ili_map, load_ili_set
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--version', required=True, help='the version to build')
 parser.add_argument('--dry-run', action='store_true',
                     help='print what would be built without building')
+parser.add_argument('--project-relations', metavar='WNDBDIR',
+                    help='add synset relations from the WNDB database at WNDBDIR')
+parser.add_argument('--sidecar', action='append', default=[],
+                    choices=sorted(sidecars.SIDECARS),
+                    help='write an extra artifact next to each package; '
+                         'may be repeated')
+parser.add_argument('--subset', choices=('core',),
+                    help='only include synsets in the given subset of ILIs')
+parser.add_argument('--shard-by', choices=shard.SHARD_BY,
+                    help='also write each lexicon as several files and a manifest '
+                         'in a <lexid>.shards/ subdirectory of its package')
+parser.add_argument('--batch', metavar='DIR', action='append', default=[],
+                    help='also convert each wn-*.tab file in DIR (e.g., '
+                         'wns/wikt) using its header as metadata; '
+                         'may be repeated')
+parser.add_argument('--processes', type=int,
+                    help='number of worker processes for --batch and for '
+                         'parsing large source files (default: number of CPUs)')
 parser.add_argument('LEXID', nargs='*',
                     help='which wordnet to build (default: all)')
 args = parser.parse_args()
@@ -39,8 +58,28 @@ INDEXPATH = OMWDATA / 'index.toml'
 ILIFILE = OMWDATA / 'etc' / 'cili' / 'ili-map-pwn30.tab'
 ilimap = load_ili_map(ILIFILE)
 
-BUILD = OMWDATA / 'build' / f'omw-{args.version}'
+# ILI subsets for --subset; subset builds go in a separate directory
+# and get a version suffix so they are not confused with full builds
+SUBSETS = {
+    'core': OMWDATA / 'etc' / 'wn-core-ili.tab',
+}
+subset = None
+BUILDNAME = f'omw-{args.version}'
+VERSION = args.version
+if args.subset:
+    subset_ilis = load_ili_set(SUBSETS[args.subset])
+    subset = {ssid for ssid, ili in ilimap.items() if ili in subset_ilis}
+    BUILDNAME = f'{BUILDNAME}-{args.subset}'
+    VERSION = f'{VERSION}+{args.subset}'
+
+relations = None
+if args.project_relations:
+    relations = tsv2lmf.load_synset_relations(Path(args.project_relations))
+
+BUILD = OMWDATA / 'build' / BUILDNAME
 BUILD.mkdir(parents=True, exist_ok=True)
+# release-level artifacts go beside BUILD as each entry in it is a package
+COVERAGE = BUILD.parent / f'{BUILDNAME}.coverage.npz'
 
 LOGDIR = OMWDATA / 'log'
 LOGDIR.mkdir(exist_ok=True)
@@ -50,7 +89,10 @@ defaults = index.get('package-defaults', {})
 packages = index.get('packages', {})
 
 LEXIDS = set(args.LEXID) or set(packages)
-VERSION = args.version
+
+PROCESSES = args.processes or os.cpu_count() or 1
+
+ilis: dict[str, tuple[set[str], set[str]]] = {}
 
 for lexid, project in packages.items():
     if lexid not in LEXIDS or not isinstance(project, dict):
@@ -74,7 +116,7 @@ for lexid, project in packages.items():
 
     print(f'{lexid}: converting')
     if not args.dry_run:
-        tsv2lmf.convert(
+        lexicon = tsv2lmf.convert(
             project['source'],
             str(outfile),
             lexid,
@@ -88,8 +130,17 @@ for lexid, project in packages.items():
             logo=get('logo'),
             requires=requires,
             ilimap=ilimap,
+            relations=relations,
+            subset=subset,
             logfile=LOGDIR / f'tsv2lmf_{lexid}-{VERSION}.log',
+            processes=PROCESSES,
         )
+        if args.shard_by:
+            shard.write_package_shards(
+                lexicon, packagedir, args.shard_by, tsv2lmf.LMF_VERSION
+            )
+        sidecars.write(args.sidecar, lexicon, packagedir)
+        ilis[lexid] = coverage.lexicon_ilis(lexicon)
 
     # copy extra files if available
     sourcedir = Path(project['source']).parent
@@ -97,3 +148,43 @@ for lexid, project in packages.items():
         path = (sourcedir / filename)
         if path.is_file():
             (packagedir / filename).write_bytes(path.read_bytes())  # copy
+
+# batch-converted collections share one process pool, log, and manifest
+jobs = [job for directory in args.batch for job in batch.find_jobs(Path(directory))]
+for job in jobs:
+    print(f'{job.lexid}: converting (batch)')
+if jobs and not args.dry_run:
+    requires = None
+    if req := defaults.get('requires'):
+        requires = {'id': req['id'], 'version': req['version']}
+    manifest = BUILD.parent / f'{BUILDNAME}.batch.tsv'
+    results = batch.run_batch(
+        jobs,
+        BUILD,
+        VERSION,
+        defaults['email'],
+        logfile=LOGDIR / f'tsv2lmf_batch-{VERSION}.log',
+        manifest=manifest,
+        requires=requires,
+        ilimap=ilimap,
+        relations=relations,
+        subset=subset,
+        shard_by=args.shard_by,
+        sidecar_names=args.sidecar,
+        processes=PROCESSES,
+    )
+    print(f'wrote batch manifest to {manifest}')
+    for job, result in zip(jobs, results):
+        if result.ilis is None:
+            print(f'{job.lexid}: failed (see the batch log)')
+            continue
+        ilis[job.lexid] = result.ilis
+        for filename in LMF_PACKAGE_FILENAMES:
+            path = job.source.parent / filename
+            if path.is_file():
+                (BUILD / job.lexid / filename).write_bytes(path.read_bytes())
+
+# only a full build covers the release
+if ilis and not args.LEXID:
+    print(f'writing ILI coverage to {COVERAGE}')
+    coverage.write_coverage(ilis, COVERAGE)
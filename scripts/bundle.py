@@ -0,0 +1,192 @@
+"""
+Write the lexicons of a release into a single WN-LMF file.
+
+The `<Lexicon>` elements of each package's WN-LMF file are copied
+into one `<LexicalResource>` line by line, so neither the packages
+nor the bundle are held in memory. The byte range of each lexicon in
+the bundle is written to a tab-separated offsets file next to it
+(`omw-2.0.xml` gets `omw-2.0.offsets.tsv`) with the columns `id`,
+`version`, `start`, and `end` (exclusive), so a reader can seek to a
+lexicon and parse only that (see :func:`load_lexicon`).
+
+Usage:
+
+    python -m scripts.bundle build/omw-2.0 build/omw-2.0.xml
+"""
+
+import argparse
+import csv
+import fnmatch
+import logging
+import re
+import sys
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+from wn import lmf
+from wn.project import iterpackages
+
+from .util import PathLike
+
+log = logging.getLogger("bundle")
+
+_LEXICON_START = re.compile(rb"^\s*<(Lexicon|LexiconExtension)\b")
+_LEXICON_END = re.compile(rb"^\s*</(Lexicon|LexiconExtension)>")
+_ATTRIBUTE = re.compile(rb"""\b(id|version)=["']([^"']*)["']""")
+_RESOURCE_END = b"</LexicalResource>"
+
+
+class BundleError(Exception):
+    """Raised when the packages cannot be bundled."""
+
+
+class LexiconRange(NamedTuple):
+    id: str
+    version: str
+    start: int
+    end: int
+
+
+def offsets_path(bundle: PathLike) -> Path:
+    """Return the path of the offsets file of *bundle*."""
+    return Path(bundle).with_suffix(".offsets.tsv")
+
+
+def write_bundle(
+    sources: Iterable[PathLike],
+    destination: PathLike,
+) -> list[LexiconRange]:
+    """Copy the lexicons of the WN-LMF files *sources* into *destination*.
+
+    All *sources* must use the same WN-LMF version. The lexicon byte
+    ranges are returned and written to the offsets file.
+    """
+    ranges: list[LexiconRange] = []
+    header: Optional[bytes] = None
+    with open(destination, "wb") as out:
+        for source in sources:
+            log.info("Adding %s", source)
+            with open(source, "rb") as src:
+                source_header = _read_header(src, source)
+                if header is None:
+                    header = source_header
+                    out.write(header)
+                elif source_header != header:
+                    raise BundleError(f"different WN-LMF header: {source}")
+                ranges.extend(_copy_lexicons(src, out, source))
+        if header is None:
+            raise BundleError("no WN-LMF files to bundle")
+        out.write(_RESOURCE_END + b"\n")
+
+    with offsets_path(destination).open("w", newline="") as offsetsfile:
+        writer = csv.writer(offsetsfile, dialect="excel-tab")
+        writer.writerow(LexiconRange._fields)
+        writer.writerows(ranges)
+    return ranges
+
+
+def _read_header(src: BinaryIO, source: PathLike) -> bytes:
+    """Read the lines up to and including the `<LexicalResource>` tag."""
+    lines = []
+    for line in src:
+        lines.append(line)
+        if line.lstrip().startswith(b"<LexicalResource"):
+            return b"".join(lines)
+    raise BundleError(f"no <LexicalResource> element: {source}")
+
+
+def _copy_lexicons(
+    src: BinaryIO,
+    out: BinaryIO,
+    source: PathLike,
+) -> list[LexiconRange]:
+    ranges: list[LexiconRange] = []
+    start = -1
+    start_tag = b""
+    for line in src:
+        if start < 0:
+            if line.strip() == _RESOURCE_END:
+                break
+            if not _LEXICON_START.match(line):
+                raise BundleError(f"unexpected content outside lexicons: {source}")
+            start = out.tell()
+        if b">" not in start_tag:
+            start_tag += line
+        out.write(line)
+        if _LEXICON_END.match(line):
+            attrs = dict(_ATTRIBUTE.findall(start_tag.partition(b">")[0]))
+            ranges.append(LexiconRange(
+                attrs.get(b"id", b"").decode("utf-8"),
+                attrs.get(b"version", b"").decode("utf-8"),
+                start,
+                out.tell(),
+            ))
+            start = -1
+            start_tag = b""
+    else:
+        raise BundleError(f"missing </LexicalResource>: {source}")
+    return ranges
+
+
+def read_offsets(bundle: PathLike) -> list[LexiconRange]:
+    """Read the offsets file of *bundle*."""
+    with offsets_path(bundle).open(newline="") as offsetsfile:
+        reader = csv.reader(offsetsfile, dialect="excel-tab")
+        next(reader)  # header
+        return [
+            LexiconRange(id, version, int(start), int(end))
+            for id, version, start, end in reader
+        ]
+
+
+def load_lexicon(
+    bundle: PathLike,
+    id: str,
+    version: Optional[str] = None,
+) -> lmf.Lexicon:
+    """Load only the lexicon *id* (and *version*, if given) of *bundle*."""
+    ranges = read_offsets(bundle)
+    for lexrange in ranges:
+        if lexrange.id == id and version in (None, lexrange.version):
+            break
+    else:
+        raise KeyError(f"{id}:{version}" if version else id)
+    with open(bundle, "rb") as src:
+        header = _read_header(src, bundle)
+        src.seek(lexrange.start)
+        data = src.read(lexrange.end - lexrange.start)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir, f"{id}.xml")
+        path.write_bytes(header + data + _RESOURCE_END + b"\n")
+        resource = lmf.load(path, progress_handler=None)
+    return resource["lexicons"][0]
+
+
+def main(args: argparse.Namespace) -> int:
+    sources = []
+    for pkg in sorted(iterpackages(args.DIR), key=lambda pkg: pkg.path.name):
+        if any(fnmatch.fnmatch(pkg.path.name, pattern) for pattern in args.exclude):
+            log.info("Excluding %s", pkg.path)
+            continue
+        sources.append(pkg.resource_file())
+    ranges = write_bundle(sources, args.DEST)
+    log.info("Wrote %d lexicons to %s", len(ranges), args.DEST)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle a release into one file")
+    parser.add_argument("DIR", type=Path, help="the release build directory")
+    parser.add_argument("DEST", type=Path, help="the bundled WN-LMF file")
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="skip packages whose names match PATTERN; may be repeated",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(args))
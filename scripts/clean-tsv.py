@@ -1,59 +1,20 @@
 import argparse
-import datetime
 import sys
-from contextlib import nullcontext
 from pathlib import Path
 
-from .util import load_tsv, strip_quotes
+from .clean import clean_file, clean_rows
+from .tabfile import iter_rows, read_header
 
 
 def main(args: argparse.Namespace) -> int:
-    header, rows = load_tsv(args.TSVFILE)
-
-    seen_lemmas: dict[str, set[tuple[str, str]]] = {}
-
     if args.in_place:
-        tabfile = args.TSVFILE.open("wt", encoding="utf-8")
+        # compressed again if TSVFILE is compressed
+        clean_file(args.TSVFILE, sys.stderr, args.ignore_lemma_type)
     else:
-        tabfile = nullcontext(sys.stdout)  # so we can use `with tabfile:`
-
-    date = datetime.date.today().isoformat()  # for the log
-    logfile = nullcontext(sys.stderr)
-
-    with tabfile as out, logfile as err:
-        print(header, file=out)
-
-        for row in rows:
-            offset_pos, row_type, text, order = row
-
-            lemma_set = seen_lemmas.setdefault(offset_pos, set())
-            if row.is_lemma():
-                lemma = text.replace("_", " ")  # Use actual spaces
-                lemma = lemma.strip()  # strip spaces to help quote-stripping
-                lemma = strip_quotes(lemma)
-
-                lemma_type = "" if args.ignore_lemma_type else row_type
-
-                key = (lemma, lemma_type)
-                original = "\t".join(row[:3])
-                if lemma and key not in lemma_set:
-                    if lemma != text:
-                        print(f"{date}\tMODIFIED\t{original}\t{lemma}", file=err)
-                    print(f"{offset_pos}\t{row_type}\t{lemma}", file=out)
-                    lemma_set.add(key)
-                else:
-                    print(f"{date}\tREMOVED\t{original}", file=err)
-
-            elif row_type.endswith((":def", "exe")):
-                entry = f"{offset_pos}\t{row_type}\t{order}\t{text}"
-                if text.strip():
-                    print(entry, file=out)
-                else:
-                    print(f"{date}\tREMOVED\t{entry}", file=err)
-
-            else:
-                raise Exception(f"unexpected row type: {row_type}")
-
+        print(read_header(args.TSVFILE))
+        clean_rows(
+            iter_rows(args.TSVFILE), sys.stdout, sys.stderr, args.ignore_lemma_type
+        )
     return 0
 
 
@@ -66,7 +27,9 @@ if __name__ == "__main__":
             "inspect the diffs and revert if necessary."
         ),
     )
-    parser.add_argument("TSVFILE", type=Path, help="path to TSV file")
+    parser.add_argument(
+        "TSVFILE", type=Path, help="path to TSV file (may be .gz, .xz, or .zst)"
+    )
     parser.add_argument(
         "--ignore-lemma-type",
         action="store_true",
@@ -0,0 +1,271 @@
+"""
+Clean the OMW TSV files in one process pool.
+
+Usage:
+
+    python -m scripts.clean [TSVFILE ...] [--processes=N]
+
+This does what `scripts.clean-tsv --in-place` does for each file:
+duplicate and empty lemmas are removed, quotes around lemmas are
+stripped, and empty definitions and examples are removed. Without
+TSVFILE arguments the files in :data:`FILES` (those cleaned by
+`clean.sh`) are cleaned.
+
+The files are cleaned by a pool of worker processes, largest first.
+The rows of each file are streamed to a temporary file in the same
+directory, which then replaces the original, so an interrupted or
+failed run leaves the file as it was. The changes are appended to the
+file's changes log (`wns/fra/fra-changes.tab` for
+`wns/fra/wn-data-fra.tab`), which is only created if there are
+changes.
+"""
+
+import argparse
+import datetime
+import io
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple, Optional, TextIO
+
+from . import compression, tabfile
+from .util import TSVRow, strip_quotes
+
+log = logging.getLogger("clean")
+
+# (directory, language) of the files cleaned by default
+FILES = [
+    ("als", "als"),
+    ("arb", "arb"),
+    ("bul", "bul"),
+    ("cow", "cmn"),
+    ("cwn", "qcn"),
+    ("dan", "dan"),
+    ("ell", "ell"),
+    ("eng", "eng"),
+    ("fas", "fas"),
+    ("fin", "fin"),
+    ("fra", "fra"),
+    ("heb", "heb"),
+    ("hrv", "hrv"),
+    ("isl", "isl"),
+    ("ita", "ita"),
+    ("iwn", "ita"),
+    ("jpn", "jpn"),
+    ("mcr", "cat"),
+    ("mcr", "eus"),
+    ("mcr", "glg"),
+    ("mcr", "spa"),
+    ("msa", "ind"),
+    ("msa", "zsm"),
+    ("nld", "nld"),
+    ("nor", "nno"),
+    ("nor", "nob"),
+    ("pol", "pol"),
+    ("por", "por"),
+    ("ron", "ron"),
+    ("slk", "slk"),
+    ("slv", "slv"),
+    ("swe", "swe"),
+    ("tha", "tha"),
+]
+
+_DATA_FILE = re.compile(r"wn-data-(.+)\.tab(?:\.\w+)?")
+
+
+class CleanResult(NamedTuple):
+    path: str
+    changes: int
+    error: Optional[str] = None
+
+
+def default_files(directory: Path) -> list[Path]:
+    """Return the paths of :data:`FILES` under *directory* (e.g., `wns/`)."""
+    return [directory / name / f"wn-data-{lang}.tab" for name, lang in FILES]
+
+
+def changes_path(path: Path) -> Path:
+    """Return the path of the changes log of the TSV file at *path*."""
+    m = _DATA_FILE.fullmatch(path.name)
+    stem = m.group(1) if m else path.name.partition(".")[0]
+    return path.with_name(f"{stem}-changes.tab")
+
+
+def clean_rows(
+    rows: Iterable[TSVRow],
+    out: TextIO,
+    err: TextIO,
+    ignore_lemma_type: bool = False,
+    date: Optional[str] = None,
+) -> int:
+    """Write the cleaned *rows* to *out* and the changes to *err*.
+
+    Return the number of changes. The changes are logged with *date*
+    (by default, today).
+    """
+    date = date or datetime.date.today().isoformat()
+    seen_lemmas: dict[str, set[tuple[str, str]]] = {}
+    changes = 0
+
+    for row in rows:
+        offset_pos, row_type, text, order = row
+
+        if row.is_lemma():
+            lemma_set = seen_lemmas.setdefault(offset_pos, set())
+            lemma = text.replace("_", " ")  # Use actual spaces
+            lemma = lemma.strip()  # strip spaces to help quote-stripping
+            lemma = strip_quotes(lemma)
+
+            lemma_type = "" if ignore_lemma_type else row_type
+
+            key = (lemma, lemma_type)
+            original = "\t".join(row[:3])
+            if lemma and key not in lemma_set:
+                if lemma != text:
+                    print(f"{date}\tMODIFIED\t{original}\t{lemma}", file=err)
+                    changes += 1
+                print(f"{offset_pos}\t{row_type}\t{lemma}", file=out)
+                lemma_set.add(key)
+            else:
+                print(f"{date}\tREMOVED\t{original}", file=err)
+                changes += 1
+
+        elif row_type.endswith((":def", "exe")):
+            entry = f"{offset_pos}\t{row_type}\t{order}\t{text}"
+            if text.strip():
+                print(entry, file=out)
+            else:
+                print(f"{date}\tREMOVED\t{entry}", file=err)
+                changes += 1
+
+        else:
+            raise ValueError(f"unexpected row type: {row_type}")
+
+    return changes
+
+
+def clean_file(
+    path: Path,
+    err: TextIO,
+    ignore_lemma_type: bool = False,
+    date: Optional[str] = None,
+) -> int:
+    """Clean the TSV file at *path* in place and write the changes to *err*.
+
+    The file is replaced only when all of its rows have been written
+    to a temporary file; compressed files are compressed again.
+    """
+    fd, tmpname = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=path.suffix, dir=path.parent
+    )
+    os.close(fd)
+    tmppath = Path(tmpname)
+    try:
+        with io.TextIOWrapper(
+            compression.open_binary(tmppath, "wb"), encoding=tabfile.ENCODING
+        ) as out:
+            print(tabfile.read_header(path), file=out)
+            changes = clean_rows(
+                tabfile.iter_rows(path), out, err, ignore_lemma_type, date
+            )
+        shutil.copymode(path, tmppath)
+        os.replace(tmppath, path)
+    finally:
+        tmppath.unlink(missing_ok=True)
+    return changes
+
+
+def _clean(path: Path, ignore_lemma_type: bool, date: str) -> CleanResult:
+    err = io.StringIO()
+    try:
+        changes = clean_file(path, err, ignore_lemma_type, date)
+    except (OSError, ValueError) as exc:
+        return CleanResult(str(path), 0, str(exc))
+    if changes:
+        # each file has its own log, so workers never append to the same one
+        with changes_path(path).open("at", encoding=tabfile.ENCODING) as logfile:
+            logfile.write(err.getvalue())
+    return CleanResult(str(path), changes)
+
+
+def clean(
+    paths: Sequence[Path],
+    processes: Optional[int] = None,
+    ignore_lemma_type: bool = False,
+) -> list[CleanResult]:
+    """Clean the TSV files at *paths* in place with a pool of processes.
+
+    Return the result of each file, in the order of *paths*.
+    """
+    date = datetime.date.today().isoformat()
+    # the largest files first, so that they do not finish last
+    jobs = sorted(paths, key=_size, reverse=True)
+    if processes == 1 or len(jobs) < 2:
+        results = {path: _clean(path, ignore_lemma_type, date) for path in jobs}
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = {
+                executor.submit(_clean, path, ignore_lemma_type, date): path
+                for path in jobs
+            }
+            results = {
+                futures[future]: future.result() for future in as_completed(futures)
+            }
+    return [results[path] for path in paths]
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0  # reported when the file is cleaned
+
+
+def main(args: argparse.Namespace) -> int:
+    paths = args.TSVFILE or default_files(Path("wns"))
+    status = 0
+    for result in clean(paths, args.processes, args.ignore_lemma_type):
+        if result.error:
+            log.error("%s not cleaned: %s", result.path, result.error)
+            status = 1
+        else:
+            log.info("Cleaned %s (%d changes)", result.path, result.changes)
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Clean OMW TSV files in place in parallel.",
+        epilog=(
+            "WARNING: this modifies the original TSV files! It is suggested "
+            "that you work with files checked into version control so you can "
+            "inspect the diffs and revert if necessary."
+        ),
+    )
+    parser.add_argument(
+        "TSVFILE",
+        nargs="*",
+        type=Path,
+        help="path to TSV file (may be .gz, .xz, or .zst; default: the "
+             "files cleaned by clean.sh)",
+    )
+    parser.add_argument(
+        "--ignore-lemma-type",
+        action="store_true",
+        help="don't consider the lemma type column in deduping",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help="number of worker processes (default: number of CPUs)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(args))
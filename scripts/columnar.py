@@ -0,0 +1,357 @@
+"""
+Columnar tables of the entries, senses, synsets, definitions,
+examples and relations of lexicons, for analytics without XML parsing.
+
+Each table is written to its own `.npz` archive (see
+:mod:`scripts.arrays`), `<lexid>.<table>.npz` for a single lexicon and
+`omw-<version>.<table>.npz` for a release (see :func:`concatenate`).
+Every table has a `lexicon` column, so the release tables can be
+scanned for all languages at once, and a scan only reads the columns
+it uses. Integer columns are stored as plain arrays. String columns
+are dictionary-encoded as three arrays:
+
+- `<column>_codes`: the index of each row's value in the dictionary
+- `<column>_dict_offsets`, `<column>_dict_data`: the sorted distinct
+  values
+
+As the dictionaries are sorted, a value is found with a binary search
+and filtering or grouping on a string column only compares codes.
+Missing values (e.g., a synset without an ILI) are empty strings.
+"""
+
+import argparse
+import array
+import logging
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Union
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .util import PathLike
+
+log = logging.getLogger("columnar")
+
+STRING = "str"
+
+# table -> ((column, type), ...) where the type is STRING or an
+# array typecode
+TABLES: dict[str, tuple[tuple[str, str], ...]] = {
+    "entries": (
+        ("lexicon", STRING),
+        ("entry", STRING),
+        ("lemma", STRING),
+        ("pos", STRING),
+        ("forms", "i"),
+        ("senses", "i"),
+    ),
+    "senses": (
+        ("lexicon", STRING),
+        ("sense", STRING),
+        ("entry", STRING),
+        ("synset", STRING),
+        ("rank", "i"),
+        ("count", "i"),
+    ),
+    "synsets": (
+        ("lexicon", STRING),
+        ("synset", STRING),
+        ("ili", STRING),
+        ("pos", STRING),
+        ("lexfile", STRING),
+        ("lexicalized", "B"),
+        ("members", "i"),
+    ),
+    "definitions": (
+        ("lexicon", STRING),
+        ("synset", STRING),
+        ("language", STRING),
+        ("text", STRING),
+    ),
+    "examples": (
+        ("lexicon", STRING),
+        ("owner", STRING),
+        ("language", STRING),
+        ("text", STRING),
+    ),
+    "relations": (
+        ("lexicon", STRING),
+        ("level", STRING),
+        ("source", STRING),
+        ("type", STRING),
+        ("target", STRING),
+    ),
+}
+
+Value = Union[str, int]
+
+
+# Writing ##############################################################
+
+class TableBuilder:
+    """Accumulate the rows of a table and encode its columns."""
+
+    def __init__(self, columns: Sequence[tuple[str, str]]):
+        self.columns = tuple(columns)
+        self._values: list[array.array] = [array.array("i") for _ in columns]
+        # provisional codes of string columns, in order of appearance
+        self._codes: list[dict[str, int]] = [{} for _ in columns]
+
+    def __len__(self) -> int:
+        return len(self._values[0]) if self._values else 0
+
+    def append(self, row: Sequence[Value]) -> None:
+        for (_, type_), values, codes, value in zip(
+            self.columns, self._values, self._codes, row
+        ):
+            if type_ == STRING:
+                value = codes.setdefault(value, len(codes))
+            values.append(value)
+
+    def arrays(self) -> dict[str, arrays.Array]:
+        data: dict[str, arrays.Array] = {}
+        for (name, type_), values, codes in zip(
+            self.columns, self._values, self._codes
+        ):
+            if type_ != STRING:
+                data[name] = array.array(type_, values)
+                continue
+            dictionary = sorted(codes)
+            remap = [0] * len(codes)
+            for i, value in enumerate(dictionary):
+                remap[codes[value]] = i
+            data[f"{name}_codes"] = array.array("i", (remap[c] for c in values))
+            offsets, strings = arrays.encode_strings(dictionary)
+            data[f"{name}_dict_offsets"] = offsets
+            data[f"{name}_dict_data"] = strings
+        return data
+
+
+def build_tables(lexicon: Lexicon) -> dict[str, TableBuilder]:
+    """Return the filled table builders for *lexicon*."""
+    tables = {name: TableBuilder(columns) for name, columns in TABLES.items()}
+    add_lexicon(tables, lexicon)
+    return tables
+
+
+def add_lexicon(tables: dict[str, TableBuilder], lexicon: Lexicon) -> None:
+    """Append the rows of *lexicon* to *tables*."""
+    lexid = lexicon["id"]
+    relations = tables["relations"]
+    examples = tables["examples"]
+    for entry in lexicon.get("entries", []):
+        senses = entry.get("senses", [])
+        tables["entries"].append((
+            lexid,
+            entry["id"],
+            entry["lemma"]["writtenForm"],
+            entry["lemma"]["partOfSpeech"],
+            len(entry.get("forms", [])),
+            len(senses),
+        ))
+        for rank, sense in enumerate(senses, 1):
+            tables["senses"].append((
+                lexid,
+                sense["id"],
+                entry["id"],
+                sense["synset"],
+                rank,
+                sum(count["value"] for count in sense.get("counts", [])),
+            ))
+            for rel in sense.get("relations", []):
+                relations.append(
+                    (lexid, "sense", sense["id"], rel["relType"], rel["target"])
+                )
+            for ex in sense.get("examples", []):
+                examples.append(
+                    (lexid, sense["id"], ex.get("language", ""), ex["text"])
+                )
+    for synset in lexicon.get("synsets", []):
+        tables["synsets"].append((
+            lexid,
+            synset["id"],
+            synset.get("ili", ""),
+            synset.get("partOfSpeech", ""),
+            synset.get("lexfile", ""),
+            int(synset.get("lexicalized", True)),
+            len(synset.get("members", [])),
+        ))
+        for defn in synset.get("definitions", []):
+            tables["definitions"].append(
+                (lexid, synset["id"], defn.get("language", ""), defn["text"])
+            )
+        for rel in synset.get("relations", []):
+            relations.append(
+                (lexid, "synset", synset["id"], rel["relType"], rel["target"])
+            )
+        for ex in synset.get("examples", []):
+            examples.append(
+                (lexid, synset["id"], ex.get("language", ""), ex["text"])
+            )
+
+
+def table_path(prefix: PathLike, table: str) -> Path:
+    """Return the path of *table* for *prefix* (e.g., `build/omw-2.0`)."""
+    prefix = Path(prefix)
+    return prefix.with_name(f"{prefix.name}.{table}.npz")
+
+
+def write_tables(tables: dict[str, TableBuilder], prefix: PathLike) -> None:
+    """Write each of *tables* to a file named after *prefix*."""
+    for name, builder in tables.items():
+        arrays.save(table_path(prefix, name), builder.arrays())
+
+
+def write_columnar(lexicon: Lexicon, directory: Path) -> None:
+    """Write the tables of *lexicon* into *directory*."""
+    write_tables(build_tables(lexicon), directory / lexicon["id"])
+
+
+def concatenate(paths: Iterable[PathLike], table: str) -> dict[str, arrays.Array]:
+    """Return the arrays of the files of *table* at *paths* combined.
+
+    The dictionaries are merged and the codes remapped without
+    decoding the rows.
+    """
+    parts = [Table(path) for path in paths]
+    data: dict[str, arrays.Array] = {}
+    for name, type_ in TABLES[table]:
+        if type_ != STRING:
+            column = array.array(type_)
+            for part in parts:
+                column.extend(part.values(name))
+            data[name] = column
+            continue
+        dictionary = sorted(
+            {value for part in parts for value in part.dictionary(name)}
+        )
+        index = {value: i for i, value in enumerate(dictionary)}
+        codes = array.array("i")
+        for part in parts:
+            remap = [index[value] for value in part.dictionary(name)]
+            codes.extend(remap[c] for c in part.codes(name))
+        offsets, strings = arrays.encode_strings(dictionary)
+        data[f"{name}_codes"] = codes
+        data[f"{name}_dict_offsets"] = offsets
+        data[f"{name}_dict_data"] = strings
+    return data
+
+
+# Reading ##############################################################
+
+class Table:
+    """Read a table written by :func:`write_tables`.
+
+    Example:
+
+        >>> senses = Table("build/omw-2.0.senses.npz")
+        >>> rows = senses.rows("lexicon", "omw-fr")
+        >>> len(rows)
+        102671
+
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = arrays.load(path)
+        self._dictionaries: dict[str, arrays.StringArray] = {}
+        self.columns = [
+            name.removesuffix("_codes")
+            for name in self._arrays
+            if not name.endswith(("_dict_offsets", "_dict_data"))
+        ]
+
+    def __len__(self) -> int:
+        if not self.columns:
+            return 0
+        return len(self._column_array(self.columns[0]))
+
+    def _column_array(self, name: str) -> memoryview:
+        if f"{name}_codes" in self._arrays:
+            return self._arrays[f"{name}_codes"]
+        if name in self._arrays:
+            return self._arrays[name]
+        raise KeyError(name)
+
+    def is_string(self, name: str) -> bool:
+        """Return `True` if column *name* is dictionary-encoded."""
+        self._column_array(name)  # raises KeyError if missing
+        return f"{name}_codes" in self._arrays
+
+    def dictionary(self, name: str) -> arrays.StringArray:
+        """Return the sorted distinct values of string column *name*."""
+        if name not in self._dictionaries:
+            if not self.is_string(name):
+                raise ValueError(f"not a string column: {name}")
+            self._dictionaries[name] = arrays.StringArray(
+                self._arrays[f"{name}_dict_offsets"],
+                self._arrays[f"{name}_dict_data"],
+            )
+        return self._dictionaries[name]
+
+    def codes(self, name: str) -> memoryview:
+        """Return the dictionary codes of string column *name*."""
+        if not self.is_string(name):
+            raise ValueError(f"not a string column: {name}")
+        return self._arrays[f"{name}_codes"]
+
+    def values(self, name: str) -> memoryview:
+        """Return the values of integer column *name*."""
+        if self.is_string(name):
+            raise ValueError(f"not an integer column: {name}")
+        return self._arrays[name]
+
+    def column(self, name: str) -> Iterator[Value]:
+        """Yield the decoded values of column *name*."""
+        if not self.is_string(name):
+            yield from self._arrays[name]
+            return
+        dictionary = self.dictionary(name)
+        decoded: dict[int, str] = {}
+        for code in self.codes(name):
+            if code not in decoded:
+                decoded[code] = dictionary[code]
+            yield decoded[code]
+
+    def rows(self, name: str, value: str) -> list[int]:
+        """Return the indexes of rows whose column *name* is *value*."""
+        code = self.dictionary(name).find(value)
+        if code < 0:
+            return []
+        return [i for i, c in enumerate(self.codes(name)) if c == code]
+
+    def value_counts(self, name: str) -> dict[str, int]:
+        """Return the number of rows with each value of column *name*."""
+        counts = [0] * len(self.dictionary(name))
+        for code in self.codes(name):
+            counts[code] += 1
+        dictionary = self.dictionary(name)
+        return {dictionary[i]: n for i, n in enumerate(counts) if n}
+
+
+# Release export #######################################################
+
+def main(args: argparse.Namespace) -> int:
+    for table in TABLES:
+        paths = sorted(args.DIR.glob(f"*/*.{table}.npz"))
+        if not paths:
+            log.warning("No %s tables in %s", table, args.DIR)
+            continue
+        destination = table_path(args.DEST, table)
+        arrays.save(destination, concatenate(paths, table))
+        log.info("Wrote %d %s tables to %s", len(paths), table, destination)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Combine the columnar tables of a release"
+    )
+    parser.add_argument("DIR", type=Path, help="the release build directory")
+    parser.add_argument(
+        "DEST", type=Path, help="the path prefix of the combined tables"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(args))
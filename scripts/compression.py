@@ -0,0 +1,126 @@
+"""
+Transparent reading and writing of compressed files.
+
+Files whose names end with `.gz`, `.xz`, or `.zst` are compressed with
+gzip, xz, or Zstandard; other files are read and written as they are.
+Zstandard requires the optional `zstandard` package:
+
+    pip install zstandard
+
+:func:`read_blocks` decompresses a file in a background thread so
+that decompression, which releases the GIL, overlaps with the parsing
+of the blocks already read.
+
+Reading only uses the standard library (`wn` is imported by
+:func:`dump` when it is called) so that `tsv2lmf.py` and
+:mod:`scripts.tabfile` can import this module when run as a script.
+"""
+
+import gzip
+import lzma
+import queue
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Optional, Union
+
+if TYPE_CHECKING:
+    from wn.lmf import LexicalResource
+
+SUFFIXES = (".gz", ".xz", ".zst")
+
+BLOCK_SIZE = 1 << 20
+
+# the number of blocks the background thread may read ahead
+READ_AHEAD = 4
+
+
+def is_compressed(path: Union[str, Path]) -> bool:
+    """Return `True` if *path* has a compressed file suffix."""
+    return Path(path).suffix in SUFFIXES
+
+
+def open_binary(path: Union[str, Path], mode: str = "rb") -> BinaryIO:
+    """Open *path* for reading (`rb`) or writing (`wb`) bytes.
+
+    Compressed files are decompressed when read and compressed when
+    written.
+    """
+    if mode not in ("rb", "wb"):
+        raise ValueError(f"invalid mode: {mode}")
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        return gzip.open(path, mode)  # type: ignore
+    if suffix == ".xz":
+        return lzma.open(path, mode)  # type: ignore
+    if suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError(
+                f"the zstandard package is required for {path}"
+            ) from exc
+        return zstandard.open(path, mode)  # type: ignore
+    return open(path, mode)  # type: ignore
+
+
+def read_blocks(
+    path: Union[str, Path],
+    block_size: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Yield the (decompressed) content of *path* in blocks.
+
+    The blocks (of :data:`BLOCK_SIZE` bytes unless *block_size* is
+    given) are read by a background thread, up to
+    :data:`READ_AHEAD` blocks ahead of the consumer. Errors in the
+    thread are raised in the consumer.
+    """
+    size = block_size or BLOCK_SIZE
+    blocks: queue.Queue = queue.Queue(maxsize=READ_AHEAD)
+    stop = threading.Event()
+
+    def put(item: object) -> None:
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return
+
+    def read() -> None:
+        try:
+            with open_binary(path) as file:
+                while not stop.is_set() and (block := file.read(size)):
+                    put(block)
+        except BaseException as exc:
+            put(exc)
+        else:
+            put(None)
+
+    thread = threading.Thread(target=read, name=f"read {path}", daemon=True)
+    thread.start()
+    try:
+        while (item := blocks.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def dump(resource: "LexicalResource", destination: Union[str, Path]) -> None:
+    """Write *resource* as WN-LMF to *destination*, compressed if needed."""
+    from wn.lmf import dump as dump_lmf
+
+    destination = Path(destination)
+    if not is_compressed(destination):
+        dump_lmf(resource, destination)
+        return
+    with tempfile.TemporaryDirectory(dir=destination.parent) as tmpdir:
+        path = Path(tmpdir, destination.stem)
+        dump_lmf(resource, path)
+        with path.open("rb") as src, open_binary(destination, "wb") as out:
+            shutil.copyfileobj(src, out, BLOCK_SIZE)
@@ -0,0 +1,194 @@
+"""
+ILI coverage bitsets for the lexicons of a release.
+
+The matrix has one bit per ILI and lexicon, set when the lexicon has
+a lexicalized synset with the ILI. Synsets marked `lexicalized=False`
+(lexical gaps, see :func:`scripts.tsv2lmf.process_lexical_gaps`) are
+recorded separately. Bits are stored little-endian (bit *j* of a
+bitset is bit `j % 8` of byte `j // 8`) in flattened byte arrays:
+
+- `lexicons_offsets`, `lexicons_data`: the lexicon IDs, in build order
+- `ilis_offsets`, `ilis_data`: the sorted ILIs
+- `rows`: one bitset per ILI with a bit per lexicon
+- `columns`: one bitset per lexicon with a bit per ILI
+- `gap_columns`: like `columns`, but for unlexicalized synsets
+
+Both orientations are stored so that questions about an ILI and
+about a lexicon are each answered by converting one bitset to an
+:class:`int` and counting its bits, and a subset of ILIs (such as the
+core ILIs) becomes a mask that is applied to a lexicon's column with
+a single `&`.
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from wn.lmf import Lexicon
+
+from . import arrays
+from .util import PathLike
+
+
+def lexicon_ilis(lexicon: Lexicon) -> tuple[set[str], set[str]]:
+    """Return the lexicalized and unlexicalized ILIs of *lexicon*."""
+    lexicalized: set[str] = set()
+    gaps: set[str] = set()
+    for synset in lexicon.get("synsets", []):
+        ili = synset.get("ili", "")
+        if not ili or ili == "in":
+            continue
+        if synset.get("lexicalized", True):
+            lexicalized.add(ili)
+        else:
+            gaps.add(ili)
+    return lexicalized, gaps - lexicalized
+
+
+def write_coverage(
+    lexicons: dict[str, tuple[set[str], set[str]]],
+    path: PathLike,
+) -> None:
+    """Write the coverage matrix of *lexicons* to *path*.
+
+    The *lexicons* map lexicon IDs to the values returned by
+    :func:`lexicon_ilis`.
+    """
+    arrays.save(path, build_coverage(lexicons))
+
+
+def build_coverage(
+    lexicons: dict[str, tuple[set[str], set[str]]],
+) -> dict[str, arrays.Array]:
+    ilis = sorted(
+        {ili for pair in lexicons.values() for ilis in pair for ili in ilis}
+    )
+    index = {ili: i for i, ili in enumerate(ilis)}
+    row_bytes = _nbytes(len(lexicons))
+    col_bytes = _nbytes(len(ilis))
+    rows = bytearray(row_bytes * len(ilis))
+    columns = bytearray(col_bytes * len(lexicons))
+    gap_columns = bytearray(col_bytes * len(lexicons))
+    for j, (lexicalized, gaps) in enumerate(lexicons.values()):
+        for ili in lexicalized:
+            i = index[ili]
+            rows[i * row_bytes + j // 8] |= 1 << (j % 8)
+            columns[j * col_bytes + i // 8] |= 1 << (i % 8)
+        for ili in gaps:
+            i = index[ili]
+            gap_columns[j * col_bytes + i // 8] |= 1 << (i % 8)
+
+    lexicons_offsets, lexicons_data = arrays.encode_strings(lexicons)
+    ilis_offsets, ilis_data = arrays.encode_strings(ilis)
+    return {
+        "lexicons_offsets": lexicons_offsets,
+        "lexicons_data": lexicons_data,
+        "ilis_offsets": ilis_offsets,
+        "ilis_data": ilis_data,
+        "rows": rows,
+        "columns": columns,
+        "gap_columns": gap_columns,
+    }
+
+
+def _nbytes(nbits: int) -> int:
+    return (nbits + 7) // 8
+
+
+def _bits(n: int) -> list[int]:
+    """Return the positions of the set bits of *n*."""
+    positions = []
+    while n:
+        low = n & -n
+        positions.append(low.bit_length() - 1)
+        n ^= low
+    return positions
+
+
+class Coverage:
+    """Query the matrix written by :func:`write_coverage`.
+
+    Example:
+
+        >>> cov = Coverage("build/omw-2.0.coverage.npz")
+        >>> cov.lexicons_with("i35545")
+        ['omw-fr', 'omw-ja']
+        >>> cov.count("omw-fr", cov.mask(core_ilis))
+        4630
+
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.lexicons = arrays.StringArray(a["lexicons_offsets"], a["lexicons_data"])
+        self.ilis = arrays.StringArray(a["ilis_offsets"], a["ilis_data"])
+        self._lexicon_index = {lexid: j for j, lexid in enumerate(self.lexicons)}
+        self._row_bytes = _nbytes(len(self.lexicons))
+        self._col_bytes = _nbytes(len(self.ilis))
+
+    def __contains__(self, lexid: str) -> bool:
+        return lexid in self._lexicon_index
+
+    def row(self, ili: str) -> int:
+        """Return the bitset of lexicons lexicalizing *ili*."""
+        i = self.ilis.find(ili)
+        if i < 0:
+            return 0
+        start = i * self._row_bytes
+        data = self._arrays["rows"][start:start + self._row_bytes]
+        return int.from_bytes(data, "little")
+
+    def column(self, lexid: str, gaps: bool = False) -> int:
+        """Return the bitset of ILIs lexicalized by *lexid*.
+
+        If *gaps* is true, return the ILIs of its unlexicalized
+        synsets instead.
+        """
+        j = self._lexicon_index[lexid]
+        start = j * self._col_bytes
+        data = self._arrays["gap_columns" if gaps else "columns"]
+        return int.from_bytes(data[start:start + self._col_bytes], "little")
+
+    def mask(self, ilis: Iterable[str]) -> int:
+        """Return a bitset of *ilis* for use with :meth:`count`."""
+        bits = bytearray(self._col_bytes)
+        for ili in ilis:
+            i = self.ilis.find(ili)
+            if i >= 0:
+                bits[i // 8] |= 1 << (i % 8)
+        return int.from_bytes(bits, "little")
+
+    def count(self, lexid: str, mask: int = -1, gaps: bool = False) -> int:
+        """Return the number of ILIs in *mask* lexicalized by *lexid*.
+
+        If *gaps* is true, the ILIs of its unlexicalized synsets are
+        counted as well, i.e., all ILIs with a synset in *lexid*.
+        """
+        column = self.column(lexid)
+        if gaps:
+            column |= self.column(lexid, gaps=True)
+        return (column & mask).bit_count()
+
+    def lexicons_with(self, ili: str) -> list[str]:
+        """Return the IDs of the lexicons lexicalizing *ili*."""
+        return [self.lexicons[j] for j in _bits(self.row(ili))]
+
+    def _rows(self) -> Iterator[int]:
+        rows, size = self._arrays["rows"], self._row_bytes
+        for start in range(0, len(rows), size or 1):
+            yield int.from_bytes(rows[start:start + size], "little")
+
+    def counts(self) -> list[int]:
+        """Return the number of lexicons lexicalizing each ILI."""
+        return [row.bit_count() for row in self._rows()]
+
+    def covered(self, k: int, lexids: Sequence[str] = ()) -> list[str]:
+        """Return the ILIs lexicalized by at least *k* lexicons.
+
+        If *lexids* is given, only those lexicons are counted.
+        """
+        lexmask = -1
+        if lexids:
+            lexmask = sum(1 << self._lexicon_index[lexid] for lexid in set(lexids))
+        return [
+            self.ilis[i]
+            for i, row in enumerate(self._rows())
+            if (row & lexmask).bit_count() >= k
+        ]
@@ -0,0 +1,135 @@
+"""
+Crosswalk between the identifiers of a lexicon's synsets and senses.
+
+Two tables are stored, one row per synset and one per sense, in the
+order of their LMF IDs. Each column is a string array (see
+:class:`scripts.arrays.StringArray`) in row order, and every column
+but the ID has a `<column>_order` array listing the rows sorted by
+that column, so any column can be searched with a binary search. The
+columns are:
+
+- synsets: `synset` (LMF ID), `name` (NLTK-style `lemma.pos.nn`),
+  `offset` (`offset-pos`), `ili`
+- senses: `sense` (LMF ID), `sense_key` (PWN sense key), and
+  `synset_row`, the row of the sense's synset in the synset table
+
+The NLTK-style names and sense keys are taken from the `identifier`
+metadata written by :mod:`scripts.wndb2lmf`; they are empty for
+lexicons without them.
+"""
+
+import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from pathlib import Path
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .util import PathLike
+
+SYNSET_COLUMNS = ("synset", "name", "offset", "ili")
+SENSE_COLUMNS = ("sense", "sense_key")
+
+
+def write_crosswalk(lexicon: Lexicon, directory: Path) -> None:
+    """Write the identifier crosswalk of *lexicon* into *directory*."""
+    path = directory / f"{lexicon['id']}.crosswalk.npz"
+    arrays.save(path, build_crosswalk(lexicon))
+
+
+def build_crosswalk(lexicon: Lexicon) -> dict[str, arrays.Array]:
+    prefix = f"{lexicon['id']}-"
+    synsets = sorted(lexicon.get("synsets", []), key=lambda ss: ss["id"])
+    synset_rows = {ss["id"]: i for i, ss in enumerate(synsets)}
+    senses = sorted(
+        (s for e in lexicon.get("entries", []) for s in e.get("senses", [])),
+        key=lambda s: s["id"],
+    )
+
+    result: dict[str, arrays.Array] = {}
+    _add_columns(result, {
+        "synset": [ss["id"] for ss in synsets],
+        "name": [_identifier(ss) for ss in synsets],
+        "offset": [ss["id"].removeprefix(prefix) for ss in synsets],
+        "ili": [ss.get("ili", "") for ss in synsets],
+    })
+    _add_columns(result, {
+        "sense": [s["id"] for s in senses],
+        "sense_key": [_identifier(s) for s in senses],
+    })
+    result["synset_row"] = array.array("i", [synset_rows[s["synset"]] for s in senses])
+    return result
+
+
+def _identifier(obj) -> str:
+    return (obj.get("meta") or {}).get("identifier") or ""
+
+
+def _add_columns(
+    result: dict[str, arrays.Array],
+    columns: dict[str, list[str]],
+) -> None:
+    for i, (name, values) in enumerate(columns.items()):
+        offsets, data = arrays.encode_strings(values)
+        result[f"{name}_offsets"] = offsets
+        result[f"{name}_data"] = data
+        if i > 0:  # the first column (the ID) is already sorted
+            order = sorted(range(len(values)), key=values.__getitem__)
+            result[f"{name}_order"] = array.array("i", order)
+
+
+class Crosswalk:
+    """Translate identifiers with the table written by :func:`write_crosswalk`.
+
+    Example:
+
+        >>> cw = Crosswalk("omw-en.crosswalk.npz")
+        >>> cw.get("dog%1:05:00::", "sense_key", "name")
+        'dog.n.01'
+        >>> cw.get("dog.n.01", "name", "ili")
+        'i46360'
+
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.columns = {
+            name: arrays.StringArray(a[f"{name}_offsets"], a[f"{name}_data"])
+            for name in (*SYNSET_COLUMNS, *SENSE_COLUMNS)
+        }
+
+    def _row(self, value: str, column: str) -> int:
+        values = self.columns[column]
+        if column in ("synset", "sense"):
+            i = values.find(value)
+        else:
+            i = _find(values, self._arrays[f"{column}_order"], value)
+        if i < 0 or not value:
+            raise KeyError(value)
+        return i
+
+    def get(self, value: str, source: str, target: str) -> str:
+        """Return the *target* identifier for *value* of type *source*.
+
+        Both *source* and *target* are column names. A sense column
+        may be translated to any column, but a synset column only to
+        other synset columns, as a synset has many senses.
+        """
+        if source not in self.columns:
+            raise ValueError(f"invalid source column: {source}")
+        if target not in self.columns:
+            raise ValueError(f"invalid target column: {target}")
+        if source in SYNSET_COLUMNS and target in SENSE_COLUMNS:
+            raise ValueError(f"cannot map {source} to {target}")
+        row = self._row(value, source)
+        if source in SENSE_COLUMNS and target in SYNSET_COLUMNS:
+            row = self._arrays["synset_row"][row]
+        return self.columns[target][row]
+
+
+def _find(values: arrays.StringArray, order: Sequence[int], value: str) -> int:
+    i = bisect_left(order, value, key=values.__getitem__)
+    if i < len(order) and values[order[i]] == value:
+        return order[i]
+    return -1
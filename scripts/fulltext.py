@@ -0,0 +1,220 @@
+"""
+Positional inverted index over synset definitions and examples.
+
+Each definition and example of a synset is a document. Text is
+normalized (NFKC and case-folded) and split into terms of letters
+and digits, except for runs of characters from scripts that are
+written without spaces between words (Chinese, Japanese, Thai, Lao,
+Khmer and Myanmar), which are split into overlapping character
+bigrams. The script of each character decides, not the lexicon's
+language, so mixed-script text is handled. Queries in these scripts
+thus need at least two characters to match within longer runs. The
+index stores:
+
+- `synsets_offsets`, `synsets_data`: the sorted synset IDs
+- `doc_synset`: the synset of each document
+- `doc_kind`: 0 for a definition and 1 for an example
+- `terms_offsets`, `terms_data`: the sorted terms
+- `term_indptr`: the start of each term's postings, with one more
+  item than there are terms
+- `posting_doc`, `posting_position`: the document and term position
+  of each occurrence, sorted by document and then position
+
+The :class:`ReleaseIndex` searches the indexes of every package in a
+release build directory at once.
+"""
+
+import array
+import re
+import unicodedata
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Optional
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .util import PathLike
+
+DEFINITION = 0
+EXAMPLE = 1
+
+_UNSEGMENTED = (
+    "\u0e00-\u0eff"  # Thai, Lao
+    "\u1000-\u109f"  # Myanmar
+    "\u1780-\u17ff"  # Khmer
+    "\u3040-\u30ff"  # Hiragana, Katakana
+    "\u3400-\u4dbf"  # CJK Unified Ideographs Extension A
+    "\u4e00-\u9fff"  # CJK Unified Ideographs
+    "\uf900-\ufaff"  # CJK Compatibility Ideographs
+    "\U00020000-\U0003134f"  # CJK Unified Ideographs Extensions B-G
+)
+_TOKEN = re.compile(f"([{_UNSEGMENTED}]+)|[^\\W_{_UNSEGMENTED}]+")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Yield the terms of *text* in order."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    for m in _TOKEN.finditer(text):
+        run = m.group(1)
+        if run is None:
+            yield m.group()
+        elif len(run) == 1:
+            yield run
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2]
+
+
+def write_fulltext_index(lexicon: Lexicon, directory: Path) -> None:
+    """Write the full-text index of *lexicon* into *directory*."""
+    path = directory / f"{lexicon['id']}.fulltext.npz"
+    arrays.save(path, build_fulltext_index(lexicon))
+
+
+def build_fulltext_index(lexicon: Lexicon) -> dict[str, arrays.Array]:
+    synsets = sorted(lexicon.get("synsets", []), key=lambda ss: ss["id"])
+    doc_synset = array.array("i")
+    doc_kind = array.array("B")
+    postings: dict[str, list[tuple[int, int]]] = {}
+    for i, synset in enumerate(synsets):
+        texts = [(DEFINITION, d["text"]) for d in synset.get("definitions", [])]
+        texts.extend((EXAMPLE, ex["text"]) for ex in synset.get("examples", []))
+        for kind, text in texts:
+            doc = len(doc_synset)
+            doc_synset.append(i)
+            doc_kind.append(kind)
+            for position, term in enumerate(tokenize(text)):
+                postings.setdefault(term, []).append((doc, position))
+
+    terms = sorted(postings)
+    term_indptr = array.array("q", [0])
+    posting_doc = array.array("i")
+    posting_position = array.array("i")
+    for term in terms:
+        for doc, position in postings[term]:
+            posting_doc.append(doc)
+            posting_position.append(position)
+        term_indptr.append(len(posting_doc))
+
+    synsets_offsets, synsets_data = arrays.encode_strings(ss["id"] for ss in synsets)
+    terms_offsets, terms_data = arrays.encode_strings(terms)
+    return {
+        "synsets_offsets": synsets_offsets,
+        "synsets_data": synsets_data,
+        "doc_synset": doc_synset,
+        "doc_kind": doc_kind,
+        "terms_offsets": terms_offsets,
+        "terms_data": terms_data,
+        "term_indptr": term_indptr,
+        "posting_doc": posting_doc,
+        "posting_position": posting_position,
+    }
+
+
+class FullTextIndex:
+    """Query the index written by :func:`write_fulltext_index`.
+
+    Example:
+
+        >>> index = FullTextIndex("omw-en.fulltext.npz")
+        >>> index.search("domesticated canid", phrase=True)
+        ['omw-en-02084071-n']
+
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.synsets = arrays.StringArray(a["synsets_offsets"], a["synsets_data"])
+        self.terms = arrays.StringArray(a["terms_offsets"], a["terms_data"])
+
+    def _postings(self, term: str) -> dict[int, set[int]]:
+        i = self.terms.find(term)
+        if i < 0:
+            return {}
+        a = self._arrays
+        start, end = a["term_indptr"][i], a["term_indptr"][i + 1]
+        positions: dict[int, set[int]] = {}
+        for doc, position in zip(
+            a["posting_doc"][start:end], a["posting_position"][start:end]
+        ):
+            positions.setdefault(doc, set()).add(position)
+        return positions
+
+    def documents(
+        self,
+        query: str,
+        phrase: bool = False,
+        kind: Optional[int] = None,
+    ) -> list[int]:
+        """Return the documents containing every term of *query*.
+
+        If *phrase* is true, the terms must also be consecutive. If
+        *kind* is :data:`DEFINITION` or :data:`EXAMPLE`, only
+        documents of that kind are returned.
+        """
+        terms = list(tokenize(query))
+        if not terms:
+            return []
+        # start positions of matches in each candidate document
+        matches = self._postings(terms[0])
+        for offset, term in enumerate(terms[1:], 1):
+            postings = self._postings(term)
+            if phrase:
+                matches = {
+                    doc: starts
+                    for doc, starts in (
+                        (doc, {s for s in starts if s + offset in postings[doc]})
+                        for doc, starts in matches.items() if doc in postings
+                    )
+                    if starts
+                }
+            else:
+                matches = {doc: s for doc, s in matches.items() if doc in postings}
+            if not matches:
+                break
+        docs = sorted(matches)
+        if kind is not None:
+            docs = [doc for doc in docs if self._arrays["doc_kind"][doc] == kind]
+        return docs
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        kind: Optional[int] = None,
+    ) -> list[str]:
+        """Return the IDs of synsets with a document matching *query*.
+
+        See :meth:`documents` for the arguments.
+        """
+        doc_synset = self._arrays["doc_synset"]
+        ids = dict.fromkeys(
+            doc_synset[doc] for doc in self.documents(query, phrase=phrase, kind=kind)
+        )
+        return [self.synsets[i] for i in ids]
+
+
+class ReleaseIndex:
+    """Search the full-text indexes of all packages under *directory*."""
+
+    def __init__(self, directory: PathLike):
+        paths = sorted(Path(directory).glob("**/*.fulltext.npz"))
+        self.indexes = {
+            path.name.removesuffix(".fulltext.npz"): FullTextIndex(path)
+            for path in paths
+        }
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        kind: Optional[int] = None,
+    ) -> dict[str, list[str]]:
+        """Return the matching synset IDs of each lexicon with any."""
+        results: dict[str, list[str]] = {}
+        for lexid, index in self.indexes.items():
+            ids = index.search(query, phrase=phrase, kind=kind)
+            if ids:
+                results[lexid] = ids
+        return results
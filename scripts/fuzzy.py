@@ -0,0 +1,177 @@
+"""
+Character n-gram index of a lexicon's word forms for fuzzy lookup.
+
+Each lemma and other written form of a lexical entry is indexed
+normalized (see :func:`scripts.prefix.normalize`) and also with its
+diacritics folded (see :func:`scripts.util.fold_diacritics`), so
+`cafe` finds `café`. Each such term is split into character trigrams
+padded at both ends. A query collects the terms sharing enough
+trigrams with it to possibly be within the maximum edit distance, as
+each edit changes at most :data:`N` trigrams, and only these
+candidates are verified with :func:`scripts.util.edit_distance`.
+Candidates must share at least one trigram, so very short terms with
+no characters in common with the query are not found.
+
+The index stores:
+
+- `terms_offsets`, `terms_data`: the sorted terms
+- `term_length`: the length of each term in characters
+- `term_indptr`, `term_entry`: the entries of each term, as indexes
+  of the sorted entry IDs in `entries_offsets` and `entries_data`
+- `grams_offsets`, `grams_data`: the sorted trigrams
+- `gram_indptr`, `gram_term`: the terms containing each trigram
+"""
+
+import array
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Optional
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .prefix import normalize
+from .util import PathLike, edit_distance, fold_diacritics
+
+N = 3
+START = "\x02"
+END = "\x03"
+
+
+def ngrams(term: str) -> set[str]:
+    """Return the distinct padded character n-grams of *term*."""
+    padded = f"{START}{term}{END}"
+    return {padded[i:i + N] for i in range(max(1, len(padded) - N + 1))}
+
+
+def _terms(form: str) -> set[str]:
+    normalized = normalize(form)
+    return {normalized, fold_diacritics(normalized)}
+
+
+def write_ngram_index(lexicon: Lexicon, directory: Path) -> None:
+    """Write the n-gram index of *lexicon* into *directory*."""
+    path = directory / f"{lexicon['id']}.ngrams.npz"
+    arrays.save(path, build_ngram_index(lexicon))
+
+
+def build_ngram_index(lexicon: Lexicon) -> dict[str, arrays.Array]:
+    term_entries: dict[str, set[str]] = {}
+    for entry in lexicon.get("entries", []):
+        forms = [entry["lemma"]["writtenForm"]]
+        forms.extend(form["writtenForm"] for form in entry.get("forms", []))
+        for form in forms:
+            for term in _terms(form):
+                term_entries.setdefault(term, set()).add(entry["id"])
+
+    terms = sorted(term_entries)
+    entry_ids = sorted({id for ids in term_entries.values() for id in ids})
+    entry_index = {id: i for i, id in enumerate(entry_ids)}
+    gram_terms: dict[str, list[int]] = {}
+    for i, term in enumerate(terms):
+        for gram in ngrams(term):
+            gram_terms.setdefault(gram, []).append(i)
+    grams = sorted(gram_terms)
+
+    term_indptr, term_entry = _csr(
+        (sorted(entry_index[id] for id in term_entries[term]) for term in terms)
+    )
+    gram_indptr, gram_term = _csr(gram_terms[gram] for gram in grams)
+    terms_offsets, terms_data = arrays.encode_strings(terms)
+    entries_offsets, entries_data = arrays.encode_strings(entry_ids)
+    grams_offsets, grams_data = arrays.encode_strings(grams)
+    return {
+        "terms_offsets": terms_offsets,
+        "terms_data": terms_data,
+        "term_length": array.array("i", map(len, terms)),
+        "term_indptr": term_indptr,
+        "term_entry": term_entry,
+        "entries_offsets": entries_offsets,
+        "entries_data": entries_data,
+        "grams_offsets": grams_offsets,
+        "grams_data": grams_data,
+        "gram_indptr": gram_indptr,
+        "gram_term": gram_term,
+    }
+
+
+def _csr(rows: Iterable[Iterable[int]]) -> tuple[array.array, array.array]:
+    indptr = array.array("q", [0])
+    indices = array.array("i")
+    for row in rows:
+        indices.extend(row)
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+class NgramIndex:
+    """Query the index written by :func:`write_ngram_index`.
+
+    Example:
+
+        >>> index = NgramIndex("omw-fr.ngrams.npz")
+        >>> index.search("chatt", max_distance=1, limit=1)
+        [('chat', 1)]
+
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.terms = arrays.StringArray(a["terms_offsets"], a["terms_data"])
+        self.entries = arrays.StringArray(a["entries_offsets"], a["entries_data"])
+        self.grams = arrays.StringArray(a["grams_offsets"], a["grams_data"])
+
+    def candidates(self, query: str, max_distance: int) -> list[int]:
+        """Return the indexes of terms that may be near *query*."""
+        grams = ngrams(query)
+        threshold = max(1, len(grams) - max_distance * N)
+        indptr, term = self._arrays["gram_indptr"], self._arrays["gram_term"]
+        length = self._arrays["term_length"]
+        shared: dict[int, int] = {}
+        for gram in grams:
+            i = self.grams.find(gram)
+            if i >= 0:
+                for t in term[indptr[i]:indptr[i + 1]]:
+                    shared[t] = shared.get(t, 0) + 1
+        return [
+            t for t, count in shared.items()
+            if count >= threshold and abs(length[t] - len(query)) <= max_distance
+        ]
+
+    def search(
+        self,
+        query: str,
+        max_distance: int = 2,
+        limit: Optional[int] = None,
+    ) -> list[tuple[str, int]]:
+        """Return the terms within *max_distance* edits of *query*.
+
+        The (term, distance) pairs are sorted by distance then term.
+        """
+        results: dict[str, int] = {}
+        for q in _terms(query):
+            for t in self.candidates(q, max_distance):
+                term = self.terms[t]
+                distance = edit_distance(q, term, max_distance)
+                if distance <= max_distance:
+                    results[term] = min(distance, results.get(term, distance))
+        ranked = sorted(results.items(), key=lambda item: (item[1], item[0]))
+        return ranked[:limit]
+
+    def lookup(
+        self,
+        query: str,
+        max_distance: int = 2,
+        limit: Optional[int] = None,
+    ) -> list[str]:
+        """Return the IDs of entries with a form near *query*.
+
+        Entries are ordered by the distance of their nearest form.
+        """
+        indptr, entry = self._arrays["term_indptr"], self._arrays["term_entry"]
+        ids: dict[str, None] = {}
+        for term, _ in self.search(query, max_distance):
+            t = self.terms.find(term)
+            for e in entry[indptr[t]:indptr[t + 1]]:
+                ids[self.entries[e]] = None
+        return list(ids)[:limit]
@@ -0,0 +1,185 @@
+"""
+Information content tables computed from sense counts.
+
+The tag counts on senses (from `cntlist` in WNDB sources) are summed
+per synset and added to every distinct hypernym of the synset, so
+synsets reachable through more than one path are counted once. The
+table stores, per synset:
+
+- the synset's own frequency
+- its cumulative frequency (itself and all hyponyms, transitively)
+- the number of synsets it subsumes, including itself
+
+Add-*k* smoothing adds *k* to the frequency of every synset before
+propagation, so the smoothed cumulative frequency is
+`cumulative + k * subsumed`. That allows the smoothing to be chosen
+at query time without another pass over the hierarchy; the
+information content for :data:`DEFAULT_SMOOTHING` is also stored
+directly. Probabilities are relative to the total frequency of the
+synsets with the same part of speech.
+"""
+
+import array
+import math
+from pathlib import Path
+from typing import Optional
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .taxonomy import HypernymGraph, SimilarityIndex, _Index
+from .util import PathLike
+
+DEFAULT_SMOOTHING = 1.0
+
+
+def write_information_content(lexicon: Lexicon, directory: Path) -> None:
+    """Write the information content table of *lexicon* into *directory*."""
+    graph = HypernymGraph(lexicon)
+    path = directory / f"{lexicon['id']}.ic.npz"
+    arrays.save(path, build_information_content(graph, synset_counts(lexicon)))
+
+
+def synset_counts(lexicon: Lexicon) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for entry in lexicon.get("entries", []):
+        for sense in entry.get("senses", []):
+            value = sum(count["value"] for count in sense.get("counts", []))
+            counts[sense["synset"]] = counts.get(sense["synset"], 0) + value
+    return counts
+
+
+def build_information_content(
+    graph: HypernymGraph,
+    counts: dict[str, int],
+    smoothing: float = DEFAULT_SMOOTHING,
+) -> dict[str, arrays.Array]:
+    own = [float(counts.get(ssid, 0)) for ssid in graph.ids]
+    cumulative = list(own)
+    subsumed = [1] * len(graph)
+    for i, ancestors in enumerate(graph.ancestor_distances()):
+        for a in ancestors:
+            cumulative[a] += own[i]
+            subsumed[a] += 1
+
+    totals: dict[str, float] = {}
+    sizes: dict[str, int] = {}
+    for pos, freq in zip(graph.pos, own):
+        totals[pos] = totals.get(pos, 0.0) + freq
+        sizes[pos] = sizes.get(pos, 0) + 1
+
+    ic = array.array("d")
+    for i, pos in enumerate(graph.pos):
+        ic.append(
+            _information_content(
+                cumulative[i] + smoothing * subsumed[i],
+                totals[pos] + smoothing * sizes[pos],
+            )
+        )
+
+    ids_offsets, ids_data = arrays.encode_strings(graph.ids)
+    return {
+        "ids_offsets": ids_offsets,
+        "ids_data": ids_data,
+        "pos": "".join(graph.pos).encode("ascii"),
+        "own": array.array("d", own),
+        "cumulative": array.array("d", cumulative),
+        "subsumed": array.array("i", subsumed),
+        "ic": ic,
+        "smoothing": array.array("d", [smoothing]),
+        "total_pos": "".join(totals).encode("ascii"),
+        "total": array.array("d", totals.values()),
+        "total_size": array.array("i", sizes.values()),
+    }
+
+
+def _information_content(frequency: float, total: float) -> float:
+    if frequency == 0 or total == 0:
+        return math.inf
+    return -math.log(frequency / total)
+
+
+class InformationContent(_Index):
+    """Query the table written by :func:`write_information_content`."""
+
+    def __init__(self, path: PathLike):
+        super().__init__(path)
+        a = self._arrays
+        self.smoothing = a["smoothing"][0]
+        total_pos = bytes(a["total_pos"]).decode("ascii")
+        self._totals = dict(zip(total_pos, zip(a["total"], a["total_size"])))
+
+    def frequency(self, synset_id: str, smoothing: Optional[float] = None) -> float:
+        """Return the cumulative frequency of *synset_id*."""
+        if smoothing is None:
+            smoothing = self.smoothing
+        i = self._index(synset_id)
+        return self._arrays["cumulative"][i] + smoothing * self._arrays["subsumed"][i]
+
+    def information_content(
+        self,
+        synset_id: str,
+        smoothing: Optional[float] = None,
+    ) -> float:
+        """Return the information content of *synset_id*.
+
+        The result is infinite for synsets with a frequency of zero.
+        """
+        if smoothing is None or smoothing == self.smoothing:
+            return self._arrays["ic"][self._index(synset_id)]
+        pos = chr(self._arrays["pos"][self._index(synset_id)])
+        total, size = self._totals[pos]
+        return _information_content(
+            self.frequency(synset_id, smoothing), total + smoothing * size
+        )
+
+
+# Similarity Measures ##################################################
+
+# These follow the NLTK's definitions and use the similarity sidecar of
+# the same lexicon (see scripts.taxonomy.SimilarityIndex) for common
+# hypernyms.
+
+def resnik_similarity(
+    index: SimilarityIndex,
+    ic: InformationContent,
+    a: str,
+    b: str,
+) -> Optional[float]:
+    common = index.common_hypernyms(a, b)
+    if not common:
+        return None
+    return max(ic.information_content(c) for c in common)
+
+
+def lin_similarity(
+    index: SimilarityIndex,
+    ic: InformationContent,
+    a: str,
+    b: str,
+) -> Optional[float]:
+    subsumer = resnik_similarity(index, ic, a, b)
+    if subsumer is None:
+        return None
+    ic_a, ic_b = ic.information_content(a), ic.information_content(b)
+    if math.isinf(ic_a) or math.isinf(ic_b):
+        return 0.0
+    return (2 * subsumer) / (ic_a + ic_b)
+
+
+def jcn_similarity(
+    index: SimilarityIndex,
+    ic: InformationContent,
+    a: str,
+    b: str,
+) -> Optional[float]:
+    subsumer = resnik_similarity(index, ic, a, b)
+    if subsumer is None:
+        return None
+    ic_a, ic_b = ic.information_content(a), ic.information_content(b)
+    if math.isinf(ic_a) or math.isinf(ic_b):
+        return 0.0
+    distance = ic_a + ic_b - 2 * subsumer
+    if distance == 0:
+        return math.inf
+    return 1 / distance
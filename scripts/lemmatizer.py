@@ -0,0 +1,110 @@
+"""
+Reverse lookup table from inflected forms to lemmas.
+
+This precomputes what :class:`wn.morphy.Morphy` does for each query:
+every lemma, every exceptional form (from the `*.exc` files in WNDB
+sources) and every form that a detachment rule would reduce to a
+lemma of the same part of speech is stored with its candidate lemmas,
+so lemmatizing a word is a single binary search over a sorted table
+instead of repeated rule application. The table stores:
+
+- `forms_offsets`, `forms_data`: the sorted, lowercased surface forms
+- `lemmas_offsets`, `lemmas_data`: the sorted lemmas
+- `indptr`: the start of each form's candidates in the arrays below,
+  with one more item than there are forms
+- `lemma`: the index of each candidate lemma
+- `pos`: the part of speech of each candidate lemma (ASCII)
+
+Forms are matched case-insensitively but lemmas keep the case of the
+lexicon, so `paris` yields `Paris`.
+"""
+
+import array
+from pathlib import Path
+from typing import Optional
+
+from wn.lmf import Lexicon
+from wn.morphy import DETACHMENT_RULES
+
+from . import arrays
+from .util import PathLike
+
+
+def write_lemmatizer(lexicon: Lexicon, directory: Path) -> None:
+    """Write the lemmatizer table of *lexicon* into *directory*."""
+    path = directory / f"{lexicon['id']}.lemmatizer.npz"
+    arrays.save(path, build_lemmatizer(lexicon))
+
+
+def build_lemmatizer(lexicon: Lexicon) -> dict[str, arrays.Array]:
+    candidates: dict[str, set[tuple[str, str]]] = {}
+
+    def add(form: str, pos: str, lemma: str) -> None:
+        candidates.setdefault(form, set()).add((pos, lemma))
+
+    for entry in lexicon.get("entries", []):
+        lemma = entry["lemma"]["writtenForm"]
+        pos = entry["lemma"]["partOfSpeech"]
+        key = lemma.lower()
+        add(key, pos, lemma)
+        for form in entry.get("forms", []):
+            add(form["writtenForm"].lower(), pos, lemma)
+        # a rule maps form -> lemma when form is stem + suffix and
+        # lemma is stem + replacement, for a non-empty stem
+        for suffix, replacement, *_ in DETACHMENT_RULES.get(pos, []):
+            if key.endswith(replacement):
+                stem = key[:len(key) - len(replacement)]
+                if stem:
+                    add(stem + suffix, pos, lemma)
+
+    lemmas = sorted({lemma for pairs in candidates.values() for _, lemma in pairs})
+    index = {lemma: i for i, lemma in enumerate(lemmas)}
+    forms = sorted(candidates)
+    indptr = array.array("q", [0])
+    lemma_indices = array.array("i")
+    pos_codes = bytearray()
+    for form in forms:
+        for pos, lemma in sorted(candidates[form]):
+            lemma_indices.append(index[lemma])
+            pos_codes.extend(pos.encode("ascii"))
+        indptr.append(len(lemma_indices))
+
+    forms_offsets, forms_data = arrays.encode_strings(forms)
+    lemmas_offsets, lemmas_data = arrays.encode_strings(lemmas)
+    return {
+        "forms_offsets": forms_offsets,
+        "forms_data": forms_data,
+        "lemmas_offsets": lemmas_offsets,
+        "lemmas_data": lemmas_data,
+        "indptr": indptr,
+        "lemma": lemma_indices,
+        "pos": pos_codes,
+    }
+
+
+class Lemmatizer:
+    """Query the table written by :func:`write_lemmatizer`.
+
+    Instances are callable like :class:`wn.morphy.Morphy` and so may
+    be given as the *lemmatizer* of a :class:`wn.Wordnet`.
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.forms = arrays.StringArray(a["forms_offsets"], a["forms_data"])
+        self.lemmas = arrays.StringArray(a["lemmas_offsets"], a["lemmas_data"])
+
+    def __call__(self, form: str, pos: Optional[str] = None) -> dict[str, set[str]]:
+        """Return the candidate lemmas of *form* by part of speech."""
+        result: dict[str, set[str]] = {}
+        i = self.forms.find(form.lower())
+        if i < 0:
+            return result
+        indptr, lemma, pos_codes = (
+            self._arrays["indptr"], self._arrays["lemma"], self._arrays["pos"]
+        )
+        for j in range(indptr[i], indptr[i + 1]):
+            _pos = chr(pos_codes[j])
+            if pos is None or _pos == pos:
+                result.setdefault(_pos, set()).add(self.lemmas[lemma[j]])
+        return result
@@ -0,0 +1,344 @@
+"""
+Check OMW TSV files for problems that would make tsv2lmf.py skip or
+misread rows.
+
+Usage:
+
+    python -m scripts.lint [PATH ...]
+
+Each PATH is a TSV file or a directory searched for `wn-*.tab` files
+(which may be compressed); the default is `wns/`. The files are
+checked in parallel and every problem is written to stdout as a line
+of JSON with the keys `path`, `line`, `severity` (`error` or
+`warning`), `code`, and `message`, e.g.:
+
+    {"path": "wns/fra/wn-data-fra.tab", "line": 12, "severity": "error",
+     "code": "order", "message": "def row without an integer order"}
+
+The codes are:
+
+- `header`: the first line is not `# label<TAB>lang<TAB>url<TAB>license`
+  (the rest of the file is not checked)
+- `offset-pos`: the first column is not an offset-pos like `00001740-n`
+- `type`: the row type (second column) is not known for the file's
+  language (a warning, as tsv2lmf.py ignores such rows)
+- `columns`: wrong number of columns for the row type, or an empty
+  lemma or text
+- `order`: a `def` or `exe` row without an integer order
+- `count`: a `count` row without an integer count
+- `grouping`: a wordform (`lemma:root`, `lemma:brokenplural`) not
+  after a lemma of its synset, or a `count` or `pron` row not after
+  a lemma row for the same lemma
+- `offset`: the offset-pos is not a synset of WordNet 3.0 (only with
+  `--pwn30`; reported on the first line of each offset-pos)
+- `ili`: a synset of a columnar synsets table given with `--synsets`
+  has a different ILI than the synset with the same offset-pos in
+  another lexicon (the line is the table row)
+
+`--pwn30` takes the ILI map (`etc/cili/ili-map-pwn30.tab`) or a
+WordNet 3.0 WNDB directory, from which the valid offsets are loaded
+once into a bitmap (see :mod:`scripts.offsets`).
+
+The exit status is 1 if there are errors.
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from . import compression, offsets, tabfile
+
+log = logging.getLogger("lint")
+
+ERROR = "error"
+WARNING = "warning"
+
+HEADER = re.compile(r"#?[^\t]*\t[^\t]+\t[^\t]*\t[^\t]*")
+OFFSET_POS = re.compile(r"\d{8}-[nvasr]")
+
+# the grammar of each row type's columns after the offset-pos and type
+_FIELD = r"[^\t]*\S[^\t]*"  # not empty
+ROW_GRAMMAR: dict[str, re.Pattern[str]] = {
+    "lemma": re.compile(_FIELD),
+    "lemma:root": re.compile(_FIELD),
+    "lemma:brokenplural": re.compile(_FIELD),
+    "count": re.compile(rf"{_FIELD}\t\s*\d+\s*"),
+    "pron": re.compile(rf"{_FIELD}(?:\t[^\t]*){{1,4}}"),
+    "def": re.compile(rf"-?\d+\t{_FIELD}"),
+    "exe": re.compile(rf"-?\d+\t{_FIELD}"),
+}
+WORDFORMS = ("lemma:root", "lemma:brokenplural")
+
+
+class Problem(NamedTuple):
+    path: str
+    line: int
+    severity: str
+    code: str
+    message: str
+
+
+def find_files(paths: Iterable[Path]) -> list[Path]:
+    """Return the TSV files at or under *paths*."""
+    suffixes = (".tab", *(f".tab{suffix}" for suffix in compression.SUFFIXES))
+    files: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(
+                p for p in sorted(path.rglob("wn-*.tab*"))
+                if p.name.endswith(suffixes)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def check_file(
+    path: Path,
+    bitmap: Optional[offsets.OffsetBitmap] = None,
+) -> list[Problem]:
+    """Return the problems in the TSV file at *path*.
+
+    If *bitmap* is given, the offset-pos IDs are checked against it.
+    """
+    first_lines: dict[str, int] = {}
+    problems = list(_check(path, first_lines))
+    if bitmap is not None:
+        for offset_pos in bitmap.missing(first_lines):
+            problems.append(Problem(
+                str(path),
+                first_lines[offset_pos],
+                ERROR,
+                "offset",
+                f"{offset_pos} is not a synset of WordNet 3.0",
+            ))
+        problems.sort(key=lambda problem: problem.line)
+    return problems
+
+
+def _check(path: Path, first_lines: dict[str, int]) -> Iterator[Problem]:
+    name = str(path)
+    header = tabfile.read_header(path)
+    if not HEADER.fullmatch(header.strip()):
+        # tsv2lmf.py cannot load the file at all
+        yield Problem(name, 1, ERROR, "header", f"invalid header: {header!r}")
+        return
+    language = header.split("\t")[1].strip()
+    prefix = f"{language}:"
+    prev_pwn_id = prev_lemma = ""
+    for lineno, line in tabfile.lines(path):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        pwn_id, _, rest = line.partition("\t")
+        type_, _, args = rest.partition("\t")
+        pwn_id = pwn_id.strip()
+        if not OFFSET_POS.fullmatch(pwn_id):
+            yield Problem(
+                name, lineno, ERROR, "offset-pos", f"invalid offset-pos: {pwn_id!r}"
+            )
+            continue
+        if pwn_id not in first_lines:
+            first_lines[pwn_id] = lineno
+        type_ = type_.strip().removeprefix(prefix)
+        grammar = ROW_GRAMMAR.get(type_)
+        if grammar is None:
+            yield Problem(
+                name, lineno, WARNING, "type", f"unknown row type: {type_!r}"
+            )
+            continue
+        if not grammar.fullmatch(args):
+            yield _column_problem(name, lineno, type_, args)
+            continue
+
+        lemma = args.partition("\t")[0].strip().replace("_", " ")
+        if type_ == "lemma":
+            prev_lemma = lemma
+        elif type_ in WORDFORMS:
+            if pwn_id != prev_pwn_id or not prev_lemma:
+                yield Problem(
+                    name,
+                    lineno,
+                    ERROR,
+                    "grouping",
+                    f"wordform {lemma!r} is not grouped with a lemma of {pwn_id}",
+                )
+        elif type_ in ("count", "pron"):
+            if lemma != prev_lemma:
+                yield Problem(
+                    name,
+                    lineno,
+                    ERROR,
+                    "grouping",
+                    f"{type_} for {lemma!r} does not follow its lemma row",
+                )
+        prev_pwn_id = pwn_id
+
+
+def _column_problem(path: str, lineno: int, type_: str, args: str) -> Problem:
+    fields = args.split("\t")
+    if type_ in ("def", "exe") and len(fields) == 2 and fields[1].strip():
+        return Problem(
+            path, lineno, ERROR, "order", f"{type_} row without an integer order"
+        )
+    if type_ == "count" and len(fields) == 2 and fields[0].strip():
+        return Problem(
+            path, lineno, ERROR, "count", "count row without an integer count"
+        )
+    return Problem(
+        path,
+        lineno,
+        ERROR,
+        "columns",
+        f"invalid columns for {type_} row: {args!r}",
+    )
+
+
+def check_synsets(
+    path: Path,
+    bitmap: Optional[offsets.OffsetBitmap] = None,
+    exclude: Iterable[str] = (),
+) -> list[Problem]:
+    """Return the ILI conflicts and unknown offsets of a synsets table.
+
+    The lexicons of the columnar synsets table at *path* whose IDs
+    match a pattern in *exclude* are not checked.
+    """
+    conflicts, missing = offsets.check_synsets_table(path, bitmap, exclude)
+    problems = [
+        Problem(
+            str(path),
+            row + 1,
+            ERROR,
+            "offset",
+            f"{synset_id} is not a synset of WordNet 3.0",
+        )
+        for row, synset_id in missing
+    ]
+    problems.extend(
+        Problem(
+            str(path),
+            c.row + 1,
+            ERROR,
+            "ili",
+            f"{c.offset_pos} is {c.ili} in {c.lexicon} "
+            f"but {c.other_ili} in {c.other_lexicon}",
+        )
+        for c in conflicts
+    )
+    problems.sort(key=lambda problem: problem.line)
+    return problems
+
+
+def lint(
+    paths: Iterable[Path],
+    processes: Optional[int] = None,
+    bitmap: Optional[offsets.OffsetBitmap] = None,
+) -> Iterator[Problem]:
+    """Yield the problems of the TSV files at or under *paths*.
+
+    Files are checked by up to *processes* worker processes (by
+    default, one per CPU) and their problems are yielded in the order
+    of the files. If *bitmap* is given, the offset-pos IDs are checked
+    against it.
+    """
+    files = find_files(paths)
+    if processes == 1 or len(files) < 2:
+        for path in files:
+            yield from check_file(path, bitmap)
+        return
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(bitmap,),
+    ) as executor:
+        for problems in executor.map(_check_file, files, chunksize=16):
+            yield from problems
+
+
+# the bitmap is sent to each worker once, not with each file
+_bitmap: Optional[offsets.OffsetBitmap] = None
+
+
+def _init_worker(bitmap: Optional[offsets.OffsetBitmap]) -> None:
+    global _bitmap
+    _bitmap = bitmap
+
+
+def _check_file(path: Path) -> list[Problem]:
+    return check_file(path, _bitmap)
+
+
+def main(args: argparse.Namespace) -> int:
+    bitmap = None
+    if args.pwn30:
+        bitmap = offsets.OffsetBitmap.from_path(args.pwn30)
+        log.info("Loaded %d WordNet 3.0 synsets from %s", len(bitmap), args.pwn30)
+    problems: Iterable[Problem] = lint(
+        args.PATH or [Path("wns")], processes=args.processes, bitmap=bitmap
+    )
+    if args.synsets:
+        problems = chain(problems, check_synsets(args.synsets, bitmap, args.exclude))
+    errors = warnings = 0
+    for problem in problems:
+        if problem.severity == ERROR:
+            errors += 1
+        elif args.errors_only:
+            continue
+        else:
+            warnings += 1
+        print(json.dumps(problem._asdict(), ensure_ascii=False))
+    log.info("%d errors, %d warnings", errors, warnings)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check OMW TSV files")
+    parser.add_argument(
+        "PATH",
+        nargs="*",
+        type=Path,
+        help="TSV file or directory of wn-*.tab files (default: wns/)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--pwn30",
+        type=Path,
+        metavar="PATH",
+        help="check offsets against an ILI map file or WordNet 3.0 WNDB directory",
+    )
+    parser.add_argument(
+        "--synsets",
+        type=Path,
+        metavar="TABLE",
+        help="cross-check the ILIs of a columnar synsets table (e.g., "
+             "build/omw-2.0.synsets.npz)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="skip lexicons matching PATTERN in --synsets; may be repeated",
+    )
+    parser.add_argument(
+        "--errors-only",
+        action="store_true",
+        help="do not report warnings",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(args))
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+
+"""WN-LMF to WNDB converter
+
+Usage example:
+
+$ python -m scripts.lmf2wndb build/omw-2.0/omw-fr/omw-fr.xml omw-fr-dict/
+
+Writes the `data.*`, `index.*`, `index.sense`, `cntlist`, and `*.exc`
+files of a WNDB database, so lexicons can be read by tools using the
+byte offsets of WNDB data files for random access. In-memory lexicons
+from `tsv2lmf.py` or `wndb2lmf.py` can be written with the `wndb`
+sidecar (see `scripts/sidecars.py`) instead of being loaded again.
+
+Offsets are computed in two passes: the records of all data files are
+first formatted to find their lengths (which do not depend on the
+offsets as they are written with a fixed width), then written with
+the offsets of pointer targets filled in.
+
+Some information is not representable in WNDB and is dropped with a
+log message:
+
+- synsets without senses and synsets of other parts of speech than
+  nouns, verbs, adjectives, and adverbs
+- relations with no WNDB pointer symbol
+- relations to synsets or senses that are not written
+
+Synsets without a lexicographer file are assigned the first one of
+their part of speech (e.g., `noun.Tops`) in which none of their
+lemmas has 16 senses yet, as the lex_id that distinguishes the senses
+of a lemma in a lexicographer file is a single hex digit. The senses
+of a lemma that do not fit in any lexicographer file of their part of
+speech (e.g., a verb with more than 240 senses) are skipped. Sense
+keys stored as sense identifiers (as by `wndb2lmf.py`) are reused;
+others are created from the lemma, lexicographer file, and lex_id.
+
+"""
+
+import argparse
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+
+from wn.constants import LEXICOGRAPHER_FILES
+from wn.lmf import Lexicon, Sense, Synset, load
+
+from . import wndb
+
+log = logging.getLogger("lmf2wndb")
+
+# the data and index file of each synset type
+FILE_POS = {"n": "n", "v": "v", "a": "a", "s": "a", "r": "r"}
+
+# for synsets without a lexicographer file
+DEFAULT_LEXFILES = {
+    "n": "noun.Tops",
+    "v": "verb.body",
+    "a": "adj.all",
+    "s": "adj.all",
+    "r": "adv.all",
+}
+
+# the lexicographer file numbers of each synset type, default first
+POS_LEXFILES = {
+    ss_type: sorted(
+        (
+            num for name, num in LEXICOGRAPHER_FILES.items()
+            if name.split(".")[0] == default.split(".")[0]
+        ),
+        key=lambda num, default=default: (num != LEXICOGRAPHER_FILES[default], num),
+    )
+    for ss_type, default in DEFAULT_LEXFILES.items()
+}
+
+# lex_ids are written as one hex digit
+MAX_LEX_ID = 15
+
+# "similar" is written with "&" for adjectives and "$" for verbs
+_POINTER_SYMBOLS = {relname: sym for sym, relname in wndb.POINTER_MAP.items()}
+_SS_TYPE_INDEX = {ss_type: idx for idx, ss_type in wndb.SS_TYPE_MAP.items()}
+_FRAME_ID = re.compile(r"frame-(\d+)$")
+
+
+# Main Function ########################################################
+
+
+def main(args):
+    resource = load(args.SRC)
+    lexicons = resource["lexicons"]
+    if args.lexicon:
+        lexicons = [lex for lex in lexicons if lex["id"] == args.lexicon]
+    if len(lexicons) != 1:
+        raise wndb.WNDBError("specify one lexicon with --lexicon")
+    destination = Path(args.DEST)
+    destination.mkdir(parents=True, exist_ok=True)
+    write_wndb(lexicons[0], destination)
+
+
+def write_wndb_sidecar(lexicon: Lexicon, directory: Path) -> None:
+    """Write the WNDB database of *lexicon* into a subdirectory."""
+    destination = directory / f"{lexicon['id']}.wndb"
+    destination.mkdir(exist_ok=True)
+    write_wndb(lexicon, destination)
+
+
+def write_wndb(lexicon: Lexicon, directory: Path) -> None:
+    """Write *lexicon* as a WNDB database in *directory*."""
+    members = _synset_members(lexicon)
+    synsets: dict[str, list[Synset]] = {pos: [] for pos in wndb.POS_MAP}
+    skipped: Counter[str] = Counter()
+    for synset in lexicon.get("synsets", []):
+        if synset.get("partOfSpeech") not in FILE_POS:
+            skipped["synsets of other parts of speech"] += 1
+        elif not members.get(synset["id"]):
+            skipped["synsets without senses"] += 1
+        else:
+            synsets[FILE_POS[synset["partOfSpeech"]]].append(synset)
+    # this may skip senses, and synsets left without senses
+    lex_filenums, lex_ids = _lex_ids(synsets, members, skipped)
+
+    # the synset type and index in its data file of each synset and
+    # the synset and w_num of each sense
+    positions: _Positions = {
+        synset["id"]: (synset["partOfSpeech"], k)
+        for subsynsets in synsets.values()
+        for k, synset in enumerate(subsynsets)
+    }
+    sense_positions: _Positions = {
+        sense["id"]: (ssid, w_num)
+        for ssid in positions
+        for w_num, (_, sense) in enumerate(members[ssid], 1)
+    }
+    frame_numbers = _frame_numbers(lexicon)
+
+    # first pass: records with synset indexes instead of offsets
+    drafts = {
+        pos: [
+            _build_record(
+                synset,
+                k,
+                members[synset["id"]],
+                lex_filenums[synset["id"]],
+                lex_ids,
+                positions,
+                sense_positions,
+                frame_numbers,
+                skipped,
+            )
+            for k, synset in enumerate(subsynsets)
+        ]
+        for pos, subsynsets in synsets.items()
+    }
+    header = wndb.format_header([
+        lexicon.get("label", ""),
+        f"{lexicon['id']}:{lexicon.get('version', '')}",
+        f"License: {lexicon.get('license', '')}",
+    ])
+    offsets = {
+        pos: wndb.data_record_offsets(records, header)
+        for pos, records in drafts.items()
+    }
+
+    # second pass: fill in the offsets and write the data files
+    def offset(ss_type: str, k: int) -> int:
+        return offsets[FILE_POS[ss_type]][k]
+
+    records = {
+        pos: [
+            r._replace(
+                synset_offset=offset(r.ss_type, r.synset_offset),
+                pointers=[
+                    p._replace(synset_offset=offset(p.pos, p.synset_offset))
+                    for p in r.pointers
+                ],
+            )
+            for r in subrecords
+        ]
+        for pos, subrecords in drafts.items()
+    }
+    for pos, name in wndb.POS_MAP.items():
+        wndb.write_data_file(directory / f"data.{name}", records[pos], header)
+
+    records_by_id = {
+        ssid: records[FILE_POS[ss_type]][k] for ssid, (ss_type, k) in positions.items()
+    }
+    _write_indexes(lexicon, directory, header, records_by_id, sense_positions)
+    _write_exceptions(lexicon, directory)
+
+    for reason, count in skipped.items():
+        log.warning("Skipped %d %s", count, reason)
+
+
+# Record building ######################################################
+
+# ID -> (synset type, index) for synsets or (synset ID, w_num) for senses
+_Positions = dict[str, tuple[str, int]]
+
+
+def _synset_members(lexicon: Lexicon) -> dict[str, list[tuple[str, Sense]]]:
+    """Return the (lemma, sense) pairs of each synset in member order."""
+    members: dict[str, list[tuple[str, Sense]]] = {}
+    for entry in lexicon.get("entries", []):
+        lemma = entry["lemma"]["writtenForm"]
+        for sense in entry.get("senses", []):
+            members.setdefault(sense["synset"], []).append((lemma, sense))
+    for synset in lexicon.get("synsets", []):
+        order = {sense_id: i for i, sense_id in enumerate(synset.get("members", []))}
+        if order and synset["id"] in members:
+            members[synset["id"]].sort(
+                key=lambda pair: order.get(pair[1]["id"], len(order))
+            )
+    return members
+
+
+def _word(lemma: str) -> str:
+    return lemma.replace(" ", "_")
+
+
+def _lex_filenums(synset: Synset) -> list[int]:
+    """Return the lexicographer file numbers *synset* may be written to."""
+    lexfile = synset.get("lexfile") or ""
+    if lexfile in LEXICOGRAPHER_FILES:
+        return [LEXICOGRAPHER_FILES[lexfile]]
+    return POS_LEXFILES[synset["partOfSpeech"]]
+
+
+def _stored_sense_key(sense: Sense) -> str:
+    key = (sense.get("meta") or {}).get("identifier", "")
+    return key if "%" in key else ""
+
+
+def _lex_ids(
+    synsets: dict[str, list[Synset]],
+    members: dict[str, list[tuple[str, Sense]]],
+    skipped: Counter[str],
+) -> tuple[dict[str, int], dict[str, int]]:
+    """Return the lexicographer file number of each synset and the
+    lex_id of each sense.
+
+    The lex_id distinguishes the senses of a lemma within a
+    lexicographer file; it is taken from a stored sense key or
+    assigned in order. Synsets without a lexicographer file go to the
+    first one of their part of speech where all their lemmas still
+    have a lex_id. Senses without a lex_id in any file are removed
+    from *members*, and synsets left without senses from *synsets*.
+    """
+    lex_filenums: dict[str, int] = {}
+    lex_ids: dict[str, int] = {}
+    assigned: Counter[tuple[str, int]] = Counter()
+    for pos, subsynsets in synsets.items():
+        for synset in subsynsets:
+            senses = members[synset["id"]]
+            new = Counter(
+                _word(lemma).lower()
+                for lemma, sense in senses
+                if not _stored_sense_key(sense)
+            )
+            lex_filenum = _choose_lex_filenum(synset, new, assigned)
+            lex_filenums[synset["id"]] = lex_filenum
+            kept = []
+            for lemma, sense in senses:
+                if key := _stored_sense_key(sense):
+                    lex_ids[sense["id"]] = wndb.split_sense_key(key).lex_id
+                else:
+                    lemma_key = (_word(lemma).lower(), lex_filenum)
+                    if assigned[lemma_key] > MAX_LEX_ID:
+                        skipped["senses of lemmas with too many senses"] += 1
+                        continue
+                    lex_ids[sense["id"]] = assigned[lemma_key]
+                    assigned[lemma_key] += 1
+                kept.append((lemma, sense))
+            members[synset["id"]] = kept
+        kept_synsets = [synset for synset in subsynsets if members[synset["id"]]]
+        if len(kept_synsets) < len(subsynsets):
+            skipped["synsets without senses"] += len(subsynsets) - len(kept_synsets)
+            synsets[pos] = kept_synsets
+    return lex_filenums, lex_ids
+
+
+def _choose_lex_filenum(
+    synset: Synset,
+    lemmas: Counter[str],
+    assigned: Counter[tuple[str, int]],
+) -> int:
+    """Return the first lexicographer file with lex_ids for all *lemmas*.
+
+    If there is none, return the one where the fewest senses of
+    *lemmas* have to be skipped.
+    """
+    best, best_overflow = 0, -1
+    for lex_filenum in _lex_filenums(synset):
+        overflow = sum(
+            max(0, assigned[lemma, lex_filenum] + n - MAX_LEX_ID - 1)
+            for lemma, n in lemmas.items()
+        )
+        if not overflow:
+            return lex_filenum
+        if best_overflow < 0 or overflow < best_overflow:
+            best, best_overflow = lex_filenum, overflow
+    return best
+
+
+def _frame_numbers(lexicon: Lexicon) -> dict[str, int]:
+    """Map the frame IDs of *lexicon* to WNDB frame numbers."""
+    by_text = {text: f_num for f_num, text in wndb.VERB_FRAMES}
+    numbers = {}
+    for frame in lexicon.get("frames", []):
+        if m := _FRAME_ID.match(frame["id"]):
+            numbers[frame["id"]] = int(m.group(1))
+        elif frame.get("subcategorizationFrame") in by_text:
+            numbers[frame["id"]] = by_text[frame["subcategorizationFrame"]]
+    return numbers
+
+
+def _build_record(
+    synset: Synset,
+    k: int,
+    members: list[tuple[str, Sense]],
+    lex_filenum: int,
+    lex_ids: dict[str, int],
+    positions: _Positions,
+    sense_positions: _Positions,
+    frame_numbers: dict[str, int],
+    skipped: Counter[str],
+) -> wndb.DataRecord:
+    ss_type = synset["partOfSpeech"]
+    words = [
+        wndb.Word(_word(lemma), lex_ids[sense["id"]], sense.get("adjposition", ""))
+        for lemma, sense in members
+    ]
+
+    pointers = []
+    relations = [(0, rel) for rel in synset.get("relations", [])]
+    for w_num, (_, sense) in enumerate(members, 1):
+        relations.extend((w_num, rel) for rel in sense.get("relations", []))
+    for w_num, rel in relations:
+        relname = rel["relType"]
+        if relname not in _POINTER_SYMBOLS:
+            skipped[f"{relname} relations"] += 1
+            continue
+        symbol = _POINTER_SYMBOLS[relname]
+        if relname == "similar" and ss_type == "v":
+            symbol = "$"
+        target_ssid, target_w_num = rel["target"], 0
+        if w_num:
+            if rel["target"] not in sense_positions:
+                skipped["relations to missing senses"] += 1
+                continue
+            target_ssid, target_w_num = sense_positions[rel["target"]]
+        if target_ssid not in positions:
+            skipped["relations to missing synsets"] += 1
+            continue
+        # pointers to satellites use the pos of their file, as in PWN
+        target_ss_type, target_k = positions[target_ssid]
+        target_pos = FILE_POS[target_ss_type]
+        pointers.append(wndb.Pointer(symbol, target_k, target_pos, w_num, target_w_num))
+
+    frames = []
+    if ss_type == "v":
+        sense_frames = [
+            {frame_numbers[f] for f in sense.get("subcat", []) if f in frame_numbers}
+            for _, sense in members
+        ]
+        shared = set.intersection(*sense_frames)
+        frames.extend(wndb.Frame(f_num, 0) for f_num in sorted(shared))
+        for w_num, f_nums in enumerate(sense_frames, 1):
+            frames.extend(wndb.Frame(f_num, w_num) for f_num in sorted(f_nums - shared))
+
+    return wndb.DataRecord(
+        k,
+        lex_filenum,
+        ss_type,
+        words,
+        pointers,
+        frames,
+        _format_gloss(synset),
+    )
+
+
+def _format_gloss(synset: Synset) -> str:
+    parts = [d["text"] for d in synset.get("definitions", [])]
+    parts.extend(f'"{ex["text"]}"' for ex in synset.get("examples", []))
+    return " ".join("; ".join(parts).split())  # no newlines
+
+
+# Index writing ########################################################
+
+
+def _write_indexes(
+    lexicon: Lexicon,
+    directory: Path,
+    header: str,
+    records: dict[str, wndb.DataRecord],
+    sense_positions: _Positions,
+) -> None:
+    # pos -> lemma -> [(synset ID, sense)]
+    lemmas: dict[str, dict[str, list[tuple[str, Sense]]]] = {
+        pos: {} for pos in wndb.POS_MAP
+    }
+    for entry in lexicon.get("entries", []):
+        pos = FILE_POS.get(entry["lemma"]["partOfSpeech"])
+        lemma = _word(entry["lemma"]["writtenForm"]).lower()
+        for sense in entry.get("senses", []):
+            if pos and sense["id"] in sense_positions:
+                ssid, _ = sense_positions[sense["id"]]
+                lemmas[pos].setdefault(lemma, []).append((ssid, sense))
+
+    adjectives = {r.synset_offset: r for r in records.values() if r.ss_type in "as"}
+    senseinfos: list[wndb.SenseInfo] = []
+    counts: list[wndb.Count] = []
+    for pos, name in wndb.POS_MAP.items():
+        index_records = []
+        for lemma, senses in lemmas[pos].items():
+            synset_offsets: list[int] = []
+            symbols: set[str] = set()
+            tagsense_cnt = 0
+            for ssid, sense in senses:
+                record = records[ssid]
+                _, w_num = sense_positions[sense["id"]]
+                symbols.update(
+                    p.pointer_symbol for p in record.pointers
+                    if p.source_w_num in (0, w_num)
+                )
+                if record.synset_offset in synset_offsets:
+                    continue  # case variants of the lemma in the synset
+                synset_offsets.append(record.synset_offset)
+                tag_cnt = sum(c["value"] for c in sense.get("counts", []))
+                tagsense_cnt += bool(tag_cnt)
+                sense_key = _stored_sense_key(sense) or _make_sense_key(
+                    lemma, record, record.words[w_num - 1].lex_id, adjectives
+                )
+                sense_number = len(synset_offsets)
+                senseinfos.append(wndb.SenseInfo(
+                    sense_key, record.synset_offset, sense_number, tag_cnt
+                ))
+                if tag_cnt:
+                    counts.append(wndb.Count(tag_cnt, sense_key, sense_number))
+            index_records.append(wndb.IndexRecord(
+                lemma, pos, sorted(symbols), tagsense_cnt, synset_offsets
+            ))
+        wndb.write_index_file(directory / f"index.{name}", index_records, header)
+    wndb.write_sense_index(directory / "index.sense", senseinfos)
+    wndb.write_count_list(directory / "cntlist", counts)
+
+
+def _make_sense_key(
+    lemma: str,
+    record: wndb.DataRecord,
+    lex_id: int,
+    adjectives: dict[int, wndb.DataRecord],
+) -> str:
+    head_word, head_id = "", 0
+    if record.ss_type == "s":
+        # the head word is the first word of the similar head synset
+        for p in record.pointers:
+            if p.pointer_symbol == "&" and p.synset_offset in adjectives:
+                head = adjectives[p.synset_offset].words[0]
+                head_word, head_id = head.word.lower(), head.lex_id
+                break
+    return wndb.make_sense_key(wndb.SenseKeyComponents(
+        lemma,
+        _SS_TYPE_INDEX[record.ss_type],
+        record.lex_filenum,
+        lex_id,
+        head_word,
+        head_id,
+    ))
+
+
+def _write_exceptions(lexicon: Lexicon, directory: Path) -> None:
+    exceptions: dict[str, dict[str, list[str]]] = {pos: {} for pos in wndb.POS_MAP}
+    for entry in lexicon.get("entries", []):
+        pos = FILE_POS.get(entry["lemma"]["partOfSpeech"])
+        if pos is None:
+            continue
+        base = _word(entry["lemma"]["writtenForm"])
+        for form in entry.get("forms", []):
+            bases = exceptions[pos].setdefault(_word(form["writtenForm"]), [])
+            if base not in bases:
+                bases.append(base)
+    for pos, name in wndb.POS_MAP.items():
+        wndb.write_exceptions_file(
+            directory / f"{name}.exc",
+            (wndb.ExceptionalForm(*item) for item in exceptions[pos].items()),
+        )
+
+
+# Command usage
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Convert WN-LMF to WNDB")
+    parser.add_argument("SRC", help="path to the WN-LMF file")
+    parser.add_argument("DEST", help="path to the destination directory")
+    parser.add_argument(
+        "--lexicon", help="the ID of the lexicon to convert if SRC has several"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    main(args)
@@ -0,0 +1,161 @@
+"""
+Find clusters of near-duplicate lemmas.
+
+Near-duplicates are lemmas that differ by a typo, transposed letters,
+or variant spacing and hyphenation, e.g., `receive` and `recieve` or
+`e-mail` and `email`. Comparing every pair of lemmas is quadratic, so
+candidate pairs are generated by blocking:
+
+- lemmas with the same :func:`variant_key` (case, diacritics, spaces,
+  hyphens, and apostrophes ignored) are grouped by hashing and are
+  near-duplicates with a score of 1.0
+- the distinct keys are sorted, and also sorted by their reversed
+  keys, and each key is compared with the next :data:`WINDOW` keys in
+  either order (the sorted-neighbourhood method), so an edit near the
+  end or the start of a key still has its counterpart nearby
+
+A candidate pair is confirmed if its keys are at most one edit apart
+(two for keys of :data:`LONG` or more characters), counting a
+transposition as one edit (see :func:`scripts.util.edit_distance`),
+and its Jaro-Winkler similarity (the confidence score) is at least
+the minimum score. Keys shorter than :data:`MIN_LENGTH` are only
+grouped by hashing, as short words one edit apart are mostly
+different words. Confirmed pairs are merged into clusters with
+union-find.
+
+These checks are run by `python -m scripts.tsv-duplicates --near`.
+"""
+
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from itertools import combinations
+from typing import NamedTuple
+
+from .util import edit_distance, fold_diacritics
+
+WINDOW = 4
+MIN_LENGTH = 4
+LONG = 8
+MIN_SCORE = 0.9
+
+_SEPARATORS = str.maketrans("", "", " _-‐‑'’")
+
+
+class Cluster(NamedTuple):
+    lemmas: tuple[str, ...]
+    score: float  # the lowest score of the pairs joining the cluster
+
+
+@lru_cache(maxsize=1 << 16)
+def variant_key(lemma: str) -> str:
+    """Return *lemma* without case, diacritics, and separators."""
+    key = lemma.casefold()
+    if not key.isascii():
+        key = fold_diacritics(key)
+    return key.translate(_SEPARATORS)
+
+
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Return the Jaro-Winkler similarity of *a* and *b* (0.0 to 1.0)."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(len(a), len(b)) // 2 - 1
+    matched_b = [False] * len(b)
+    matches_a: list[str] = []
+    for i, ca in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not matched_b[j] and b[j] == ca:
+                matched_b[j] = True
+                matches_a.append(ca)
+                break
+    m = len(matches_a)
+    if not m:
+        return 0.0
+    matches_b = [cb for cb, matched in zip(b, matched_b) if matched]
+    t = sum(ca != cb for ca, cb in zip(matches_a, matches_b)) / 2
+    jaro = (m / len(a) + m / len(b) + (m - t) / m) / 3
+    prefix = 0
+    for ca, cb in zip(a[:4], b[:4]):
+        if ca != cb:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def candidate_pairs(
+    keys: Sequence[str],
+    window: int = WINDOW,
+) -> set[tuple[int, int]]:
+    """Return the pairs of indexes of *keys* that are sorted neighbours.
+
+    Each key is paired with the next *window* keys in the order of the
+    keys and in the order of the reversed keys.
+    """
+    if len(keys) <= window + 1:
+        # every key is a neighbour of every other key
+        return set(combinations(range(len(keys)), 2))
+    pairs: set[tuple[int, int]] = set()
+    for sort_key in (keys.__getitem__, lambda i: keys[i][::-1]):
+        order = sorted(range(len(keys)), key=sort_key)
+        for n, i in enumerate(order):
+            for j in order[n + 1:n + 1 + window]:
+                pairs.add((i, j) if i < j else (j, i))
+    return pairs
+
+
+def similarity(a: str, b: str, min_score: float = MIN_SCORE) -> float:
+    """Return the score of keys *a* and *b*, or 0.0 if they are not similar."""
+    if min(len(a), len(b)) < MIN_LENGTH:
+        return 0.0
+    limit = 2 if min(len(a), len(b)) >= LONG else 1
+    if edit_distance(a, b, limit, transpositions=True) > limit:
+        return 0.0
+    score = jaro_winkler(a, b)
+    return score if score >= min_score else 0.0
+
+
+def find_clusters(
+    lemmas: Iterable[str],
+    min_score: float = MIN_SCORE,
+    window: int = WINDOW,
+) -> list[Cluster]:
+    """Return the clusters of near-duplicates among *lemmas*.
+
+    Clusters and their (distinct) lemmas are in order of first
+    appearance in *lemmas*.
+    """
+    # hash blocking: distinct lemmas grouped by their variant key
+    distinct = list(dict.fromkeys(lemmas))
+    if len(distinct) < 2:
+        return []
+    key_index: dict[str, int] = {}
+    lemma_keys = [
+        key_index.setdefault(variant_key(lemma), len(key_index)) for lemma in distinct
+    ]
+    keys = list(key_index)
+
+    parent = list(range(len(keys)))
+    score = [1.0] * len(keys)  # of each root's cluster
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidate_pairs(keys, window):
+        if pair_score := similarity(keys[i], keys[j], min_score):
+            root_i, root_j = find(i), find(j)
+            parent[root_j] = root_i
+            score[root_i] = min(score[root_i], score[root_j], pair_score)
+
+    members: dict[int, list[str]] = {}
+    for lemma, i in zip(distinct, lemma_keys):
+        members.setdefault(find(i), []).append(lemma)
+    return [
+        Cluster(tuple(cluster), round(score[root], 3))
+        for root, cluster in members.items()
+        if len(cluster) > 1
+    ]
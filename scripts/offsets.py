@@ -0,0 +1,176 @@
+"""
+Check OMW synset IDs against the synsets of WordNet 3.0.
+
+The OMW lexicons use WordNet 3.0 offset-pos IDs (e.g., `00001740-n`)
+for their synsets and require the English wordnet built from it, but
+a wrong offset only shows up downstream as a synset without an ILI.
+An :class:`OffsetBitmap` records the valid offsets with one bit per
+byte offset of each part of speech's WNDB data file (about 3 MB for
+WordNet 3.0). It is built once from the WNDB data files or from the
+ILI map, and checking an ID is a bit lookup, so no English lexicon
+needs to be loaded.
+
+:func:`check_synsets_table` cross-checks the ILIs of the lexicons in
+a columnar synsets table (see :mod:`scripts.columnar`): synsets with
+the same offset-pos in different lexicons must have the same ILI.
+The check works on the table's dictionary codes, decoding each
+distinct synset ID once.
+
+These checks are run by `python -m scripts.lint --pwn30=PATH`.
+"""
+
+import fnmatch
+import re
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from . import columnar, wndb
+from .util import PathLike
+
+POS_FILES = {"n": "noun", "v": "verb", "a": "adj", "r": "adv"}
+
+_SYNSET_ID = re.compile(r"(?:^|-)(\d{8})-([nvasr])$")
+
+
+class OffsetBitmap:
+    """The set of valid offset-pos IDs as one bitmap per part of speech.
+
+    Satellite adjectives (`s`) share the bitmap of adjectives (`a`),
+    as the TSV files use either for the same synsets.
+
+    Example:
+
+        >>> bitmap = OffsetBitmap.from_ili_map("etc/cili/ili-map-pwn30.tab")
+        >>> "00001740-n" in bitmap
+        True
+
+    """
+
+    def __init__(self) -> None:
+        self._bits = {pos: bytearray() for pos in POS_FILES}
+
+    def __len__(self) -> int:
+        return sum(
+            int.from_bytes(bits, "little").bit_count()
+            for bits in self._bits.values()
+        )
+
+    def __contains__(self, offset_pos: object) -> bool:
+        if not isinstance(offset_pos, str):
+            return False
+        offset, _, pos = offset_pos.rpartition("-")
+        bits = self._bits.get("a" if pos == "s" else pos)
+        if bits is None or not offset.isdigit():
+            return False
+        i = int(offset)
+        return (i >> 3) < len(bits) and bool(bits[i >> 3] & (1 << (i & 7)))
+
+    def add(self, offset: int, pos: str) -> None:
+        """Add *offset* for the part of speech *pos*."""
+        bits = self._bits["a" if pos == "s" else pos]
+        byte = offset >> 3
+        if byte >= len(bits):
+            bits.extend(bytes(byte + 1 - len(bits)))
+        bits[byte] |= 1 << (offset & 7)
+
+    def missing(self, ids: Iterable[str]) -> list[str]:
+        """Return the distinct IDs in *ids* that are not in the bitmap."""
+        return sorted(offset_pos for offset_pos in set(ids) if offset_pos not in self)
+
+    @classmethod
+    def from_wndb(cls, directory: PathLike) -> "OffsetBitmap":
+        """Build the bitmap from the data files of a WNDB database."""
+        bitmap = cls()
+        for pos, name in POS_FILES.items():
+            for record in wndb.read_data_file(Path(directory, f"data.{name}")):
+                bitmap.add(record.synset_offset, pos)
+        return bitmap
+
+    @classmethod
+    def from_ili_map(cls, path: PathLike) -> "OffsetBitmap":
+        """Build the bitmap from the synsets of an ILI map file."""
+        bitmap = cls()
+        with open(path, "rt") as ilifile:
+            for line in ilifile:
+                if line.strip():
+                    offset, _, pos = line.split("\t")[1].strip().partition("-")
+                    bitmap.add(int(offset), pos)
+        return bitmap
+
+    @classmethod
+    def from_path(cls, path: PathLike) -> "OffsetBitmap":
+        """Build the bitmap from a WNDB directory or an ILI map file."""
+        if Path(path).is_dir():
+            return cls.from_wndb(path)
+        return cls.from_ili_map(path)
+
+
+class ILIConflict(NamedTuple):
+    row: int  # of the later synset in the table
+    offset_pos: str
+    lexicon: str
+    ili: str
+    other_lexicon: str
+    other_ili: str
+
+
+def check_synsets_table(
+    path: PathLike,
+    bitmap: Optional[OffsetBitmap] = None,
+    exclude: Iterable[str] = (),
+) -> tuple[list[ILIConflict], list[tuple[int, str]]]:
+    """Cross-check the synsets of the columnar synsets table at *path*.
+
+    Return the ILI conflicts and, if *bitmap* is given, the (row,
+    synset ID) of the synsets whose offset-pos is not in *bitmap*.
+    Synsets without an offset-pos ID or in lexicons matching a pattern
+    in *exclude* (e.g., `omw-en31*` for WordNet 3.1) are skipped.
+    """
+    table = columnar.Table(path)
+    lexicons = table.dictionary("lexicon")
+    synsets = table.dictionary("synset")
+    ilis = table.dictionary("ili")
+    patterns = list(exclude)
+    excluded = {
+        i for i, lexid in enumerate(lexicons)
+        if any(fnmatch.fnmatch(lexid, pattern) for pattern in patterns)
+    }
+    no_ili = ilis.find("")
+
+    # decode each distinct synset ID once
+    keys: list[Optional[str]] = []
+    for synset_id in synsets:
+        if m := _SYNSET_ID.search(synset_id):
+            offset, pos = m.groups()
+            keys.append(f"{offset}-{'a' if pos == 's' else pos}")
+        else:
+            keys.append(None)
+    if bitmap is not None:
+        valid = [key is None or key in bitmap for key in keys]
+
+    conflicts: list[ILIConflict] = []
+    missing: list[tuple[int, str]] = []
+    first: dict[str, tuple[int, int]] = {}  # key -> (ili code, lexicon code)
+    rows = zip(table.codes("lexicon"), table.codes("synset"), table.codes("ili"))
+    for row, (lex, syn, ili) in enumerate(rows):
+        key = keys[syn]
+        if key is None or lex in excluded:
+            continue
+        if bitmap is not None and not valid[syn]:
+            missing.append((row, synsets[syn]))
+            continue
+        if ili == no_ili:
+            continue
+        other_ili, other_lex = first.setdefault(key, (ili, lex))
+        if other_ili != ili:
+            conflicts.append(ILIConflict(
+                row,
+                key,
+                lexicons[lex],
+                ilis[ili],
+                lexicons[other_lex],
+                ilis[other_ili],
+            ))
+    return conflicts, missing
+
@@ -0,0 +1,119 @@
+"""
+Prefix (autocomplete) index of a lexicon's word forms.
+
+The lemmas and other written forms of each lexical entry are
+normalized (see :func:`normalize`) and stored sorted, so the forms
+starting with a prefix are a contiguous range found with two binary
+searches over the memory-mapped table. The table stores:
+
+- `forms_offsets`, `forms_data`: the sorted, distinct normalized forms
+- `entries_offsets`, `entries_data`: the sorted entry IDs
+- `indptr`: the start of each form's entries in `entry`, with one
+  more item than there are forms
+- `entry`: the index of each entry with the form
+"""
+
+import array
+import sys
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Optional
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .util import PathLike, respace_word
+
+
+def normalize(form: str) -> str:
+    """Return *form* in NFKC, case-folded and with spaces for `_`."""
+    return respace_word(unicodedata.normalize("NFKC", form).casefold())
+
+
+def write_prefix_index(lexicon: Lexicon, directory: Path) -> None:
+    """Write the prefix index of *lexicon* into *directory*."""
+    path = directory / f"{lexicon['id']}.prefix.npz"
+    arrays.save(path, build_prefix_index(lexicon))
+
+
+def build_prefix_index(lexicon: Lexicon) -> dict[str, arrays.Array]:
+    postings: dict[str, set[str]] = {}
+    for entry in lexicon.get("entries", []):
+        forms = [entry["lemma"]["writtenForm"]]
+        forms.extend(form["writtenForm"] for form in entry.get("forms", []))
+        for form in forms:
+            postings.setdefault(normalize(form), set()).add(entry["id"])
+
+    entry_ids = sorted({id for ids in postings.values() for id in ids})
+    index = {id: i for i, id in enumerate(entry_ids)}
+    forms = sorted(postings)
+    indptr = array.array("q", [0])
+    entries = array.array("i")
+    for form in forms:
+        entries.extend(sorted(index[id] for id in postings[form]))
+        indptr.append(len(entries))
+
+    forms_offsets, forms_data = arrays.encode_strings(forms)
+    entries_offsets, entries_data = arrays.encode_strings(entry_ids)
+    return {
+        "forms_offsets": forms_offsets,
+        "forms_data": forms_data,
+        "entries_offsets": entries_offsets,
+        "entries_data": entries_data,
+        "indptr": indptr,
+        "entry": entries,
+    }
+
+
+class PrefixIndex:
+    """Query the index written by :func:`write_prefix_index`.
+
+    Example:
+
+        >>> index = PrefixIndex("omw-fr.prefix.npz")
+        >>> index.complete("chat", limit=3)
+        ['chat', 'chat domestique', 'chat-huant']
+
+    """
+
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.forms = arrays.StringArray(a["forms_offsets"], a["forms_data"])
+        self.entries = arrays.StringArray(a["entries_offsets"], a["entries_data"])
+
+    def range(self, prefix: str) -> tuple[int, int]:
+        """Return the start and end of the forms beginning with *prefix*."""
+        prefix = normalize(prefix)
+        start = bisect_left(self.forms, prefix)
+        if not prefix:
+            return start, len(self.forms)
+        last = ord(prefix[-1])
+        if last == sys.maxunicode:
+            end = start
+            while end < len(self.forms) and self.forms[end].startswith(prefix):
+                end += 1
+        else:
+            end = bisect_left(self.forms, prefix[:-1] + chr(last + 1), start)
+        return start, end
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        """Return the normalized forms beginning with *prefix*."""
+        start, end = self.range(prefix)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.forms[start:end]
+
+    def lookup(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        """Return the IDs of entries with a form beginning with *prefix*.
+
+        Entries are ordered by their first matching form.
+        """
+        start, end = self.range(prefix)
+        indptr, entry = self._arrays["indptr"], self._arrays["entry"]
+        ids: dict[str, None] = {}
+        for i in range(indptr[start], indptr[end]):
+            ids[self.entries[entry[i]]] = None
+            if limit is not None and len(ids) >= limit:
+                break
+        return list(ids)
@@ -0,0 +1,235 @@
+"""
+Write a lexicon as several WN-LMF files split by part of speech or
+lexicographer file.
+
+Each shard is a complete WN-LMF document with the lexicon's metadata
+and a subset of its synsets. Senses go to the shard of their synset,
+so a lexical entry whose senses are in several shards is written to
+each of them with only the senses of that shard. The senses of such
+an entry are numbered with their position in the entry (the `n`
+attribute of WN-LMF senses, unless all of them already have a
+nonzero one) so that
+their order is restored when the shards are merged. Satellite adjectives
+(`s`) are sharded with adjectives (`a`) and synsets without a
+lexicographer file are sharded as `none`. Relations may cross shards,
+so a shard is only referentially complete when loaded with the shards
+containing its relation targets.
+
+The shards of `omw-en.xml` are written as `omw-en.<shard>.xml` with a
+tab-separated manifest, `omw-en.shards.tsv`, listing the shard names,
+files (relative to the manifest) and their numbers of synsets,
+entries, and senses. :func:`load_shards` loads some or all of the
+shards in parallel and merges them into one lexicon. In packages, the
+shards go in a subdirectory next to the unsharded file (see
+:func:`write_package_shards`).
+"""
+
+import csv
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from wn.lmf import LexicalEntry, LexicalResource, Lexicon, Sense, dump, load
+
+SHARD_BY = ("pos", "lexfile")
+
+
+class Shard(NamedTuple):
+    shard: str
+    file: str
+    synsets: int
+    entries: int
+    senses: int
+
+
+def manifest_path(destination: Path) -> Path:
+    """Return the path of the manifest for shards of *destination*."""
+    return destination.with_suffix(".shards.tsv")
+
+
+def shard_lexicon(lexicon: Lexicon, by: str) -> dict[str, Lexicon]:
+    """Split *lexicon* into shards by `pos` or `lexfile`."""
+    if by not in SHARD_BY:
+        raise ValueError(f"invalid shard type: {by}")
+    metadata = {
+        key: value for key, value in lexicon.items()
+        if key not in ("entries", "synsets", "frames")
+    }
+    shards: dict[str, Lexicon] = {}
+
+    def get(name: str) -> Lexicon:
+        if name not in shards:
+            shards[name] = Lexicon(**metadata, entries=[], synsets=[], frames=[])
+        return shards[name]
+
+    synset_shards: dict[str, str] = {}
+    for synset in lexicon.get("synsets", []):
+        if by == "pos":
+            name = synset.get("partOfSpeech") or "none"
+            name = "a" if name == "s" else name
+        else:
+            name = synset.get("lexfile") or "none"
+        synset_shards[synset["id"]] = name
+        get(name)["synsets"].append(synset)
+
+    for entry in lexicon.get("entries", []):
+        senses_by_shard: dict[str, list[Sense]] = {}
+        for sense in entry.get("senses", []):
+            name = synset_shards[sense["synset"]]
+            senses_by_shard.setdefault(name, []).append(sense)
+        if not senses_by_shard:
+            pos = entry["lemma"]["partOfSpeech"] if by == "pos" else "none"
+            senses_by_shard["a" if pos == "s" else pos] = []
+        elif len(senses_by_shard) > 1:
+            senses_by_shard = _numbered(entry.get("senses", []), senses_by_shard)
+        for name, senses in senses_by_shard.items():
+            get(name)["entries"].append(LexicalEntry(**{**entry, "senses": senses}))
+
+    frames = lexicon.get("frames", [])
+    for shard in shards.values():
+        used = {
+            frame_id
+            for entry in shard["entries"]
+            for sense in entry["senses"]
+            for frame_id in sense.get("subcat", [])
+        }
+        shard["frames"] = [frame for frame in frames if frame.get("id") in used]
+
+    return dict(sorted(shards.items()))
+
+
+def _numbered(
+    senses: list[Sense],
+    senses_by_shard: dict[str, list[Sense]],
+) -> dict[str, list[Sense]]:
+    """Return copies of *senses_by_shard* numbered in the order of *senses*."""
+    if all(sense.get("n") for sense in senses):
+        return senses_by_shard  # already ordered by their numbers
+    position = {id(sense): n for n, sense in enumerate(senses, 1)}
+    return {
+        name: [Sense(**{**sense, "n": position[id(sense)]}) for sense in subsenses]
+        for name, subsenses in senses_by_shard.items()
+    }
+
+
+def write_shards(
+    lexicon: Lexicon,
+    destination: Path,
+    by: str,
+    lmf_version: str,
+) -> list[Shard]:
+    """Write the shards of *lexicon* and their manifest.
+
+    The shard files and the manifest are named after *destination*,
+    the path the unsharded lexicon would have been written to.
+    *lmf_version* must be 1.4 or later, which has sense numbers.
+    """
+    if tuple(map(int, lmf_version.split("."))) < (1, 4):
+        # earlier versions cannot store the sense numbers
+        raise ValueError("sharded output requires WN-LMF 1.4 or later")
+    manifest: list[Shard] = []
+    for name, shard in shard_lexicon(lexicon, by).items():
+        path = destination.with_suffix(f".{name}.xml")
+        dump(LexicalResource(lmf_version=lmf_version, lexicons=[shard]), path)
+        manifest.append(Shard(
+            name,
+            path.name,
+            len(shard["synsets"]),
+            len(shard["entries"]),
+            sum(len(entry["senses"]) for entry in shard["entries"]),
+        ))
+    with manifest_path(destination).open("w", newline="") as manifestfile:
+        writer = csv.writer(manifestfile, dialect="excel-tab")
+        writer.writerow(Shard._fields)
+        writer.writerows(manifest)
+    return manifest
+
+
+def write_package_shards(
+    lexicon: Lexicon,
+    directory: Path,
+    by: str,
+    lmf_version: str,
+) -> list[Shard]:
+    """Write the shards of *lexicon* into a subdirectory of a package.
+
+    The shards go in `<lexid>.shards/` in *directory*, next to the
+    package's unsharded `<lexid>.xml`.
+    """
+    destination = directory / f"{lexicon['id']}.shards"
+    destination.mkdir(exist_ok=True)
+    return write_shards(lexicon, destination / f"{lexicon['id']}.xml", by, lmf_version)
+
+
+def read_manifest(path: Path) -> list[Shard]:
+    """Read the shard manifest at *path*."""
+    with path.open(newline="") as manifestfile:
+        reader = csv.reader(manifestfile, dialect="excel-tab")
+        next(reader)  # header
+        return [
+            Shard(name, file, int(synsets), int(entries), int(senses))
+            for name, file, synsets, entries, senses in reader
+        ]
+
+
+def load_shards(
+    path: Path,
+    shards: Optional[Iterable[str]] = None,
+    processes: Optional[int] = None,
+) -> Lexicon:
+    """Load the shards listed in the manifest at *path* as one lexicon.
+
+    If *shards* is given, only the shards with those names are loaded.
+    The shards are parsed by up to *processes* worker processes (by
+    default, one per CPU); with `processes=1` they are parsed in this
+    process.
+    """
+    manifest = read_manifest(path)
+    if shards is not None:
+        names = set(shards)
+        if unknown := names.difference(shard.shard for shard in manifest):
+            raise KeyError(f"unknown shards: {', '.join(sorted(unknown))}")
+        manifest = [shard for shard in manifest if shard.shard in names]
+    paths = [path.parent / shard.file for shard in manifest]
+    if processes == 1 or len(paths) < 2:
+        lexicons = [_load_shard(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            lexicons = list(executor.map(_load_shard, paths))
+    return merge_shards(lexicons)
+
+
+def _load_shard(path: Path) -> Lexicon:
+    return load(path, progress_handler=None)["lexicons"][0]
+
+
+def merge_shards(lexicons: list[Lexicon]) -> Lexicon:
+    """Merge the shards of a lexicon into one lexicon.
+
+    The senses of an entry in several shards are sorted by their
+    numbers (`n`), which restores their order in the unsharded entry.
+    """
+    if not lexicons:
+        raise ValueError("no shards to merge")
+    merged = Lexicon(**{**lexicons[0], "entries": [], "synsets": [], "frames": []})
+    entries: dict[str, LexicalEntry] = {}
+    split: set[str] = set()  # IDs of entries in several shards
+    frame_ids: set[str] = set()
+    for lexicon in lexicons:
+        merged["synsets"].extend(lexicon.get("synsets", []))
+        for entry in lexicon.get("entries", []):
+            if entry["id"] in entries:
+                entries[entry["id"]]["senses"].extend(entry.get("senses", []))
+                split.add(entry["id"])
+            else:
+                entries[entry["id"]] = entry
+                merged["entries"].append(entry)
+        for frame in lexicon.get("frames", []):
+            if frame.get("id") not in frame_ids:
+                frame_ids.add(frame.get("id"))
+                merged["frames"].append(frame)
+    for entry_id in split:
+        senses = entries[entry_id]["senses"]
+        senses.sort(key=lambda sense: sense.get("n") or len(senses))
+    return merged
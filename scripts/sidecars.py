@@ -0,0 +1,43 @@
+"""
+Registry of sidecar artifacts that can be written next to a lexicon.
+
+Each sidecar is a function taking the in-memory lexicon built by a
+converter and the directory of its WN-LMF file.
+"""
+
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from wn.lmf import Lexicon
+
+from . import (
+    adjacency,
+    columnar,
+    crosswalk,
+    fulltext,
+    fuzzy,
+    infocontent,
+    lemmatizer,
+    lmf2wndb,
+    prefix,
+    taxonomy,
+)
+
+SIDECARS: dict[str, Callable[[Lexicon, Path], None]] = {
+    "columnar": columnar.write_columnar,
+    "crosswalk": crosswalk.write_crosswalk,
+    "fulltext": fulltext.write_fulltext_index,
+    "graph": adjacency.write_graph,
+    "hypernyms": taxonomy.write_closure,
+    "ic": infocontent.write_information_content,
+    "lemmatizer": lemmatizer.write_lemmatizer,
+    "ngrams": fuzzy.write_ngram_index,
+    "prefix": prefix.write_prefix_index,
+    "similarity": taxonomy.write_similarity,
+    "wndb": lmf2wndb.write_wndb_sidecar,
+}
+
+
+def write(names: Iterable[str], lexicon: Lexicon, directory: Path) -> None:
+    for name in names:
+        SIDECARS[name](lexicon, directory)
@@ -5,10 +5,14 @@ import logging
 import sys
 from functools import partial
 from pathlib import Path
+from typing import Optional
 
 from wn import lmf
 from wn.project import iterpackages
 
+from .coverage import Coverage
+from .util import load_ili_set
+
 log = logging.getLogger("summarize-release")
 
 FRIENDLY_LICENSE_NAME_MAP = {
@@ -49,7 +53,13 @@ def main(args: argparse.Namespace) -> int:
 
     if args.core_ili:
         core = _load_core_ili(args.core_ili)
-        core_func = partial(_core, core=core)
+        if args.coverage:
+            coverage = Coverage(args.coverage)
+            core_func = partial(
+                _core, core=core, coverage=coverage, mask=coverage.mask(core)
+            )
+        else:
+            core_func = partial(_core, core=core)
         core_func.__doc__ = _core.__doc__  # docstring is for table formatting
         fields.append(core_func)
     else:
@@ -79,9 +89,7 @@ def _get_col_info(docstring: str) -> tuple[str, str]:
 
 
 def _load_core_ili(path: Path) -> set[str]:
-    core = set()
-    for line in path.open():
-        core.add(line.split("\t")[0].strip())
+    core = load_ili_set(path)
     log.info("%d items loaded from core ILI file at %s", len(core), path)
     return core
 
@@ -148,9 +156,17 @@ def _words(lex: lmf.Lexicon) -> str:
     return str(len(lex["entries"]))
 
 
-def _core(lex: lmf.Lexicon, core: set[str]) -> str:
+def _core(
+    lex: lmf.Lexicon,
+    core: set[str],
+    coverage: Optional[Coverage] = None,
+    mask: int = 0,
+) -> str:
     """Core|---:"""
-    incore = sum(1 for ss in lex["synsets"] if ss["ili"] in core)
+    if coverage is not None and lex["id"] in coverage:
+        incore = coverage.count(lex["id"], mask, gaps=True)
+    else:
+        incore = sum(1 for ss in lex["synsets"] if ss["ili"] in core)
     return f"{incore/len(core):.1%}"
 
 
@@ -163,6 +179,12 @@ if __name__ == "__main__":
         metavar="PATH",
         help="compute percentage of core synsets covered using core ILI file at PATH"
     )
+    parser.add_argument(
+        "--coverage",
+        type=Path,
+        metavar="PATH",
+        help="use the ILI coverage matrix at PATH (from scripts.build) for --core-ili"
+    )
     args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
     sys.exit(main(args))
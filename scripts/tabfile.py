@@ -0,0 +1,163 @@
+"""
+Fast reading of OMW TSV files.
+
+A TSV file is memory-mapped, so a byte range of it (e.g., a chunk
+loaded by :func:`scripts.tsv2lmf.load_parallel`) is read without
+reading what comes before it. The range is decoded in one call and
+split into lines in one call. This is faster in CPython than decoding
+line by line or field by field, which costs more interpreter work per
+row than the decoding itself. :func:`lines` yields the numbered lines
+for consumers that parse rows themselves. :func:`iter_rows` yields
+:class:`TSVRow` objects and can skip the rows that are not lemmas
+before building them.
+
+Compressed files (`.tab.gz`, `.tab.xz`, `.tab.zst`) cannot be mapped
+or read by byte range. Their lines are decoded block by block as a
+background thread decompresses the file (see
+:func:`scripts.compression.read_blocks`).
+
+This module only uses the standard library (with
+:mod:`scripts.compression`, which only imports `wn` to write files)
+so that `tsv2lmf.py` can import it when run as a script.
+"""
+
+import codecs
+import mmap
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+if __package__:
+    from . import compression
+else:  # imported by a script run directly, e.g., tsv2lmf.py
+    import compression
+
+ENCODING = "utf-8"
+
+# the bytes of a mapped file
+Content = Union[mmap.mmap, bytes]
+
+
+class TSVRow(NamedTuple):
+    offset_pos: str
+    type: str
+    text: str
+    order: int = -1  # only used by def and exe
+
+    def is_lemma(self) -> bool:
+        """Return True if the row is a lemma row.
+
+        Usually the row type is of the form `xyz:lemma` where `xyz` is
+        the language code. There are variations like `xyz:lemma:root`
+        and `xyz:lemma:brokenplural` (currently only in the Arabic
+        wordnet) or just `lemma`.
+        """
+        return "lemma" in self.type
+
+
+@contextmanager
+def mapped(path: Union[str, Path]) -> Iterator[Content]:
+    """Map the file at *path* into memory for reading.
+
+    Empty files, which cannot be mapped, give empty bytes. Compressed
+    files cannot be mapped and raise a :exc:`ValueError`.
+    """
+    if compression.is_compressed(path):
+        raise ValueError(f"cannot map a compressed file: {path}")
+    with open(path, "rb") as file:
+        try:
+            content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            yield b""
+            return
+        with content:
+            yield content
+
+
+def read_header(path: Union[str, Path]) -> str:
+    """Return the first line of the file at *path*."""
+    line = b""
+    with compression.open_binary(path) as file:
+        while b"\n" not in line and (block := file.read(4096)):
+            line += block
+    return line.split(b"\n", 1)[0].rstrip(b"\r").decode(ENCODING)
+
+
+def lines(
+    path: Union[str, Path],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    lineno: int = 2,
+) -> Iterator[tuple[int, str]]:
+    """Return an iterator of the numbered lines of *path*.
+
+    By default, all lines after the header are read. Otherwise the
+    lines in the byte range *start* to *end* are read, where *start*
+    is the beginning of line *lineno*; compressed files can only be
+    read whole. Lines keep any trailing whitespace except the newline,
+    and blank lines and comments are included.
+    """
+    if compression.is_compressed(path):
+        if start is not None or end is not None:
+            raise ValueError(f"cannot read a byte range of a compressed file: {path}")
+        return _decompressed_lines(path, lineno)
+    with mapped(path) as content:
+        if start is None:
+            start = content.find(b"\n") + 1 or len(content)
+        text = content[start:end].decode(ENCODING)
+    return enumerate(text.split("\n"), lineno)
+
+
+def _decompressed_lines(
+    path: Union[str, Path],
+    lineno: int,
+) -> Iterator[tuple[int, str]]:
+    decoder = codecs.getincrementaldecoder(ENCODING)()
+    header = True
+    pending = ""
+    for block in compression.read_blocks(path):
+        text = pending + decoder.decode(block)
+        *complete, pending = text.split("\n")
+        if header and complete:
+            header = False
+            complete = complete[1:]
+        for line in complete:
+            yield lineno, line
+            lineno += 1
+    if not header:  # else the file only has a header
+        yield lineno, pending + decoder.decode(b"", final=True)
+
+
+def iter_rows(
+    path: Union[str, Path],
+    lemmas_only: bool = False,
+) -> Iterator[TSVRow]:
+    """Yield the lemma, definition, and example rows of *path*.
+
+    Blank lines and comments are skipped. If *lemmas_only* is true,
+    other rows are skipped as well. A :exc:`ValueError` is raised for
+    rows of other types or with the wrong number of columns.
+    """
+    for lineno, line in lines(path):
+        if not line.strip() or line.startswith("#"):
+            continue
+        row = line.rstrip("\r").split("\t")
+        type_ = row[1] if len(row) > 1 else ""
+        if "lemma" in type_:
+            if len(row) != 3:
+                raise ValueError(
+                    f"{path}:{lineno}: unexpected number of columns for lemma"
+                )
+            yield TSVRow(*row)
+        elif lemmas_only:
+            continue
+        elif type_.endswith((":def", ":exe")):
+            if len(row) != 4:
+                raise ValueError(
+                    f"{path}:{lineno}: unexpected number of columns for def/exe"
+                )
+            offset_pos, type_, order, text = row
+            yield TSVRow(offset_pos, type_, text, order=int(order))
+        else:
+            raise ValueError(f"{path}:{lineno}: unexpected row type")
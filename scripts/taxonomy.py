@@ -0,0 +1,494 @@
+"""
+Precomputed hypernym hierarchy indexes for built lexicons.
+
+The hypernym graph (`hypernym` and `instance_hypernym` synset
+relations) of a lexicon is a DAG, as some synsets have more than one
+hypernym. Two complementary structures are written for it:
+
+- the sorted ancestors of each synset, for listing all ancestors with
+  a single slice and for checking ancestry with a binary search
+- interval labels (Agrawal et al., 1989) over the post-order numbering
+  of a spanning forest, where synset *y* is a descendant of *x* when
+  the post-order number of *y* is in one of the intervals of *x*;
+  multiple inheritance only adds intervals to the affected synsets
+
+A second index supports similarity measures (path, Wu-Palmer and
+Leacock-Chodorow) with precomputed minimum and maximum depths, the
+shortest distance from each synset to each of its ancestors, and an
+Euler tour of the spanning forest with a sparse table for range
+minimum queries. The lowest common hypernym of two synsets whose
+ancestors are all on their spanning-tree paths is found in constant
+time with the sparse table; other pairs (below some case of multiple
+inheritance) intersect their sorted ancestor lists, which are bounded
+by the depth of the hierarchy.
+
+Cycles in the data (e.g., the `inhibit`/`restrain` loop in the
+unpatched WordNet 3.0) are broken by ignoring the edge that closes
+the cycle, with a warning.
+"""
+
+import array
+import logging
+import math
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Optional
+
+from wn.lmf import Lexicon
+
+from . import arrays
+from .util import PathLike
+
+log = logging.getLogger("taxonomy")
+
+HYPERNYM_RELTYPES = ("hypernym", "instance_hypernym")
+
+
+# Graph Building #######################################################
+
+class HypernymGraph:
+    """The hypernym DAG of a lexicon over its sorted synset IDs."""
+
+    def __init__(self, lexicon: Lexicon):
+        synsets = sorted(lexicon.get("synsets", []), key=lambda ss: ss["id"])
+        self.ids: list[str] = [ss["id"] for ss in synsets]
+        # satellites share the adjective hierarchy (if any)
+        self.pos: list[str] = [
+            "a" if ss["partOfSpeech"] == "s" else ss["partOfSpeech"]
+            for ss in synsets
+        ]
+        index = {ssid: i for i, ssid in enumerate(self.ids)}
+        self.parents: list[list[int]] = [[] for _ in self.ids]
+        for ss in synsets:
+            parents = self.parents[index[ss["id"]]]
+            for rel in ss.get("relations", []):
+                target = index.get(rel["target"])
+                if rel["relType"] in HYPERNYM_RELTYPES and target is not None:
+                    if target not in parents:
+                        parents.append(target)
+        self.order = self._break_cycles()
+        self.children: list[list[int]] = [[] for _ in self.ids]
+        for i in self.order:
+            for p in self.parents[i]:
+                self.children[p].append(i)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _break_cycles(self) -> list[int]:
+        """Remove cycle-closing edges and return a topological order.
+
+        In the returned order, every synset comes after its hypernyms.
+        """
+        WHITE, GRAY, BLACK = 0, 1, 2
+        color = [WHITE] * len(self.ids)
+        order: list[int] = []
+        for start in range(len(self.ids)):
+            if color[start] != WHITE:
+                continue
+            color[start] = GRAY
+            stack: list[tuple[int, Iterator[int]]] = [
+                (start, iter(list(self.parents[start])))
+            ]
+            while stack:
+                node, parents = stack[-1]
+                for p in parents:
+                    if color[p] == GRAY:
+                        log.warning(
+                            "Ignoring hypernym cycle: %s -> %s",
+                            self.ids[node],
+                            self.ids[p],
+                        )
+                        self.parents[node].remove(p)
+                    elif color[p] == WHITE:
+                        color[p] = GRAY
+                        stack.append((p, iter(list(self.parents[p]))))
+                        break
+                else:
+                    color[node] = BLACK
+                    order.append(node)
+                    stack.pop()
+        return order
+
+    def roots(self) -> list[int]:
+        return [i for i, parents in enumerate(self.parents) if not parents]
+
+    def tree_children(self) -> list[list[int]]:
+        """Return the children in the spanning forest.
+
+        The spanning forest uses the first hypernym of each synset as
+        its tree parent.
+        """
+        children: list[list[int]] = [[] for _ in self.ids]
+        for i, parents in enumerate(self.parents):
+            if parents:
+                children[parents[0]].append(i)
+        return children
+
+    def ancestor_distances(self) -> list[dict[int, int]]:
+        """Return the shortest distance from each synset to its ancestors."""
+        distances: list[dict[int, int]] = [{} for _ in self.ids]
+        for i in self.order:  # hypernyms first
+            dist = distances[i]
+            for p in self.parents[i]:
+                dist[p] = 1
+                for a, d in distances[p].items():
+                    if d + 1 < dist.get(a, d + 2):
+                        dist[a] = d + 1
+        return distances
+
+
+# Closure Index ########################################################
+
+def write_closure(lexicon: Lexicon, directory: Path) -> None:
+    """Write the hypernym closure index of *lexicon* into *directory*."""
+    graph = HypernymGraph(lexicon)
+    path = directory / f"{lexicon['id']}.hypernyms.npz"
+    arrays.save(path, build_closure(graph))
+
+
+def build_closure(graph: HypernymGraph) -> dict[str, arrays.Array]:
+    distances = graph.ancestor_distances()
+    ancestor_ptr, ancestor_idx = _csr(sorted(dist) for dist in distances)
+
+    post, low, by_post = _post_order(graph)
+    intervals: list[list[tuple[int, int]]] = [[] for _ in range(len(graph))]
+    for i in reversed(graph.order):  # hyponyms first
+        spans = [(low[i], post[i])]
+        for c in graph.children[i]:
+            spans.extend(intervals[c])
+        intervals[i] = _merge(spans)
+    interval_ptr, lows = _csr([lo for lo, _ in spans] for spans in intervals)
+    highs = array.array("i", (hi for spans in intervals for _, hi in spans))
+
+    ids_offsets, ids_data = arrays.encode_strings(graph.ids)
+    return {
+        "ids_offsets": ids_offsets,
+        "ids_data": ids_data,
+        "ancestor_ptr": ancestor_ptr,
+        "ancestors": ancestor_idx,
+        "post": array.array("i", post),
+        "by_post": array.array("i", by_post),
+        "interval_ptr": interval_ptr,
+        "interval_low": lows,
+        "interval_high": highs,
+    }
+
+
+def _post_order(graph: HypernymGraph) -> tuple[list[int], list[int], list[int]]:
+    """Number synsets in post-order over the spanning forest.
+
+    Besides the post-order number of each synset, this returns the
+    lowest number in its subtree and the inverse mapping.
+    """
+    tree_children = graph.tree_children()
+    post = [0] * len(graph)
+    low = [0] * len(graph)
+    by_post: list[int] = []
+    for root in graph.roots():
+        low[root] = len(by_post)
+        stack = [(root, iter(tree_children[root]))]
+        while stack:
+            node, children = stack[-1]
+            for c in children:
+                low[c] = len(by_post)
+                stack.append((c, iter(tree_children[c])))
+                break
+            else:
+                post[node] = len(by_post)
+                by_post.append(node)
+                stack.pop()
+    return post, low, by_post
+
+
+def _merge(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for lo, hi in sorted(spans):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _csr(rows: Iterable[Iterable[int]]) -> tuple[array.array, array.array]:
+    ptr = array.array("q", [0])
+    idx = array.array("i")
+    for row in rows:
+        idx.extend(row)
+        ptr.append(len(idx))
+    return ptr, idx
+
+
+class _Index:
+    def __init__(self, path: PathLike):
+        self._arrays = a = arrays.load(path)
+        self.ids = arrays.StringArray(a["ids_offsets"], a["ids_data"])
+
+    def _index(self, synset_id: str) -> int:
+        i = self.ids.find(synset_id)
+        if i < 0:
+            raise KeyError(synset_id)
+        return i
+
+
+class HypernymIndex(_Index):
+    """Query the hypernym closure index written by :func:`write_closure`."""
+
+    def ancestors(self, synset_id: str) -> list[str]:
+        """Return the IDs of all hypernyms of *synset_id*, transitively."""
+        a = self._arrays
+        i = self._index(synset_id)
+        start, end = a["ancestor_ptr"][i], a["ancestor_ptr"][i + 1]
+        return [self.ids[j] for j in a["ancestors"][start:end]]
+
+    def descendants(self, synset_id: str) -> list[str]:
+        """Return the IDs of all hyponyms of *synset_id*, transitively."""
+        a = self._arrays
+        i = self._index(synset_id)
+        result: list[str] = []
+        for k in range(a["interval_ptr"][i], a["interval_ptr"][i + 1]):
+            for p in range(a["interval_low"][k], a["interval_high"][k] + 1):
+                j = a["by_post"][p]
+                if j != i:
+                    result.append(self.ids[j])
+        return result
+
+    def is_a(self, synset_id: str, ancestor_id: str) -> bool:
+        """Return True if *ancestor_id* is a transitive hypernym of *synset_id*."""
+        a = self._arrays
+        i, j = self._index(synset_id), self._index(ancestor_id)
+        if i == j:
+            return False
+        start, end = a["interval_ptr"][j], a["interval_ptr"][j + 1]
+        p = a["post"][i]
+        k = bisect_right(a["interval_low"], p, start, end) - 1
+        return k >= start and p <= a["interval_high"][k]
+
+
+# Similarity Index #####################################################
+
+def write_similarity(lexicon: Lexicon, directory: Path) -> None:
+    """Write the similarity index of *lexicon* into *directory*."""
+    graph = HypernymGraph(lexicon)
+    path = directory / f"{lexicon['id']}.similarity.npz"
+    arrays.save(path, build_similarity(graph))
+
+
+def build_similarity(graph: HypernymGraph) -> dict[str, arrays.Array]:
+    n = len(graph)
+    min_depth = [0] * n
+    max_depth = [0] * n
+    tree_exact = [1] * n  # 1 if all ancestors are on the spanning-tree path
+    for i in graph.order:  # hypernyms first
+        parents = graph.parents[i]
+        if parents:
+            min_depth[i] = 1 + min(min_depth[p] for p in parents)
+            max_depth[i] = 1 + max(max_depth[p] for p in parents)
+            tree_exact[i] = int(len(parents) == 1 and tree_exact[parents[0]])
+
+    distances = graph.ancestor_distances()
+    ancestor_ptr, ancestor_idx = _csr(sorted(dist) for dist in distances)
+    ancestor_dist = array.array(
+        "i", (dist[a] for dist in distances for a in sorted(dist))
+    )
+
+    euler, euler_depth, first = _euler_tour(graph)
+    sparse_ptr, sparse = _sparse_table(euler_depth)
+
+    pos_max_depth: dict[str, int] = {}
+    for pos, depth in zip(graph.pos, max_depth):
+        pos_max_depth[pos] = max(depth, pos_max_depth.get(pos, 0))
+
+    ids_offsets, ids_data = arrays.encode_strings(graph.ids)
+    return {
+        "ids_offsets": ids_offsets,
+        "ids_data": ids_data,
+        "pos": "".join(graph.pos).encode("ascii"),
+        "min_depth": array.array("i", min_depth),
+        "max_depth": array.array("i", max_depth),
+        "tree_exact": bytes(tree_exact),
+        "ancestor_ptr": ancestor_ptr,
+        "ancestors": ancestor_idx,
+        "ancestor_dist": ancestor_dist,
+        "euler": euler,
+        "euler_depth": euler_depth,
+        "first": first,
+        "sparse_ptr": sparse_ptr,
+        "sparse": sparse,
+        "taxonomy_pos": "".join(pos_max_depth).encode("ascii"),
+        "taxonomy_depth": array.array("i", pos_max_depth.values()),
+    }
+
+
+def _euler_tour(
+    graph: HypernymGraph,
+) -> tuple[array.array, array.array, array.array]:
+    """Return the Euler tour of the spanning forest.
+
+    Trees are joined under a virtual root (-1) with depth -1. Synsets
+    without hypernyms or hyponyms are left out of the tour and their
+    first position is -1.
+    """
+    tree_children = graph.tree_children()
+    euler = array.array("i")
+    depth = array.array("i")
+    first = array.array("i", [-1] * len(graph))
+    for root in graph.roots():
+        if not tree_children[root]:
+            continue
+        if euler:
+            euler.append(-1)
+            depth.append(-1)
+        stack = [(root, iter(tree_children[root]))]
+        first[root] = len(euler)
+        euler.append(root)
+        depth.append(0)
+        while stack:
+            node, children = stack[-1]
+            for c in children:
+                first[c] = len(euler)
+                euler.append(c)
+                depth.append(len(stack))
+                stack.append((c, iter(tree_children[c])))
+                break
+            else:
+                stack.pop()
+                if stack:
+                    euler.append(stack[-1][0])
+                    depth.append(len(stack) - 1)
+    return euler, depth, first
+
+
+def _sparse_table(values: array.array) -> tuple[array.array, array.array]:
+    """Build a sparse table for range minimum queries over *values*.
+
+    Level *k* holds, for each position *i*, the position of the
+    minimum value in `values[i:i + 2**k]`. Levels are concatenated and
+    the returned pointer array gives the start of each level.
+    """
+    ptr = array.array("q", [0])
+    table = array.array("i", range(len(values)))
+    ptr.append(len(table))
+    k = 1
+    while (1 << k) <= len(values):
+        prev, half = ptr[k - 1], 1 << (k - 1)
+        for i in range(len(values) - (1 << k) + 1):
+            left, right = table[prev + i], table[prev + i + half]
+            table.append(left if values[left] <= values[right] else right)
+        ptr.append(len(table))
+        k += 1
+    return ptr, table
+
+
+class SimilarityIndex(_Index):
+    """Query the similarity index written by :func:`write_similarity`.
+
+    The similarity measures follow the definitions used by the NLTK
+    without simulated roots, so synsets without a common hypernym
+    have no similarity.
+    """
+
+    def __init__(self, path: PathLike):
+        super().__init__(path)
+        a = self._arrays
+        self._taxonomy_depth = dict(
+            zip(bytes(a["taxonomy_pos"]).decode("ascii"), a["taxonomy_depth"])
+        )
+
+    def min_depth(self, synset_id: str) -> int:
+        return self._arrays["min_depth"][self._index(synset_id)]
+
+    def max_depth(self, synset_id: str) -> int:
+        return self._arrays["max_depth"][self._index(synset_id)]
+
+    def common_hypernyms(self, a: str, b: str) -> list[str]:
+        """Return the common hypernyms of *a* and *b*, including themselves."""
+        common = self._common_hypernyms(self._index(a), self._index(b))
+        return [self.ids[k] for k in sorted(common)]
+
+    def lowest_common_hypernym(self, a: str, b: str) -> Optional[str]:
+        """Return the deepest common hypernym (or self) of *a* and *b*."""
+        result = self._lcs(self._index(a), self._index(b))
+        return None if result is None else self.ids[result[0]]
+
+    def shortest_path_distance(self, a: str, b: str) -> Optional[int]:
+        """Return the length of the shortest hypernym path from *a* to *b*."""
+        i, j = self._index(a), self._index(b)
+        if i == j:
+            return 0
+        common = self._common_hypernyms(i, j)
+        if not common:
+            return None
+        return min(di + dj for di, dj in common.values())
+
+    def path_similarity(self, a: str, b: str) -> Optional[float]:
+        distance = self.shortest_path_distance(a, b)
+        return None if distance is None else 1 / (distance + 1)
+
+    def wup_similarity(self, a: str, b: str) -> Optional[float]:
+        result = self._lcs(self._index(a), self._index(b))
+        if result is None:
+            return None
+        lcs, di, dj = result
+        depth = self._arrays["max_depth"][lcs] + 1
+        return (2 * depth) / (di + dj + 2 * depth)
+
+    def lch_similarity(self, a: str, b: str) -> Optional[float]:
+        pos = self._arrays["pos"]
+        if pos[self._index(a)] != pos[self._index(b)]:
+            return None
+        distance = self.shortest_path_distance(a, b)
+        if distance is None:
+            return None
+        depth = self._taxonomy_depth[chr(pos[self._index(a)])]
+        if depth == 0:
+            return None
+        return -math.log((distance + 1) / (2 * depth))
+
+    def _lcs(self, i: int, j: int) -> Optional[tuple[int, int, int]]:
+        """Return the lowest common hypernym and the distances to it."""
+        a = self._arrays
+        if i == j:
+            return i, 0, 0
+        if a["tree_exact"][i] and a["tree_exact"][j]:
+            lca = self._tree_lca(i, j)
+            if lca is None:
+                return None
+            depth = a["max_depth"][lca]
+            return lca, a["max_depth"][i] - depth, a["max_depth"][j] - depth
+        common = self._common_hypernyms(i, j)
+        if not common:
+            return None
+        max_depth = a["max_depth"]
+        lcs = max(common, key=lambda k: (max_depth[k], -k))
+        return (lcs, *common[lcs])
+
+    def _tree_lca(self, i: int, j: int) -> Optional[int]:
+        a = self._arrays
+        left, right = a["first"][i], a["first"][j]
+        if left < 0 or right < 0:
+            return None
+        if left > right:
+            left, right = right, left
+        k = (right - left + 1).bit_length() - 1
+        level = a["sparse_ptr"][k]
+        x = a["sparse"][level + left]
+        y = a["sparse"][level + right - (1 << k) + 1]
+        euler_depth = a["euler_depth"]
+        node = a["euler"][x if euler_depth[x] <= euler_depth[y] else y]
+        return None if node < 0 else node
+
+    def _common_hypernyms(self, i: int, j: int) -> dict[int, tuple[int, int]]:
+        """Map common hypernyms (or self) to their distances from *i* and *j*."""
+        di, dj = self._ancestors(i), self._ancestors(j)
+        return {k: (di[k], dj[k]) for k in di.keys() & dj.keys()}
+
+    def _ancestors(self, i: int) -> dict[int, int]:
+        a = self._arrays
+        start, end = a["ancestor_ptr"][i], a["ancestor_ptr"][i + 1]
+        ancestors = dict(zip(a["ancestors"][start:end], a["ancestor_dist"][start:end]))
+        ancestors[i] = 0
+        return ancestors
@@ -1,27 +1,71 @@
+"""
+Report redundant lemmas and highly polysemous lemmas in OMW TSV files.
+
+Usage:
+
+    python -m scripts.tsv-duplicates [-iudq] [-p N] TSV [TSV ...]
+
+Each TSV is a file or a directory searched for `wn-*.tab` files, so
+`python -m scripts.tsv-duplicates wns` audits the whole tree. Lemmas
+of a synset are redundant if they are equal (`exact`) or equal after
+the normalizations selected by the options. Each distinct lemma is
+normalized once and the lemmas of a file are grouped by hashing, so a
+file is read and grouped in a single pass. Files are audited by a
+pool of worker processes (`--processes`) and reported in order,
+followed by the totals if there are several files.
+
+With `--near=synset`, clusters of near-duplicate lemmas (typos,
+transposed letters, variant hyphenation) within each synset are also
+reported with their confidence scores, and with `--near=lexicon`
+among all the lemmas of a file (see :mod:`scripts.neardup`).
+Near-duplicates do not change the exit status of `--check`.
+"""
+
 import argparse
 import logging
 import sys
-from functools import partial
-from itertools import groupby
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Callable
-from unicodedata import normalize, combining
+from typing import Callable, NamedTuple, Optional
 
-from .util import load_tsv, strip_quotes
+from . import neardup
+from .lint import find_files
+from .tabfile import iter_rows
+from .util import fold_diacritics, strip_quotes
 
 logger = logging.getLogger("tsv-duplicates")
 
 
+class _FoldTable(dict):
+    """A :meth:`str.translate` table folding diacritics, filled lazily.
+
+    NFKD decomposes each character on its own, so folding a lemma one
+    character at a time is the same as :func:`fold_diacritics`.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        folded = self[codepoint] = fold_diacritics(chr(codepoint))
+        return folded
+
+
+_fold_table = _FoldTable()
+
+
 def make_normalizer(args: argparse.Namespace) -> Callable[[str], str]:
 
+    @lru_cache(maxsize=None)
     def normalize_lemma(s: str) -> str:
         norm = s
         if args.ignore_case:
             norm = norm.lower()
         if args.underscore:
             norm = norm.replace("_", " ")
-        if args.diacritics:
-            norm = "".join(c for c in normalize("NFKD", norm) if not combining(c))
+        if args.diacritics and not norm.isascii():
+            norm = norm.translate(_fold_table)
         if args.quotes:
             norm = strip_quotes(norm.strip())
         return norm
@@ -29,113 +73,166 @@ def make_normalizer(args: argparse.Namespace) -> Callable[[str], str]:
     return normalize_lemma
 
 
-def check_duplicates(
-    offset_pos: str,
-    lemma_data: list[tuple[str, str]],
-    normalizer: Callable[[str], str],
-    label: str,
-    verbose: bool,
-) -> int:
-    _sorted = sorted(lemma_data, key=lambda x: normalizer(x[1]))
-    count = 0
-    for _, grp in groupby(_sorted, key=lambda x: (x[0], normalizer(x[1]))):
-        dupes = list(grp)
-        if len(dupes) > 1:
-            if verbose:
-                lemmas = [lem for _, lem in dupes]
-                print(f"\t{offset_pos}\t{label}\t{'; '.join(lemmas)}")
-            count += len(dupes) - 1
-    return count
-
-
-def check_polysemy(
-    data: dict[str, list[str]],
-    polysemy_threshold: int,
-    verbose: bool,
-) -> int:
-    # map lemmas to synsets
-    _data: dict[str, list[str]] = {}
-    for offset_pos, lemmas in data.items():
-        for lemma in set(lemmas):
-            _data.setdefault(lemma, []).append(offset_pos)
-    polysem_count = 0
-    for lemma, offsets in _data.items():
-        if len(offsets) >= polysemy_threshold:
-            if verbose:
-                print(f"\t{lemma}\tpolysem\t{'; '.join(offsets)}")
-            polysem_count += 1
-    return polysem_count
-
-
-def load_data(
-    path: Path,
-    ignore_lemma_type: bool,
-) -> dict[str, list[tuple[str, str]]]:
-    data: dict[str, list[tuple[str, str]]] = {}
-    _, rows = load_tsv(path)
-    for row in rows:
-        if not row.is_lemma():
-            continue
-        lemma_type = "" if ignore_lemma_type else row.type
-        data.setdefault(row.offset_pos, []).append((lemma_type, row.text))
-    return data
+def make_label(args: argparse.Namespace) -> str:
+    return "".join([
+        "i" if args.ignore_case else "",
+        "u" if args.underscore else "",
+        "d" if args.diacritics else "",
+        "q" if args.quotes else "",
+    ])
 
 
-def main(args: argparse.Namespace) -> int:
-    retcode = 0
+class Report(NamedTuple):
+    path: str
+    synsets: int  # with redundant lemmas
+    lemmas: int  # redundant lemmas
+    polysemous: int  # lemmas in at least --polysemy-threshold synsets
+    near: int  # clusters of near-duplicates
+    # lines for --verbose
+    duplicate_details: list[str]
+    polysemy_details: list[str]
+    near_details: list[str]
 
-    check_exact = partial(
-        check_duplicates,
-        normalizer=str,
-        label="exact",
-        verbose=args.verbose,
-    )
-    check_normalized = partial(
-        check_duplicates,
-        normalizer=make_normalizer(args),
-        label="".join([
-            "i" if args.ignore_case else "",
-            "u" if args.underscore else "",
-            "d" if args.diacritics else "",
-            "q" if args.quotes else "",
-        ]),
-        verbose=args.verbose,
+
+def audit_file(path: Path, args: argparse.Namespace) -> Report:
+    """Return the redundant and polysemous lemmas of the TSV file at *path*."""
+    normalize = make_normalizer(args)
+    label = make_label(args)
+
+    # offset-pos -> (lemma type, normalized lemma) -> lemmas
+    groups: dict[str, dict[tuple[str, str], list[str]]] = {}
+    # (lemma type, lemma) -> offset-pos (as an ordered set)
+    senses: dict[tuple[str, str], dict[str, None]] = {}
+    for row in iter_rows(path, lemmas_only=True):
+        lemma_type = "" if args.ignore_lemma_type else row.type
+        key = (lemma_type, normalize(row.text))
+        groups.setdefault(row.offset_pos, {}).setdefault(key, []).append(row.text)
+        senses.setdefault((lemma_type, row.text), {})[row.offset_pos] = None
+
+    details: list[str] = []
+    synsets = lemma_count = 0
+    for offset_pos, synset_groups in groups.items():
+        redundant = 0
+        for lemmas in synset_groups.values():
+            if len(lemmas) < 2:
+                continue
+            # exact duplicates, then normalized duplicates minus exact ones
+            redundant += len(lemmas) - 1
+            if args.verbose:
+                counts = Counter(lemmas)
+                for lemma, n in counts.items():
+                    if n > 1:
+                        details.append(
+                            f"\t{offset_pos}\texact\t{'; '.join([lemma] * n)}"
+                        )
+                if len(counts) > 1:
+                    details.append(f"\t{offset_pos}\t{label}\t{'; '.join(counts)}")
+        if redundant:
+            synsets += 1
+            lemma_count += redundant
+
+    polysemy_details: list[str] = []
+    polysemous = 0
+    if args.polysemy_threshold:
+        for (_, lemma), offsets in senses.items():
+            if len(offsets) >= args.polysemy_threshold:
+                if args.verbose:
+                    polysemy_details.append(f"\t{lemma}\tpolysem\t{'; '.join(offsets)}")
+                polysemous += 1
+
+    # offset-pos (or * for the whole file) -> lemmas
+    blocks: dict[str, Iterable[str]] = {}
+    if args.near == "synset":
+        for offset_pos, synset_groups in groups.items():
+            blocks[offset_pos] = chain.from_iterable(synset_groups.values())
+    elif args.near == "lexicon":
+        blocks["*"] = (lemma for _, lemma in senses)
+    near_details: list[str] = []
+    near = 0
+    for offset_pos, lemmas in blocks.items():
+        for cluster in neardup.find_clusters(lemmas, args.near_min_score):
+            if args.verbose:
+                near_details.append(
+                    f"\t{offset_pos}\tnear:{cluster.score:.2f}\t"
+                    f"{'; '.join(cluster.lemmas)}"
+                )
+            near += 1
+
+    return Report(
+        str(path),
+        synsets,
+        lemma_count,
+        polysemous,
+        near,
+        details,
+        polysemy_details,
+        near_details,
     )
 
-    for path in args.TSV:
-        print(f"Checking for duplicates in {path}")
-        data = load_data(path, args.ignore_lemma_type)
-
-        synsets: set[str] = set()
-        lemma_count = 0
-        for offset_pos, lemma_data in data.items():
-            # exact duplicates
-            if cnt := check_exact(offset_pos, lemma_data):
-                synsets.add(offset_pos)
-                lemma_count += cnt
-            # normalized duplicates minus exact duplicates
-            if cnt := check_normalized(offset_pos, set(lemma_data)):
-                synsets.add(offset_pos)
-                lemma_count += cnt
-        print(f"  Synsets with redundant lemmas: {len(synsets)}")
-        print(f"  Total count of redundant lemmas: {lemma_count}")
-
-        if lemma_count and args.check:
-            retcode = 1
 
-        if args.polysemy_threshold:
-            polysem_count = check_polysemy(data, args.polysemy_threshold, args.verbose)
-            print(f"  Lemmas with > {args.polysemy_threshold} senses: {polysem_count}")
+def audit(
+    paths: Sequence[Path],
+    args: argparse.Namespace,
+    processes: Optional[int] = None,
+) -> list[Report]:
+    """Audit the TSV files at *paths* with a pool of processes."""
+    if processes == 1 or len(paths) < 2:
+        return [audit_file(path, args) for path in paths]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(
+            executor.map(audit_file, paths, [args] * len(paths), chunksize=8)
+        )
 
-            if polysem_count and args.check:
-                retcode = 1
 
-    return retcode
+def print_report(report: Report, args: argparse.Namespace) -> None:
+    print(f"Checking for duplicates in {report.path}")
+    for line in report.duplicate_details:
+        print(line)
+    print(f"  Synsets with redundant lemmas: {report.synsets}")
+    print(f"  Total count of redundant lemmas: {report.lemmas}")
+    if args.polysemy_threshold:
+        for line in report.polysemy_details:
+            print(line)
+        print(f"  Lemmas with > {args.polysemy_threshold} senses: {report.polysemous}")
+    if args.near:
+        for line in report.near_details:
+            print(line)
+        print(f"  Near-duplicate clusters: {report.near}")
+
+
+def main(args: argparse.Namespace) -> int:
+    paths = find_files(args.TSV)
+    reports = audit(paths, args, args.processes)
+    for report in reports:
+        print_report(report, args)
+
+    if len(reports) > 1:
+        print(f"Total for {len(reports)} files")
+        print(f"  Synsets with redundant lemmas: {sum(r.synsets for r in reports)}")
+        print(f"  Total count of redundant lemmas: {sum(r.lemmas for r in reports)}")
+        if args.polysemy_threshold:
+            polysemous = sum(r.polysemous for r in reports)
+            print(f"  Lemmas with > {args.polysemy_threshold} senses: {polysemous}")
+        if args.near:
+            print(f"  Near-duplicate clusters: {sum(r.near for r in reports)}")
+
+    if args.check and any(
+        report.lemmas or (args.polysemy_threshold and report.polysemous)
+        for report in reports
+    ):
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("TSV", nargs="+", type=Path, help="path to TSV file")
+    parser.add_argument(
+        "TSV",
+        nargs="+",
+        type=Path,
+        help="path to TSV file (may be .gz, .xz, or .zst) or directory of "
+             "wn-*.tab files",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -184,6 +281,26 @@ if __name__ == "__main__":
         action="store_true",
         help="don't consider the lemma type column for redundancies",
     )
+    parser.add_argument(
+        "--near",
+        choices=("synset", "lexicon"),
+        help="report clusters of near-duplicate lemmas within each synset "
+             "or among all lemmas of a file",
+    )
+    parser.add_argument(
+        "--near-min-score",
+        type=float,
+        default=neardup.MIN_SCORE,
+        metavar="S",
+        help=f"minimum Jaro-Winkler score of near-duplicates "
+             f"(default: {neardup.MIN_SCORE})",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help="number of worker processes (default: number of CPUs)",
+    )
 
     args = parser.parse_args()
     logging.basicConfig(level=logging.WARNING if args.verbose else logging.ERROR)
@@ -4,15 +4,16 @@
 
 import argparse
 import logging
+import os
 import sys
 from collections import Counter
-from collections.abc import Sequence
+from collections.abc import Container, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
 from wn.lmf import (
-    dump,
     LexicalResource,
     Lexicon,
     Metadata,
@@ -26,13 +27,19 @@ from wn.lmf import (
     Example,
     Synset,
     Definition,
+    Relation,
     Dependency,
 )
 
 if __name__ == "__main__":
-    from util import escape_lemma, load_ili_map, PathLike
+    import compression
+    import shard
+    import tabfile
+    import wndb
+    from util import escape_lemma, load_ili_map, load_ili_set, PathLike
 else:
-    from .util import escape_lemma, load_ili_map, PathLike
+    from . import compression, shard, tabfile, wndb
+    from .util import escape_lemma, load_ili_map, load_ili_set, PathLike
 
 
 LMF_VERSION = "1.4"
@@ -115,6 +122,7 @@ class SynsetData:
     members: dict[str, Sense] = field(default_factory=dict)
     definitions: list[tuple[int, str]] = field(default_factory=list)
     examples: list[tuple[int, str]] = field(default_factory=list)
+    relations: list[tuple[str, str]] = field(default_factory=list)
     lexicalized: bool = True
 
 
@@ -133,6 +141,10 @@ class TSVData:
     sense_counts: Counter = field(default_factory=Counter)
 
 
+# maps a normalized offset-pos to its (relType, target offset-pos) pairs
+SynsetRelations = dict[str, list[tuple[str, str]]]
+
+
 # EXCEPTIONS ###########################################################
 
 
@@ -165,6 +177,19 @@ def main(args: argparse.Namespace) -> int:
     else:
         ilimap = None
 
+    if args.project_relations:
+        relations = load_synset_relations(Path(args.project_relations))
+    else:
+        relations = None
+
+    if args.subset_ili:
+        if ilimap is None:
+            raise ValueError("--subset-ili requires --ili-map")
+        ilis = load_ili_set(args.subset_ili)
+        subset = {ssid for ssid, ili in ilimap.items() if ili in ilis}
+    else:
+        subset = None
+
     convert(
         source,
         destination,
@@ -180,8 +205,12 @@ def main(args: argparse.Namespace) -> int:
         requires=requires,
         meta=meta,
         ilimap=ilimap,
+        relations=relations,
+        subset=subset,
+        shard_by=args.shard_by,
         logfile=args.log,
         abort_on_errors=args.abort_on_errors,
+        processes=args.processes,
     )
 
     return 0
@@ -202,9 +231,16 @@ def convert(
     requires: Optional[Dependency] = None,
     meta: Optional[Metadata] = None,
     ilimap: Optional[dict[str, str]] = None,
+    relations: Optional[SynsetRelations] = None,
+    subset: Optional[Container[str]] = None,
+    shard_by: Optional[str] = None,
     logfile: PathLike = "",
     abort_on_errors: bool = False,
-) -> None:
+    processes: Optional[int] = None,
+) -> Lexicon:
+    if shard_by and compression.is_compressed(outfile):
+        raise ValueError("sharded output cannot be compressed")
+
     if logfile:
         logging.basicConfig(filename=str(logfile), filemode="w", force=True)
     else:
@@ -233,13 +269,31 @@ def convert(
     if ilimap is None:
         ilimap = {}
 
-    data = load(Path(source), lex["id"], abort_on_errors=abort_on_errors)
+    if processes is not None and processes > 1:
+        data = load_parallel(
+            Path(source),
+            lex["id"],
+            processes=processes,
+            abort_on_errors=abort_on_errors,
+            subset=subset,
+        )
+    else:
+        data = load(
+            Path(source), lex["id"], abort_on_errors=abort_on_errors, subset=subset
+        )
     process_lexical_gaps(data)
+    if relations is not None:
+        project_relations(data, relations)
     validate(lex, data)
     build(lex, data, ilimap)
 
-    resource = LexicalResource(lmf_version=LMF_VERSION, lexicons=[lex])
-    dump(resource, outfile)
+    if shard_by:
+        shard.write_shards(lex, Path(outfile), shard_by, LMF_VERSION)
+    else:
+        resource = LexicalResource(lmf_version=LMF_VERSION, lexicons=[lex])
+        compression.dump(resource, outfile)
+
+    return lex
 
 
 # DATA LOADING AND VALIDATION ##########################################
@@ -358,45 +412,237 @@ FUNCTIONS = {
 def load(
     source: Path,
     lex_id: str,
-    abort_on_errors: bool = False
+    abort_on_errors: bool = False,
+    subset: Optional[Container[str]] = None,
 ) -> TSVData:
-    data = TSVData(lex_id)
-    with source.open("rt") as tabfile:
-        _load_header(data, next(tabfile))  # reads line 1
-        prefix = f"{data.language}:"
+    """Load the TSV file at *source*.
 
-        for lineno, line in enumerate(tabfile, 2):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-
-            pwn_id, type_, *args = line.split("\t")
-            pwn_id = pwn_id.strip()
-            # only match for current language
-            type_ = type_.strip().removeprefix(prefix)
+    If *subset* is given, rows for synsets whose offset-pos IDs (e.g.,
+    `00001740-n`) are not in *subset* are skipped before parsing.
+    """
+    data = TSVData(lex_id)
+    _load_header(data, tabfile.read_header(source))
+    skipped = _load_lines(data, tabfile.lines(source), abort_on_errors, subset)
+    if skipped:
+        log.info("Skipped %d lines for synsets not in the subset", skipped)
+    return data
 
-            if pwn_id not in data.synsets:
-                offset, pos = _split_offset_pos(pwn_id)
-                ssid = synset_id(lex_id, offset, pos)
-                data.synsets[pwn_id] = SynsetData(ssid, pos)
 
+def _load_lines(
+    data: TSVData,
+    lines: Iterable[tuple[int, str]],
+    abort_on_errors: bool,
+    subset: Optional[Container[str]],
+) -> int:
+    """Load numbered *lines* into *data*; return the number skipped."""
+    skipped = 0
+    prefix = f"{data.language}:"
+    for lineno, line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        pwn_id, type_, *args = line.split("\t")
+        pwn_id = pwn_id.strip()
+        if subset is not None and pwn_id not in subset:
+            skipped += 1
+            continue
+        # only match for current language
+        type_ = type_.strip().removeprefix(prefix)
+
+        if pwn_id not in data.synsets:
+            offset, pos = _split_offset_pos(pwn_id)
+            ssid = synset_id(data.lex_id, offset, pos)
+            data.synsets[pwn_id] = SynsetData(ssid, pos)
+
+        try:
+            func = FUNCTIONS[type_]
+        except KeyError:
+            log.warning("Ignoring line %d with unknown type: %s", lineno, line)
+        else:
             try:
-                func = FUNCTIONS[type_]
-            except KeyError:
-                log.warning("Ignoring line %d with unknown type: %s", lineno, line)
+                func(data, pwn_id, args)
+            except TSV2LMFError as exc:
+                log.error("%s\n  at line %d: %s", str(exc), lineno, line)
+                if abort_on_errors:
+                    raise
             else:
-                try:
-                    func(data, pwn_id, args)
-                except TSV2LMFError as exc:
-                    log.error("%s\n  at line %d: %s", str(exc), lineno, line)
-                    if abort_on_errors:
-                        raise
-                else:
-                    data.prev_pwn_id = pwn_id
+                data.prev_pwn_id = pwn_id
+    return skipped
+
+
+# PARALLEL LOADING #####################################################
+
+
+# files are only split if each chunk would have at least this many bytes
+MIN_CHUNK_SIZE = 1 << 19
+
+
+def load_parallel(
+    source: Path,
+    lex_id: str,
+    processes: Optional[int] = None,
+    abort_on_errors: bool = False,
+    subset: Optional[Container[str]] = None,
+) -> TSVData:
+    """Load the TSV file at *source* in chunks with worker processes.
+
+    The file is cut into up to *processes* (by default, one per CPU)
+    byte ranges at synset boundaries, which are loaded into partial
+    :class:`TSVData` objects and merged (see :func:`merge_data`). The
+    result is the same as with :func:`load`; compressed files and
+    files smaller than two chunks of :data:`MIN_CHUNK_SIZE` are loaded
+    by :func:`load`.
+    """
+    if compression.is_compressed(source):
+        ranges = []  # compressed files are not split
+    else:
+        ranges = _chunk_ranges(source, processes or os.cpu_count() or 1)
+    if len(ranges) < 2:
+        return load(source, lex_id, abort_on_errors=abort_on_errors, subset=subset)
+    log.info("Loading %s in %d chunks", source, len(ranges))
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [
+            executor.submit(
+                _load_chunk, source, lex_id, chunk, abort_on_errors, subset
+            )
+            for chunk in ranges
+        ]
+        parts = [future.result() for future in futures]
+    skipped = sum(part_skipped for _, part_skipped in parts)
+    if skipped:
+        log.info("Skipped %d lines for synsets not in the subset", skipped)
+    return merge_data([part for part, _ in parts])
+
+
+def _chunk_ranges(source: Path, n: int) -> list[tuple[int, int, int]]:
+    """Return (start, end, line number) of up to *n* chunks of *source*.
+
+    Chunks start at the first row of a synset after the previous row's
+    synset, so rows of a synset are in one chunk if they are grouped.
+    """
+    with tabfile.mapped(source) as content:
+        size = len(content)
+        start = content.find(b"\n") + 1  # after the header
+        if start == 0:
+            return []
+        n = min(n, (size - start) // MIN_CHUNK_SIZE)
+        bounds = [start]
+        for i in range(1, n):
+            pos = _synset_boundary(content, start + (size - start) * i // n)
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+        bounds.append(size)
+        ranges = []
+        lineno = 2
+        for begin, end in zip(bounds, bounds[1:]):
+            ranges.append((begin, end, lineno))
+            lineno += content[begin:end].count(b"\n")
+    return ranges
+
+
+def _row_id(content: tabfile.Content, start: int) -> tuple[Optional[bytes], int]:
+    """Return the synset ID of the row at *start* and the next row's start."""
+    end = content.find(b"\n", start)
+    end = len(content) if end < 0 else end + 1
+    line = content[start:end].strip()
+    if not line or line.startswith(b"#"):
+        return None, end
+    return line.split(b"\t", 1)[0].strip(), end
+
+
+def _synset_boundary(content: tabfile.Content, pos: int) -> int:
+    """Return the start of the first row after *pos* of a new synset."""
+    newline = content.find(b"\n", pos)
+    if newline < 0:
+        return len(content)
+    pos = newline + 1
+    # find the synset of the last row before pos
+    previous: Optional[bytes] = None
+    line_start = pos
+    while previous is None and line_start > 0:
+        line_start = content.rfind(b"\n", 0, line_start - 1) + 1
+        previous, _ = _row_id(content, line_start)
+    while pos < len(content):
+        row_id, end = _row_id(content, pos)
+        if row_id is not None and row_id != previous:
+            break
+        pos = end
+    return pos
+
+
+def _load_chunk(
+    source: Path,
+    lex_id: str,
+    chunk: tuple[int, int, int],
+    abort_on_errors: bool,
+    subset: Optional[Container[str]],
+) -> tuple[TSVData, int]:
+    start, end, lineno = chunk
+    data = TSVData(lex_id)
+    _load_header(data, tabfile.read_header(source))
+    lines = tabfile.lines(source, start, end, lineno)
+    skipped = _load_lines(data, lines, abort_on_errors, subset)
+    return data, skipped
+
+
+def merge_data(parts: Sequence[TSVData]) -> TSVData:
+    """Merge partial TSVData objects loaded from consecutive chunks.
 
+    The result is the same as if the chunks had been loaded in order
+    by one call of :func:`load`.
+    """
+    data = parts[0]
+    for part in parts[1:]:
+        for pwn_id, sd in part.synsets.items():
+            if pwn_id not in data.synsets:
+                data.synsets[pwn_id] = sd
+                continue
+            # a synset continued from an earlier chunk
+            target = data.synsets[pwn_id]
+            target.members.update(sd.members)  # later senses replace earlier
+            target.definitions.extend(sd.definitions)
+            target.examples.extend(sd.examples)
+            target.relations.extend(sd.relations)
+        for eid, ed in part.entries.items():
+            if eid not in data.entries:
+                data.entries[eid] = ed
+                continue
+            # the partial entry's first form is its lemma, which the
+            # existing entry already has; pronunciations added to it
+            # would have gone to the existing entry's last form
+            target_entry = data.entries[eid]
+            lemma_form, *forms = ed.forms
+            if pronunciations := lemma_form.get("pronunciations"):
+                target_entry.forms[-1]["pronunciations"].extend(pronunciations)
+            target_entry.forms.extend(forms)
+            target_entry.senses.update(ed.senses)
+        data.sense_counts.update(part.sense_counts)
+        data.prev_pwn_id = part.prev_pwn_id or data.prev_pwn_id
+        data.prev_lemma = part.prev_lemma or data.prev_lemma
     return data
 
 
+def load_synset_relations(source: Path) -> SynsetRelations:
+    """Load the synset (not sense) relations of a WNDB database.
+
+    Satellite adjectives are keyed with `-a` as in the TSV files.
+    """
+    relations: SynsetRelations = {}
+    for pos in ("noun", "verb", "adj", "adv"):
+        for record in wndb.read_data_file(source / f"data.{pos}"):
+            pairs: list[tuple[str, str]] = []
+            for p in record.pointers:
+                if p.source_w_num or p.target_w_num:
+                    continue  # lexical relation; only projectable on senses
+                target = _normalize_offset_pos(f"{p.synset_offset:08}-{p.pos}")
+                pairs.append((wndb.POINTER_MAP[p.pointer_symbol], target))
+            if pairs:
+                offset_pos = f"{record.synset_offset:08}-{record.ss_type}"
+                relations[_normalize_offset_pos(offset_pos)] = pairs
+    return relations
+
+
 def _split_offset_pos(offset_pos: str) -> tuple[str, str]:
     offset, _, pos = offset_pos.rpartition("-")
     if pos == "s":
@@ -404,6 +650,10 @@ def _split_offset_pos(offset_pos: str) -> tuple[str, str]:
     return offset, pos
 
 
+def _normalize_offset_pos(offset_pos: str) -> str:
+    return "-".join(_split_offset_pos(offset_pos))
+
+
 def _clean_lemma(lemma: str) -> str:
     lemma = lemma.strip()
     if lemma.startswith('"') and lemma.endswith('"'):
@@ -479,6 +729,21 @@ def process_lexical_gaps(data: TSVData) -> None:
                 del data.entries[eid]
 
 
+def project_relations(data: TSVData, relations: SynsetRelations) -> None:
+    """Add *relations* whose source and target synsets are both in *data*."""
+    keys = {_normalize_offset_pos(pwn_id): pwn_id for pwn_id in data.synsets}
+    count = 0
+    for key, pwn_id in keys.items():
+        sd = data.synsets[pwn_id]
+        seen = set(sd.relations)
+        for reltype, target in relations.get(key, ()):
+            if target in keys and (reltype, keys[target]) not in seen:
+                sd.relations.append((reltype, keys[target]))
+                seen.add((reltype, keys[target]))
+                count += 1
+    log.info("Projected %d synset relations", count)
+
+
 def _update_lexicalized(sense: Sense, lemma: str, lang: str) -> None:
     # currently assuming 2 things:
     #  * the language uses spaces to delimit words (plus ' for italian)
@@ -556,6 +821,10 @@ def build(
                     Definition(text=defn) for _, defn in sorted(sd.definitions)
                 ],
                 examples=[Example(text=ex) for _, ex in sorted(sd.examples)],
+                relations=[
+                    Relation(target=data.synsets[target].id, relType=reltype)
+                    for reltype, target in sd.relations
+                ],
                 lexicalized=sd.lexicalized,
                 members=[sense["id"] for sense in sd.members.values()],
             )
@@ -581,8 +850,11 @@ def sense_id(lexid: str, lemma: str, offset: str, pos: str) -> str:
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("SOURCE", help="source TSV file")
-    parser.add_argument("DESTINATION", help="output XML file path")
+    parser.add_argument("SOURCE", help="source TSV file (may be .gz, .xz, or .zst)")
+    parser.add_argument(
+        "DESTINATION",
+        help="output XML file path (compressed if it ends with .gz, .xz, or .zst)",
+    )
     parser.add_argument("--id", required=True, help="lexicon ID")
     parser.add_argument("--label", required=True, help="name or description")
     parser.add_argument("--language", required=True, help="language (BCP-47)")
@@ -600,12 +872,33 @@ if __name__ == "__main__":
         help="lexicon metadata; may be repeated",
     )
     parser.add_argument("--ili-map", metavar="PATH", help="synset to ILI mapping file")
+    parser.add_argument(
+        "--project-relations",
+        metavar="WNDBDIR",
+        help="add synset relations from the WNDB database at WNDBDIR",
+    )
+    parser.add_argument(
+        "--subset-ili",
+        metavar="PATH",
+        help="only include synsets mapped to ILIs listed in the file at PATH",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=shard.SHARD_BY,
+        help="write one file per POS or lexicographer file, plus a manifest",
+    )
     parser.add_argument(
         "--log",
         type=Path,
         metavar="PATH",
         help="file for logging output (default: stderr)",
     )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        metavar="N",
+        help="parse large source files in chunks with N worker processes",
+    )
     parser.add_argument(
         "--abort-on-errors",
         action="store_true",
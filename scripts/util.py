@@ -1,8 +1,14 @@
-import csv
 import warnings
+from functools import lru_cache
 from html.entities import codepoint2name
+from unicodedata import normalize, combining
 from pathlib import Path
-from typing import NamedTuple, Union
+from typing import Union
+
+if __package__:
+    from .tabfile import TSVRow, iter_rows, read_header
+else:  # imported by a script run directly, e.g., tsv2lmf.py
+    from tabfile import TSVRow, iter_rows, read_header
 
 PathLike = Union[str, Path]
 
@@ -41,6 +47,8 @@ _custom_char_escapes = {
 }
 
 
+# lemmas recur across entries, senses, and (in batch builds) lexicons
+@lru_cache(maxsize=1 << 16)
 def escape_lemma(lemma: str) -> str:
     chars = []
     for c in lemma:
@@ -92,6 +100,58 @@ def format_lemma(word: str) -> str:
     return despace_word(word).lower()
 
 
+def fold_diacritics(word: str) -> str:
+    """Decompose *word* (NFKD) and remove combining characters."""
+    return ''.join(c for c in normalize('NFKD', word) if not combining(c))
+
+
+def edit_distance(a: str, b: str, limit: int, transpositions: bool = False) -> int:
+    """Return the Levenshtein distance of *a* and *b*, up to *limit*.
+
+    If the distance is greater than *limit*, `limit + 1` is returned
+    without computing it in full. If *transpositions* is true, swapping
+    two adjacent characters counts as one edit (the optimal string
+    alignment distance).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # common prefixes and suffixes do not change the distance
+    shortest = min(len(a), len(b))
+    prefix = 0
+    while prefix < shortest and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    a, b = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+    if limit < 2 and max(len(a), len(b)) > limit * (1 + transpositions):
+        # one edit changes one character (or swaps two adjacent ones)
+        return limit + 1
+    before: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (ca != cb),  # substitution
+            ))
+            if (
+                transpositions
+                and i > 1
+                and j > 1
+                and ca == b[j - 2]
+                and a[i - 2] == cb
+                and ca != cb
+            ):
+                current[j] = min(current[j], before[j - 2] + 1)  # transposition
+        if min(current) > limit and (not transpositions or min(previous) > limit):
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
 def load_ili_map(path) -> dict[str, str]:
     ilimap = {}
     with open(path, 'rt') as ilifile:
@@ -103,40 +163,14 @@ def load_ili_map(path) -> dict[str, str]:
     return ilimap
 
 
-class TSVRow(NamedTuple):
-    offset_pos: str
-    type: str
-    text: str
-    order: int = -1  # only used by def and exe
-
-    def is_lemma(self) -> bool:
-        """Return True if the row is a lemma row.
-
-        Usually the row type is of the form `xyz:lemma` where `xyz` is
-        the language code. There are variations like `xyz:lemma:root`
-        and `xyz:lemma:brokenplural` (currently only in the Arabic
-        wordnet) or just `lemma`.
-        """
-        return "lemma" in self.type
+def load_ili_set(path: PathLike) -> set[str]:
+    """Load the ILIs in the first column of the file at *path*."""
+    with open(path, 'rt') as ilifile:
+        return {line.split('\t')[0].strip() for line in ilifile if line.strip()}
 
 
 def load_tsv(path: PathLike) -> tuple[str, list[TSVRow]]:
-    with Path(path).open(newline='') as csvfile:
-        reader = csv.reader(csvfile, dialect='excel-tab', quoting=csv.QUOTE_NONE)
-        header = "\t".join(next(reader))
-        rows: list[TSVRow] = []
-        for row in reader:
-            if not row or row[0].startswith('#'):
-                continue
-            if "lemma" in row[1]:
-                assert len(row) == 3, f"unexpected number of columns for lemma: {row}"
-                rows.append(TSVRow(*row[:3]))
-            elif row[1].endswith((":def", ":exe")):
-                assert len(row) == 4, f"unexpected number of columns for def/exe: {row}"
-                rows.append(TSVRow(*row[:2], row[3], order=row[2]))
-            else:
-                raise Exception(f"unexpected row: {row}")
-    return header, rows
+    return read_header(path), list(iter_rows(path))
 
 
 QUOTES = [
@@ -165,9 +199,12 @@ QUOTES = [
     ("〈", "〉"),
     ("〖", "〗"),
 ]
+_QUOTE_STARTS = frozenset(start[0] for start, _ in QUOTES)
 
 
 def strip_quotes(lemma: str) -> str:
+    if not lemma or lemma[0] not in _QUOTE_STARTS:
+        return lemma  # most lemmas have no quotes
     for start, end in QUOTES:
         if lemma.startswith(start) and lemma.endswith(end):
             return lemma.removeprefix(start).removesuffix(end).strip()
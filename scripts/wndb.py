@@ -1,8 +1,8 @@
 """
-Module for reading WNDB databases.
+Module for reading and writing WNDB databases.
 """
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import NamedTuple, TextIO
 
@@ -342,6 +342,142 @@ def read_exceptions_file(path: Path) -> Iterator[ExceptionalForm]:
             yield ExceptionalForm(form, bases)
 
 
+# File writing #########################################################
+
+# offsets are written with 8 digits
+MAX_OFFSET = 99_999_999
+
+
+def format_header(lines: Sequence[str]) -> str:
+    """Return the license header of data and index files.
+
+    Each line is prefixed with two spaces and its line number so
+    readers skip it (see :func:`_is_header_line`).
+    """
+    return "".join(f"  {i} {line}  \n" for i, line in enumerate(lines, 1))
+
+
+def format_data_record(record: DataRecord) -> str:
+    """Return the line of a data file for *record*.
+
+    The line has the same length for any offsets as they are always
+    written with 8 digits, which :func:`data_record_offsets` relies on.
+    """
+    if not 0 < len(record.words) < 256:
+        raise WNDBError(f"cannot write {len(record.words)} words in a synset")
+    if len(record.pointers) > 999:
+        raise WNDBError(f"cannot write {len(record.pointers)} pointers in a synset")
+    fields = [
+        f"{record.synset_offset:08}",
+        f"{record.lex_filenum:02}",
+        record.ss_type,
+        f"{len(record.words):02x}",
+    ]
+    for w in record.words:
+        if not 0 <= w.lex_id < 16:
+            raise WNDBError(f"lex_id out of range for {w.word!r}: {w.lex_id}")
+        adjposition = f"({w.adjposition})" if w.adjposition else ""
+        fields.extend((f"{w.word}{adjposition}", f"{w.lex_id:x}"))
+    fields.append(f"{len(record.pointers):03}")
+    for p in record.pointers:
+        fields.extend((
+            p.pointer_symbol,
+            f"{p.synset_offset:08}",
+            p.pos,
+            f"{p.source_w_num:02x}{p.target_w_num:02x}",
+        ))
+    if record.ss_type == "v":
+        fields.append(f"{len(record.frames):02}")
+        for f in record.frames:
+            fields.extend(("+", f"{f.f_num:02}", f"{f.w_num:02x}"))
+    return f"{' '.join(fields)} | {record.gloss}  \n"
+
+
+def data_record_offsets(records: Iterable[DataRecord], header: str = "") -> list[int]:
+    """Return the byte offsets of *records* written after *header*.
+
+    This is the first pass of writing a data file: records are
+    formatted with any (e.g., placeholder) offsets to compute their
+    lengths so the real offsets are known before they are referenced
+    by pointers.
+    """
+    offsets = []
+    offset = len(header.encode("utf-8"))
+    for record in records:
+        if offset > MAX_OFFSET:
+            raise WNDBError("data file too large for 8-digit offsets")
+        offsets.append(offset)
+        offset += len(format_data_record(record).encode("utf-8"))
+    return offsets
+
+
+def write_data_file(
+    path: Path,
+    records: Iterable[DataRecord],
+    header: str = "",
+) -> None:
+    """Write *records*, whose offsets must match their positions."""
+    with path.open("wb") as datafile:
+        datafile.write(header.encode("utf-8"))
+        for record in records:
+            if datafile.tell() != record.synset_offset:
+                raise WNDBError(
+                    f"record offset {record.synset_offset:08} "
+                    f"does not match its position {datafile.tell():08}"
+                )
+            datafile.write(format_data_record(record).encode("utf-8"))
+
+
+def format_index_record(record: IndexRecord) -> str:
+    """Return the line of an index file for *record*."""
+    fields = [
+        record.lemma,
+        record.pos,
+        str(len(record.synset_offsets)),
+        str(len(record.pointer_symbols)),
+        *record.pointer_symbols,
+        str(len(record.synset_offsets)),
+        str(record.tagsense_cnt),
+        *(f"{offset:08}" for offset in record.synset_offsets),
+    ]
+    return f"{' '.join(fields)}  \n"
+
+
+def write_index_file(
+    path: Path,
+    records: Iterable[IndexRecord],
+    header: str = "",
+) -> None:
+    """Write *records* sorted by lemma for binary search."""
+    with path.open("wb") as indexfile:
+        indexfile.write(header.encode("utf-8"))
+        for record in sorted(records, key=lambda r: r.lemma):
+            indexfile.write(format_index_record(record).encode("utf-8"))
+
+
+def write_sense_index(path: Path, senses: Iterable[SenseInfo]) -> None:
+    """Write the sense index sorted by sense key."""
+    with path.open("w", encoding="utf-8", newline="\n") as senseindexfile:
+        for s in sorted(senses, key=lambda s: s.sense_key):
+            senseindexfile.write(
+                f"{s.sense_key} {s.synset_offset:08} {s.sense_number} {s.tag_cnt}\n"
+            )
+
+
+def write_count_list(path: Path, counts: Iterable[Count]) -> None:
+    """Write the counts in decreasing order of frequency."""
+    with path.open("w", encoding="utf-8", newline="\n") as cntlistfile:
+        for c in sorted(counts, key=lambda c: (-c.tag_cnt, c.sense_key)):
+            cntlistfile.write(f"{c.tag_cnt} {c.sense_key} {c.sense_number}\n")
+
+
+def write_exceptions_file(path: Path, forms: Iterable[ExceptionalForm]) -> None:
+    """Write the exception list sorted by inflected form."""
+    with path.open("w", encoding="utf-8", newline="\n") as exceptionfile:
+        for exc in sorted(forms):
+            exceptionfile.write(f"{' '.join((exc.form, *exc.base_forms))}\n")
+
+
 # Data field parsing ###################################################
 
 
@@ -392,6 +528,16 @@ def sense_key_lemma(sense_key: str) -> str:
     return sense_key.rpartition("%")[0]
 
 
+def make_sense_key(components: SenseKeyComponents) -> str:
+    """Return the sense key with *components* (see :func:`split_sense_key`)."""
+    c = components
+    head_id = f"{c.head_id:02}" if c.head_word else ""
+    return (
+        f"{c.lemma}%{c.ss_type_idx}:{c.lex_filenum:02}:{c.lex_id:02}"
+        f":{c.head_word}:{head_id}"
+    )
+
+
 def split_sense_key(sense_key: str) -> SenseKeyComponents:
     lemma, _, rest = sense_key.rpartition("%")
     ss_type_idx, lex_filenum, lex_id, head_word, head_id = rest.split(":")
@@ -55,13 +55,12 @@ from wn.lmf import (
     Sense,
     Synset,
     SyntacticBehaviour,
-    dump,
 )
 from wn.util import ProgressBar, ProgressHandler, synset_id_formatter
 
-from . import wndb
+from . import compression, shard, sidecars, wndb
 from .glossparser import gloss_parser
-from .util import escape_lemma, respace_word
+from .util import escape_lemma, load_ili_set, respace_word
 
 log = logging.getLogger("wndb2lmf")
 
@@ -93,6 +92,8 @@ _lexfile_lookup = {num: lexfile for lexfile, num in LEXICOGRAPHER_FILES.items()}
 
 def main(args):
     source = Path(args.SRC).expanduser()
+    if args.shard_by and compression.is_compressed(args.DEST):
+        raise ValueError("sharded output cannot be compressed")
     progress = ProgressBar(
         message=f"Building {args.id}:{args.version}",
         refresh_interval=1000,
@@ -118,6 +119,12 @@ def main(args):
     if args.ili_map:
         ilimap = _load_ili_map(args.ili_map, args.ili_confidence_threshold)
 
+    if args.subset_ili:
+        if not args.ili_map:
+            raise wndb.WNDBError("--subset-ili requires --ili-map")
+        progress.flash("Filtering synsets")
+        data = _filter_data(data, ilimap, load_ili_set(args.subset_ili))
+
     lexicon = Lexicon(
         id=args.id,
         version=args.version,
@@ -139,11 +146,18 @@ def main(args):
     _prune_unnecessary_indexes(lexicon, args.entry_indexes)
 
     progress.flash(f"Writing to WN-LMF {LMF_VERSION}")
-    resource = LexicalResource(
-        lmf_version=LMF_VERSION,
-        lexicons=[lexicon],
-    )
-    dump(resource, args.DEST)
+    if args.shard_by:
+        shard.write_shards(lexicon, Path(args.DEST), args.shard_by, LMF_VERSION)
+    else:
+        resource = LexicalResource(
+            lmf_version=LMF_VERSION,
+            lexicons=[lexicon],
+        )
+        compression.dump(resource, args.DEST)
+
+    for name in args.sidecar or []:
+        progress.flash(f"Writing {name} sidecar")
+        sidecars.write([name], lexicon, Path(args.DEST).parent)
 
     progress.flash(f"Built {args.id}:{args.version}")
     progress.close()
@@ -218,6 +232,8 @@ def _build_lexicon(
             for p in d.pointers:
                 relname = wndb.POINTER_MAP[p.pointer_symbol]
                 tgt_offset = p.synset_offset
+                if tgt_offset not in data[p.pos]:
+                    continue  # target was filtered out (see _filter_data())
                 tgt = data[p.pos][tgt_offset]
                 if p.source_w_num or p.target_w_num:
                     src_sense = w_num_sense_map[p.source_w_num]
@@ -406,6 +422,23 @@ def _load_ili_map(path: AnyPath, threshold: float) -> dict[str, str]:
     return ili_map
 
 
+def _filter_data(data: _Data, ilimap: dict[str, str], ilis: set[str]) -> _Data:
+    """Keep only the synsets mapped to one of *ilis*.
+
+    Entries, senses, and relations are only built for the remaining
+    synsets, so the result stays referentially consistent.
+    """
+    filtered: _Data = {}
+    for pos, subdata in data.items():
+        filtered[pos] = {
+            offset: d
+            for offset, d in subdata.items()
+            if ilimap.get(f"{offset:08}-{d.ss_type}") in ilis
+        }
+        log.info("Kept %d of %d synsets for %s", len(filtered[pos]), len(subdata), pos)
+    return filtered
+
+
 # Post-build cleanup functions #########################################
 
 def _prune_unnecessary_indexes(lexicon: Lexicon, keep: str) -> None:
@@ -479,7 +512,11 @@ def _make_nltk_synset_name(lemma: str, ss_type: str, sense_num: int) -> str:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser("Convert WNDB to WN-LMF")
     parser.add_argument("SRC", help="path to the WNDB directory")
-    parser.add_argument("DEST", help="path the the destination file")
+    parser.add_argument(
+        "DEST",
+        help="path the the destination file (compressed if it ends with .gz, "
+             ".xz, or .zst)",
+    )
     parser.add_argument("--id", required=True, help="the lexicon identifier")
     parser.add_argument(
         "--label", default="Unknown wordnet", help="a descriptive label for the lexicon"
@@ -505,6 +542,11 @@ if __name__ == "__main__":
         help="ignore ILI mappings below the confidence threshold (default: 0.0)",
         default=0.0,
     )
+    parser.add_argument(
+        "--subset-ili",
+        metavar="PATH",
+        help="only include synsets mapped to ILIs listed in the file at PATH",
+    )
     parser.add_argument(
         "--entry-indexes",
         choices=("all", "partial", "none"),
@@ -514,6 +556,17 @@ if __name__ == "__main__":
         ),
         default="all",
     )
+    parser.add_argument(
+        "--shard-by",
+        choices=shard.SHARD_BY,
+        help="write one file per POS or lexicographer file, plus a manifest",
+    )
+    parser.add_argument(
+        "--sidecar",
+        action="append",
+        choices=sorted(sidecars.SIDECARS),
+        help="write an extra artifact next to DEST; may be repeated",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO)
@@ -1,9 +1,38 @@
 from pathlib import Path
 
 import pytest
+from wn.lmf import Lexicon
+from wn.util import ProgressHandler
 
 
 @pytest.fixture(scope="session")
 def datadir():
     return Path(__file__).parent / "data"
 
+
+@pytest.fixture(scope="session")
+def wndb_lexicon(datadir):
+    from scripts import wndb2lmf
+
+    source = datadir / "wndb"
+    lexicon = Lexicon(
+        id="test-en",
+        version="1",
+        label="Test WNDB",
+        language="en",
+        email="maintainer@example.com",
+        license="x",
+        requires=[],
+        entries=[],
+        synsets=[],
+        frames=wndb2lmf._load_frames(),
+    )
+    wndb2lmf._build_lexicon(
+        lexicon,
+        wndb2lmf._load_data(source),
+        wndb2lmf._load_sense_index(source),
+        wndb2lmf._load_exceptions(source),
+        {},
+        ProgressHandler(),
+    )
+    return lexicon
@@ -0,0 +1,20 @@
+from scripts import adjacency
+
+
+def test_relation_graphs(wndb_lexicon, tmp_path):
+    adjacency.write_graph(wndb_lexicon, tmp_path)
+    graphs = adjacency.RelationGraphs(tmp_path / "test-en.graph.npz")
+
+    assert list(graphs.reltypes[:3]) == ["antonym", "hypernym", "instance_hypernym"]
+    assert len(graphs.synsets.ids) == 14
+    assert len(graphs.synsets.indptr) == 15
+    assert len(graphs.synsets.indices) == graphs.synsets.indptr[-1]
+
+    assert graphs.neighbors("test-en-00005000-n") == [
+        ("hypernym", "test-en-00003000-n"),
+        ("hypernym", "test-en-00004000-n"),
+    ]
+    assert graphs.neighbors("test-en-well-00300000-r") == [
+        ("pertainym", "test-en-good-00200000-a"),
+    ]
+    assert graphs.neighbors("test-en-Paris-00007000-n") == []
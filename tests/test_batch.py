@@ -0,0 +1,65 @@
+import csv
+import gzip
+
+from scripts import batch
+
+
+def test_batch(tmp_path):
+    source = tmp_path / "wns"
+    source.mkdir()
+    (source / "wn-wikt-Xbh.tab").write_text(
+        "# Wiktionary\t*bh\thttp://wiktionary.org/\tCC BY-SA\n"
+        "08900535-n\t*bh:lemma\tभारत\n"
+    )
+    with gzip.open(source / "wn-wikt-fra.tab.gz", "wt") as tabfile:
+        tabfile.write(
+            "# Wiktionary\tfra\thttp://wiktionary.org/\tCC BY-SA\n"
+            "00002098-a\tfra:lemma\tincapable\n"
+            "00002312-a\tfra:lemma\tconscient\n"
+            "00002312-a\tfra:lemma\tsensible\n"
+        )
+    (source / "wn-wikt-bad.tab").write_text(
+        "# Wiktionary\tbad\thttp://wiktionary.org/\tCC BY-SA\n"
+        "00002098-a\tbad:lemma\n"
+    )
+    (source / "wn-wikt-nohead.tab").write_text("00002098-a\tbad:lemma\tx\n")
+    (source / "README").write_text("not a tab file\n")
+
+    jobs = batch.find_jobs(source)
+    assert [job.lexid for job in jobs] == [
+        "omw-wikt-Xbh", "omw-wikt-bad", "omw-wikt-fra"
+    ]
+    assert jobs[0].language == "x-bh"
+    assert jobs[0].license == "https://creativecommons.org/licenses/by-sa/"
+
+    build = tmp_path / "build"
+    build.mkdir()
+    results = batch.run_batch(
+        jobs,
+        build,
+        "1.0",
+        "maintainer@example.com",
+        logfile=tmp_path / "batch.log",
+        manifest=tmp_path / "batch.tsv",
+        ilimap={"00002312-a": "i3"},
+        shard_by="pos",
+        processes=2,
+    )
+    assert [r.status for r in results] == ["ok", "error", "ok"]
+    assert results[2][3:6] == (2, 3, 3)
+    assert results[2].ilis == ({"i3"}, set())
+    assert (build / "omw-wikt-fra" / "omw-wikt-fra.xml").is_file()
+    shards = build / "omw-wikt-fra" / "omw-wikt-fra.shards"
+    assert (shards / "omw-wikt-fra.shards.tsv").is_file()
+    assert (shards / "omw-wikt-fra.a.xml").is_file()
+
+    with (tmp_path / "batch.tsv").open() as manifestfile:
+        rows = list(csv.reader(manifestfile, dialect="excel-tab"))
+    assert rows[0] == list(batch.MANIFEST_FIELDS)
+    assert [row[:3] for row in rows[1:]] == [
+        [r.lexid, r.source, r.status] for r in results
+    ]
+
+    log = (tmp_path / "batch.log").read_text()
+    assert "omw-wikt-fra: INFO:tsv2lmf:Converting omw-wikt-fra:1.0" in log
+    assert "omw-wikt-bad: ERROR:batch:Failed to convert" in log
@@ -0,0 +1,53 @@
+import pytest
+from wn import lmf
+
+from scripts import bundle
+
+
+def _dump(lexicon, path):
+    lmf.dump(lmf.LexicalResource(lmf_version="1.4", lexicons=[lexicon]), path)
+
+
+def test_bundle(wndb_lexicon, tmp_path):
+    other = lmf.Lexicon(
+        id="test-xx",
+        version="2",
+        label="Other",
+        language="xx",
+        email="maintainer@example.com",
+        license="x",
+        entries=[],
+        synsets=[],
+    )
+    _dump(wndb_lexicon, tmp_path / "test-en.xml")
+    _dump(other, tmp_path / "test-xx.xml")
+
+    destination = tmp_path / "bundle.xml"
+    ranges = bundle.write_bundle(
+        [tmp_path / "test-en.xml", tmp_path / "test-xx.xml"], destination
+    )
+    assert [(r.id, r.version) for r in ranges] == [("test-en", "1"), ("test-xx", "2")]
+    assert bundle.read_offsets(destination) == ranges
+    assert ranges[0].end <= ranges[1].start
+
+    # the bundle is itself a WN-LMF file
+    resource = lmf.load(destination, progress_handler=None)
+    assert [lex["id"] for lex in resource["lexicons"]] == ["test-en", "test-xx"]
+
+    lexicon = bundle.load_lexicon(destination, "test-en")
+    assert len(lexicon["synsets"]) == len(wndb_lexicon["synsets"])
+    assert len(lexicon["entries"]) == len(wndb_lexicon["entries"])
+    assert bundle.load_lexicon(destination, "test-xx", "2")["label"] == "Other"
+    with pytest.raises(KeyError):
+        bundle.load_lexicon(destination, "test-xx", "1")
+
+
+def test_bundle_mismatched_header(wndb_lexicon, tmp_path):
+    _dump(wndb_lexicon, tmp_path / "a.xml")
+    lmf.dump(
+        lmf.LexicalResource(lmf_version="1.0", lexicons=[]), tmp_path / "b.xml"
+    )
+    with pytest.raises(bundle.BundleError):
+        bundle.write_bundle(
+            [tmp_path / "a.xml", tmp_path / "b.xml"], tmp_path / "c.xml"
+        )
@@ -0,0 +1,55 @@
+import gzip
+
+from scripts import clean
+
+
+def test_changes_path(tmp_path):
+    assert clean.changes_path(tmp_path / "wn-data-fra.tab") == (
+        tmp_path / "fra-changes.tab"
+    )
+    assert clean.changes_path(tmp_path / "wn-data-fra.tab.gz") == (
+        tmp_path / "fra-changes.tab"
+    )
+    assert clean.changes_path(tmp_path / "other.tab") == tmp_path / "other-changes.tab"
+
+
+HEADER = "# Test\ttst\thttp://example.com/\tCC BY 4.0\n"
+
+
+def test_clean(tmp_path):
+    dirty = tmp_path / "wn-data-tst.tab"
+    dirty.write_text(
+        HEADER
+        + "00001234-n\ttst:lemma\tfoo\n"
+        + "00001234-n\ttst:lemma\t\"foo\"\n"
+        + "00001234-n\ttst:lemma\tfoo_bar\n"
+        + "00001234-n\ttst:def\t0\t \n"
+        + "00001234-n\ttst:exe\t0\tan example\n"
+    )
+    compressed = tmp_path / "wn-data-zzz.tab.gz"
+    with gzip.open(compressed, "wt") as file:
+        file.write(HEADER + "00001234-n\ttst:lemma\tfoo\n")
+    invalid = tmp_path / "wn-data-bad.tab"
+    invalid.write_text(HEADER + "00001234-n\ttst:count\tfoo\t2\n")
+    missing = tmp_path / "wn-data-missing.tab"
+
+    results = clean.clean([dirty, compressed, invalid, missing], processes=2)
+    assert [(r.changes, r.error is None) for r in results] == [
+        (3, True), (0, True), (0, False), (0, False)
+    ]
+    assert dirty.read_text() == (
+        HEADER
+        + "00001234-n\ttst:lemma\tfoo\n"
+        + "00001234-n\ttst:lemma\tfoo bar\n"
+        + "00001234-n\ttst:exe\t0\tan example\n"
+    )
+    changes = (tmp_path / "tst-changes.tab").read_text().splitlines()
+    assert [line.split("\t")[1] for line in changes] == [
+        "REMOVED", "MODIFIED", "REMOVED"
+    ]
+    assert gzip.open(compressed, "rt").read() == HEADER + "00001234-n\ttst:lemma\tfoo\n"
+    assert invalid.read_text() == HEADER + "00001234-n\ttst:count\tfoo\t2\n"
+    assert not (tmp_path / "zzz-changes.tab").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "tst-changes.tab", "wn-data-bad.tab", "wn-data-tst.tab", "wn-data-zzz.tab.gz"
+    ]
@@ -0,0 +1,61 @@
+import pytest
+
+from scripts import arrays, columnar
+
+
+def test_table_builder():
+    builder = columnar.TableBuilder((("name", columnar.STRING), ("n", "i")))
+    for row in [("b", 1), ("a", 2), ("b", 3)]:
+        builder.append(row)
+    assert len(builder) == 3
+    data = builder.arrays()
+    assert list(data["name_codes"]) == [1, 0, 1]
+    assert data["name_dict_data"] == b"ab"
+    assert list(data["n"]) == [1, 2, 3]
+
+
+def test_write_columnar(wndb_lexicon, tmp_path):
+    columnar.write_columnar(wndb_lexicon, tmp_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        f"test-en.{table}.npz" for table in columnar.TABLES
+    )
+    synsets = columnar.Table(tmp_path / "test-en.synsets.npz")
+    assert synsets.columns == [name for name, _ in columnar.TABLES["synsets"]]
+    assert len(synsets) == len(wndb_lexicon["synsets"])
+    assert list(synsets.column("synset")) == [
+        ss["id"] for ss in wndb_lexicon["synsets"]
+    ]
+    assert synsets.dictionary("lexicon")[:] == ["test-en"]
+    assert synsets.is_string("pos") and not synsets.is_string("members")
+    with pytest.raises(ValueError):
+        synsets.values("pos")
+    with pytest.raises(KeyError):
+        synsets.codes("missing")
+
+    entries = columnar.Table(tmp_path / "test-en.entries.npz")
+    (row,) = entries.rows("lemma", "thing")
+    assert list(entries.column("senses"))[row] == 2
+    assert entries.rows("lemma", "missing") == []
+    assert entries.value_counts("pos") == {"a": 3, "n": 9, "r": 1, "v": 3}
+
+    relations = columnar.Table(tmp_path / "test-en.relations.npz")
+    assert set(relations.column("level")) == {"sense", "synset"}
+    assert "hypernym" in relations.dictionary("type")
+
+
+def test_concatenate(wndb_lexicon, tmp_path):
+    other = dict(wndb_lexicon, id="test-xx", entries=wndb_lexicon["entries"][:3])
+    for lexicon in (wndb_lexicon, other):
+        (tmp_path / lexicon["id"]).mkdir()
+        columnar.write_columnar(lexicon, tmp_path / lexicon["id"])
+    paths = sorted(tmp_path.glob("*/*.entries.npz"))
+    arrays.save(tmp_path / "all.npz", columnar.concatenate(paths, "entries"))
+    table = columnar.Table(tmp_path / "all.npz")
+    assert len(table) == len(wndb_lexicon["entries"]) + 3
+    assert table.value_counts("lexicon") == {
+        "test-en": len(wndb_lexicon["entries"]),
+        "test-xx": 3,
+    }
+    assert list(table.column("entry")) == [
+        entry["id"] for entry in wndb_lexicon["entries"] + other["entries"]
+    ]
@@ -0,0 +1,86 @@
+import gzip
+import lzma
+
+import pytest
+from wn.lmf import LexicalResource, Lexicon
+from wn.lmf import load as load_lmf
+
+from scripts import compression, tabfile, tsv2lmf
+
+
+@pytest.fixture(params=[".gz", ".xz"])
+def compressed_tab(request, datadir, tmp_path):
+    content = (datadir / "test.tab").read_bytes()
+    path = tmp_path / f"test.tab{request.param}"
+    with compression.open_binary(path, "wb") as out:
+        out.write(content)
+    return path
+
+
+def test_open_binary(compressed_tab, datadir):
+    assert compression.is_compressed(compressed_tab)
+    assert not compression.is_compressed(datadir / "test.tab")
+    opener = gzip.open if compressed_tab.suffix == ".gz" else lzma.open
+    with opener(compressed_tab) as file:
+        assert file.read() == (datadir / "test.tab").read_bytes()
+    with pytest.raises(ValueError):
+        compression.open_binary(compressed_tab, "ab")
+
+
+def test_read_blocks(compressed_tab, datadir):
+    blocks = list(compression.read_blocks(compressed_tab, block_size=7))
+    assert all(len(block) == 7 for block in blocks[:-1])
+    assert b"".join(blocks) == (datadir / "test.tab").read_bytes()
+    with pytest.raises(FileNotFoundError):
+        list(compression.read_blocks(compressed_tab.with_name("missing.tab.gz")))
+    # stopping early stops the thread
+    blocks = compression.read_blocks(compressed_tab, block_size=1)
+    assert next(blocks) == b"#"
+    blocks.close()
+
+
+def test_read_blocks_zstd(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "test.tab.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(b"abc\n" * 1000))
+    assert b"".join(compression.read_blocks(path, block_size=100)) == b"abc\n" * 1000
+
+
+def test_tabfile_compressed(compressed_tab, datadir, monkeypatch):
+    monkeypatch.setattr(compression, "BLOCK_SIZE", 5)  # split lines and chars
+    plain = datadir / "test.tab"
+    assert tabfile.read_header(compressed_tab) == tabfile.read_header(plain)
+    assert list(tabfile.lines(compressed_tab)) == list(tabfile.lines(plain))
+    assert list(tabfile.iter_rows(compressed_tab)) == list(tabfile.iter_rows(plain))
+    with pytest.raises(ValueError):
+        list(tabfile.lines(compressed_tab, 0, 10))
+    data = tsv2lmf.load(compressed_tab, "omw-tst")
+    assert data == tsv2lmf.load(plain, "omw-tst")
+    assert tsv2lmf.load_parallel(compressed_tab, "omw-tst", processes=2) == data
+
+    path = compressed_tab.with_name(f"utf8.tab{compressed_tab.suffix}")
+    with compression.open_binary(path, "wb") as out:
+        out.write("# h\n00001234-n\ttst:lemma\tprotégé\n".encode("utf-8"))
+    assert list(tabfile.lines(path)) == [
+        (2, "00001234-n\ttst:lemma\tprotégé"),
+        (3, ""),
+    ]
+
+
+def test_dump(tmp_path):
+    lexicon = Lexicon(
+        id="test",
+        label="Test",
+        language="en",
+        email="maintainer@example.com",
+        license="x",
+        version="1",
+        entries=[],
+        synsets=[],
+    )
+    resource = LexicalResource(lmf_version="1.4", lexicons=[lexicon])
+    path = tmp_path / "test.xml.gz"
+    compression.dump(resource, path)
+    assert list(tmp_path.iterdir()) == [path]
+    (tmp_path / "test.xml").write_bytes(gzip.decompress(path.read_bytes()))
+    assert load_lmf(tmp_path / "test.xml")["lexicons"][0]["id"] == "test"
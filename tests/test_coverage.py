@@ -0,0 +1,46 @@
+from scripts import coverage
+
+
+def _lexicon(id, synsets):
+    return {
+        "id": id,
+        "synsets": [
+            {"id": f"{id}-{i}", "ili": ili, "lexicalized": lexicalized}
+            for i, (ili, lexicalized) in enumerate(synsets)
+        ],
+    }
+
+
+def test_lexicon_ilis():
+    lexicon = _lexicon(
+        "a",
+        [("i1", True), ("i2", False), ("", True), ("in", True), ("i1", False)],
+    )
+    assert coverage.lexicon_ilis(lexicon) == ({"i1"}, {"i2"})
+
+
+def test_coverage(tmp_path):
+    lexicons = {
+        f"lex{j}": coverage.lexicon_ilis(
+            _lexicon(f"lex{j}", [(f"i{i}", i % 3 != 0) for i in range(j + 1)])
+        )
+        for j in range(10)
+    }
+    path = tmp_path / "coverage.npz"
+    coverage.write_coverage(lexicons, path)
+    cov = coverage.Coverage(path)
+
+    assert list(cov.lexicons) == list(lexicons)
+    assert "lex3" in cov and "lex10" not in cov
+    # i0 is never lexicalized, i1 is in lex1-lex9, i9 only in lex9 (as a gap)
+    assert cov.lexicons_with("i0") == []
+    assert cov.lexicons_with("i1") == [f"lex{j}" for j in range(1, 10)]
+    assert cov.lexicons_with("i8") == ["lex8", "lex9"]
+    assert cov.lexicons_with("i99") == []
+    assert cov.count("lex9") == 6
+    assert cov.column("lex9", gaps=True) == cov.mask(["i0", "i3", "i6", "i9"])
+    assert cov.count("lex9", cov.mask(["i1", "i3", "i8", "i99"])) == 2
+    assert cov.count("lex9", cov.mask(["i1", "i3", "i8", "i99"]), gaps=True) == 3
+    assert cov.covered(9) == ["i1"]
+    assert cov.covered(1, lexids=["lex2"]) == ["i1", "i2"]
+    assert dict(zip(cov.ilis, cov.counts()))["i2"] == 8
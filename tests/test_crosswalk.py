@@ -0,0 +1,27 @@
+import pytest
+
+from scripts import crosswalk
+
+
+def test_crosswalk(wndb_lexicon, tmp_path):
+    crosswalk.write_crosswalk(wndb_lexicon, tmp_path)
+    cw = crosswalk.Crosswalk(tmp_path / "test-en.crosswalk.npz")
+
+    assert cw.get("thing%1:03:01::", "sense_key", "sense") == (
+        "test-en-thing-00006000-n"
+    )
+    assert cw.get("thing%1:03:01::", "sense_key", "name") == "abstraction.n.01"
+    assert cw.get("thing%1:03:01::", "sense_key", "offset") == "00006000-n"
+    assert cw.get("test-en-great-00200200-s", "sense", "sense_key") == (
+        "great%5:00:00:good:00"
+    )
+    assert cw.get("great.s.01", "name", "synset") == "test-en-00200200-s"
+    assert cw.get("00100100-v", "offset", "name") == "inhibit.v.01"
+    assert cw.get("test-en-00007000-n", "synset", "name") == "paris.n.01"
+
+    with pytest.raises(KeyError):
+        cw.get("dog.n.01", "name", "synset")
+    with pytest.raises(KeyError):
+        cw.get("", "ili", "synset")
+    with pytest.raises(ValueError):
+        cw.get("great.s.01", "name", "sense_key")
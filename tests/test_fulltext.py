@@ -0,0 +1,58 @@
+from scripts import fulltext
+
+
+def test_tokenize():
+    assert list(fulltext.tokenize("A tangible, Visible entity")) == [
+        "a", "tangible", "visible", "entity"
+    ]
+    assert list(fulltext.tokenize("the_dog")) == ["the", "dog"]
+    assert list(fulltext.tokenize("東京都")) == ["東京", "京都"]
+    assert list(fulltext.tokenize("犬 は")) == ["犬", "は"]
+    assert list(fulltext.tokenize("ภาษา")) == ["ภา", "าษ", "ษา"]
+    assert list(fulltext.tokenize("ＡＢＣ日本")) == ["abc", "日本"]
+
+
+def test_fulltext_index(wndb_lexicon, tmp_path):
+    fulltext.write_fulltext_index(wndb_lexicon, tmp_path)
+    index = fulltext.FullTextIndex(tmp_path / "test-en.fulltext.npz")
+
+    assert index.search("entity") == [
+        "test-en-00002000-n", "test-en-00003000-n",
+    ]
+    assert index.search("Physical") == [
+        "test-en-00002000-n", "test-en-00004000-n",
+    ]
+    assert index.search("physical existence") == ["test-en-00002000-n"]
+    assert index.search("existence physical", phrase=True) == []
+    assert index.search("has physical existence", phrase=True) == [
+        "test-en-00002000-n"
+    ]
+    assert index.search("food") == ["test-en-00005000-n"]
+    assert index.search("food", kind=fulltext.DEFINITION) == []
+    assert index.search("food", kind=fulltext.EXAMPLE) == ["test-en-00005000-n"]
+    assert index.search("unicorn") == []
+    assert index.search("") == []
+
+
+def test_release_index(wndb_lexicon, tmp_path):
+    (tmp_path / "test-en").mkdir()
+    fulltext.write_fulltext_index(wndb_lexicon, tmp_path / "test-en")
+    (tmp_path / "test-ja").mkdir()
+    lexicon = {
+        "id": "test-ja",
+        "synsets": [
+            {
+                "id": "test-ja-00007000-n",
+                "definitions": [{"text": "フランスの首都"}],
+                "examples": [],
+            },
+        ],
+    }
+    fulltext.write_fulltext_index(lexicon, tmp_path / "test-ja")
+    index = fulltext.ReleaseIndex(tmp_path)
+
+    assert index.search("首都") == {"test-ja": ["test-ja-00007000-n"]}
+    assert index.search("フランス", phrase=True) == {
+        "test-ja": ["test-ja-00007000-n"]
+    }
+    assert index.search("France") == {"test-en": ["test-en-00007000-n"]}
@@ -0,0 +1,40 @@
+from scripts import fuzzy
+
+
+def test_ngrams():
+    assert fuzzy.ngrams("ab") == {"\x02ab", "ab\x03"}
+    assert fuzzy.ngrams("") == {"\x02\x03"}
+
+
+def test_ngram_index(wndb_lexicon, tmp_path):
+    fuzzy.write_ngram_index(wndb_lexicon, tmp_path)
+    index = fuzzy.NgramIndex(tmp_path / "test-en.ngrams.npz")
+
+    assert index.search("nutrient", max_distance=0) == [("nutrient", 0)]
+    assert index.search("nutrinet", max_distance=2) == [("nutrient", 2)]
+    assert index.search("nutrinets", max_distance=2) == [("nutrients", 2)]
+    assert index.search("substnace", max_distance=1) == []
+    assert index.search("substnace", max_distance=2) == [("substance", 2)]
+    assert index.search("Pariss", max_distance=1) == [("paris", 1)]
+    assert index.lookup("Pariss", max_distance=1) == ["test-en-Paris-n"]
+    assert index.lookup("physicl entity") == ["test-en-physical_entity-n"]
+    assert index.search("zzzz") == []
+
+
+def test_ngram_index_diacritics(tmp_path):
+    lexicon = {
+        "id": "test-fr",
+        "entries": [
+            {
+                "id": "test-fr-café-n",
+                "lemma": {"writtenForm": "café", "partOfSpeech": "n"},
+                "senses": [],
+            },
+        ],
+    }
+    fuzzy.write_ngram_index(lexicon, tmp_path)
+    index = fuzzy.NgramIndex(tmp_path / "test-fr.ngrams.npz")
+
+    assert index.search("cafe", max_distance=0) == [("cafe", 0)]
+    assert index.search("café", max_distance=0) == [("cafe", 0), ("café", 0)]
+    assert index.lookup("caffe", max_distance=1) == ["test-fr-café-n"]
@@ -0,0 +1,32 @@
+import math
+
+from scripts import infocontent, taxonomy
+
+
+def ssid(offset_pos):
+    return f"test-en-{offset_pos}"
+
+
+def test_information_content(wndb_lexicon, tmp_path):
+    infocontent.write_information_content(wndb_lexicon, tmp_path)
+    taxonomy.write_similarity(wndb_lexicon, tmp_path)
+    ic = infocontent.InformationContent(tmp_path / "test-en.ic.npz")
+    index = taxonomy.SimilarityIndex(tmp_path / "test-en.similarity.npz")
+
+    entity, physical, food = ssid("00001740-n"), ssid("00002000-n"), ssid("00005000-n")
+    # counts: entity 11, physical_entity (thing) 3, food 7, abstraction (thing) 0
+    assert ic.frequency(food, smoothing=0) == 7
+    # food is under two hypernyms of physical_entity but counted once
+    assert ic.frequency(physical, smoothing=0) == 10
+    assert ic.frequency(entity, smoothing=0) == 21
+    assert ic.frequency(entity, smoothing=1) == 21 + 7  # 7 noun synsets
+    assert ic.information_content(entity, smoothing=0) == 0.0
+    assert math.isinf(ic.information_content(ssid("00006000-n"), smoothing=0))
+    assert ic.information_content(food) == -math.log((7 + 1) / (21 + 7))
+
+    assert infocontent.resnik_similarity(index, ic, food, ssid("00007000-n")) == (
+        ic.information_content(ssid("00003000-n"))
+    )
+    assert infocontent.lin_similarity(index, ic, food, food) == 1.0
+    assert math.isinf(infocontent.jcn_similarity(index, ic, food, food))
+    assert infocontent.resnik_similarity(index, ic, food, ssid("00100200-v")) is None
@@ -0,0 +1,24 @@
+from scripts import lemmatizer
+
+
+def test_lemmatizer(wndb_lexicon, tmp_path):
+    lemmatizer.write_lemmatizer(wndb_lexicon, tmp_path)
+    lemmatize = lemmatizer.Lemmatizer(tmp_path / "test-en.lemmatizer.npz")
+
+    # exceptions
+    assert lemmatize("held") == {"v": {"hold"}}
+    assert lemmatize("worse") == {"a": {"bad"}}
+    assert lemmatize("better") == {"a": {"good"}, "r": {"well"}}
+    assert lemmatize("better", pos="r") == {"r": {"well"}}
+    assert lemmatize("nutrients") == {"n": {"nutrient"}}
+    # detachment rules
+    assert lemmatize("foods") == {"n": {"food"}}
+    assert lemmatize("holding") == {"v": {"hold"}}
+    assert lemmatize("restrained") == {"v": {"restrain"}}
+    assert lemmatize("greatest") == {"a": {"great"}}
+    assert lemmatize("physical entities") == {"n": {"physical entity"}}
+    # lemmas themselves, case-insensitively
+    assert lemmatize("thing") == {"n": {"thing"}}
+    assert lemmatize("paris") == {"n": {"Paris"}}
+    assert lemmatize("foods", pos="v") == {}
+    assert lemmatize("unknown") == {}
@@ -0,0 +1,84 @@
+import argparse
+import json
+
+from scripts import lint, offsets
+
+
+def test_check_file(tmp_path):
+    path = tmp_path / "wn-data-tst.tab"
+    path.write_text(
+        "# Test\ttst\thttp://example.com/\tCC BY 4.0\n"
+        "00001234-n\ttst:lemma\tfoo\n"
+        "00001234-n\ttst:count\tfoo\t3\n"
+        "00001234-n\ttst:lemma:root\tfo\n"
+        "00001234-n\ttst:pron\tfoo\tfu\n"
+        "\n"
+        "# a comment\n"
+        "1234-n\ttst:lemma\tbar\n"
+        "00002345-n\teng:lemma\tbar\n"
+        "00002345-n\ttst:lemma\n"
+        "00002345-n\ttst:def\tfirst\ta definition\n"
+        "00002345-n\ttst:exe\t0\n"
+        "00002345-n\ttst:count\tbar\tmany\n"
+        "00002345-n\ttst:lemma:brokenplural\tbars\n"
+        "00002345-n\ttst:lemma\tbaz\n"
+        "00002345-n\ttst:pron\tbar\tba\n"
+    )
+    problems = lint.check_file(path)
+    assert [(p.line, p.severity, p.code) for p in problems] == [
+        (8, "error", "offset-pos"),
+        (9, "warning", "type"),
+        (10, "error", "columns"),
+        (11, "error", "order"),
+        (12, "error", "columns"),
+        (13, "error", "count"),
+        (14, "error", "grouping"),
+        (16, "error", "grouping"),
+    ]
+    assert problems[0].path == str(path)
+
+
+def test_check_file_header(tmp_path):
+    path = tmp_path / "wn-freq-tst.tab"
+    path.write_text("00001234-n\tfoo\t1\n00001234-n\tbar\t1\n")
+    assert [p.code for p in lint.check_file(path)] == ["header"]
+
+
+def test_lint(tmp_path, datadir, capsys):
+    (tmp_path / "sub").mkdir()
+    for name in ("test.tab", "test-count.tab"):
+        content = (datadir / name).read_text()
+        (tmp_path / "sub" / f"wn-data-{name}").write_text(content)
+    (tmp_path / "README").write_text("not a tab file\n")
+    files = lint.find_files([tmp_path])
+    assert [f.name for f in files] == ["wn-data-test-count.tab", "wn-data-test.tab"]
+    assert list(lint.lint([tmp_path], processes=2)) == []
+
+    (tmp_path / "wn-bad.tab").write_text("# Test\ttst\tx\ty\n1234-n\ttst:lemma\tx\n")
+    args = argparse.Namespace(
+        PATH=[tmp_path],
+        processes=1,
+        pwn30=None,
+        synsets=None,
+        exclude=[],
+        errors_only=False,
+    )
+    assert lint.main(args) == 1
+    output = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["code"] for line in output] == ["offset-pos"]
+
+
+def test_check_file_pwn30(tmp_path, datadir):
+    bitmap = offsets.OffsetBitmap.from_wndb(datadir / "wndb")
+    path = tmp_path / "wn-data-tst.tab"
+    path.write_text(
+        "# Test\ttst\thttp://example.com/\tCC BY 4.0\n"
+        "00001740-n\ttst:lemma\tfoo\n"
+        "00001741-n\ttst:lemma\tbar\n"
+        "00001741-n\ttst:lemma\tbaz\n"
+        "00200200-s\ttst:lemma\tgreen\n"
+    )
+    assert lint.check_file(path) == []
+    problems = lint.check_file(path, bitmap)
+    assert [(p.line, p.code) for p in problems] == [(3, "offset")]
+    assert list(lint.lint([path, path], processes=2, bitmap=bitmap)) == problems * 2
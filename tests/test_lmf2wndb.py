@@ -0,0 +1,141 @@
+import copy
+from collections import Counter
+
+import pytest
+from wn.lmf import LexicalEntry, Lexicon, Sense, Synset
+from wn.util import ProgressHandler
+
+from scripts import lmf2wndb, wndb, wndb2lmf
+
+
+def _relations(lexicon):
+    counts = Counter()
+    for synset in lexicon["synsets"]:
+        counts.update(rel["relType"] for rel in synset["relations"])
+    for entry in lexicon["entries"]:
+        for sense in entry["senses"]:
+            counts.update(rel["relType"] for rel in sense["relations"])
+    return counts
+
+
+def _gloss(synset):
+    return (
+        [d["text"] for d in synset["definitions"]],
+        [ex["text"] for ex in synset["examples"]],
+        synset["lexfile"],
+    )
+
+
+def _sense_keys(directory):
+    return sorted(s.sense_key for s in wndb.read_sense_index(directory / "index.sense"))
+
+
+def test_write_wndb(wndb_lexicon, datadir, tmp_path):
+    lmf2wndb.write_wndb(wndb_lexicon, tmp_path)
+
+    # records are at their offsets and pointers resolve
+    records = {}
+    for name in wndb.POS_MAP.values():
+        path = tmp_path / f"data.{name}"
+        data = path.read_bytes()
+        for record in wndb.read_data_file(path):
+            assert data[record.synset_offset:].startswith(
+                b"%08d " % record.synset_offset
+            )
+            records[(name, record.synset_offset)] = record
+    for (name, _), record in records.items():
+        for p in record.pointers:
+            assert (wndb.POS_MAP[lmf2wndb.FILE_POS[p.pos]], p.synset_offset) in records
+
+    # index files are sorted and point to synsets with the lemma
+    for name in wndb.POS_MAP.values():
+        index = list(wndb.read_index_file(tmp_path / f"index.{name}"))
+        assert [r.lemma for r in index] == sorted(r.lemma for r in index)
+        for r in index:
+            for offset in r.synset_offsets:
+                words = records[(name, offset)].words
+                assert r.lemma in {w.lemma for w in words}
+    thing = [r for r in wndb.read_index_file(tmp_path / "index.noun")
+             if r.lemma == "thing"][0]
+    assert thing.tagsense_cnt == 1 and len(thing.synset_offsets) == 2
+
+    assert _sense_keys(tmp_path) == _sense_keys(datadir / "wndb")
+
+    # converting back gives the same lexicon except for offsets
+    lexicon = Lexicon(id="test-en", entries=[], synsets=[], frames=[])
+    wndb2lmf._build_lexicon(
+        lexicon,
+        wndb2lmf._load_data(tmp_path),
+        wndb2lmf._load_sense_index(tmp_path),
+        wndb2lmf._load_exceptions(tmp_path),
+        {},
+        ProgressHandler(),
+    )
+    assert [e["id"] for e in lexicon["entries"]] == [
+        e["id"] for e in wndb_lexicon["entries"]
+    ]
+    assert sorted(map(_gloss, lexicon["synsets"])) == sorted(
+        map(_gloss, wndb_lexicon["synsets"])
+    )
+    assert _relations(lexicon) == _relations(wndb_lexicon)
+    assert [
+        (s["meta"]["identifier"], s["counts"], s.get("subcat"), s["adjposition"])
+        for e in lexicon["entries"] for s in e["senses"]
+    ] == [
+        (s["meta"]["identifier"], s["counts"], s.get("subcat"), s["adjposition"])
+        for e in wndb_lexicon["entries"] for s in e["senses"]
+    ]
+    assert [e["forms"] for e in lexicon["entries"]] == [
+        e["forms"] for e in wndb_lexicon["entries"]
+    ]
+
+
+def test_write_wndb_without_sense_keys(wndb_lexicon, datadir, tmp_path):
+    lexicon = copy.deepcopy(wndb_lexicon)
+    for entry in lexicon["entries"]:
+        for sense in entry["senses"]:
+            sense["meta"] = None
+    lmf2wndb.write_wndb(lexicon, tmp_path)
+    assert _sense_keys(tmp_path) == _sense_keys(datadir / "wndb")
+
+
+def test_write_wndb_many_senses(tmp_path, caplog):
+    # 20 noun and 20 adverb senses of one lemma in synsets without a
+    # lexfile; lex_ids have one hex digit, and adverbs have one lexfile
+    synsets, senses = [], []
+    for pos in ("n", "r"):
+        for i in range(20):
+            ssid = f"test-{i}-{pos}"
+            synsets.append(Synset(id=ssid, ili="", partOfSpeech=pos))
+            senses.append(Sense(id=f"test-lemma-{pos}-{i}", synset=ssid))
+    entries = [
+        LexicalEntry(
+            id=f"test-lemma-{pos}",
+            lemma={"writtenForm": "lemma", "partOfSpeech": pos},
+            senses=[s for s in senses if s["id"].startswith(f"test-lemma-{pos}")],
+        )
+        for pos in ("n", "r")
+    ]
+    lexicon = Lexicon(id="test", entries=entries, synsets=synsets, frames=[])
+    lmf2wndb.write_wndb(lexicon, tmp_path)
+
+    nouns = list(wndb.read_data_file(tmp_path / "data.noun"))
+    assert [(r.lex_filenum, r.words[0].lex_id) for r in nouns] == [
+        (3, i) for i in range(16)
+    ] + [(4, i) for i in range(4)]
+    keys = _sense_keys(tmp_path)
+    assert "lemma%1:03:15::" in keys and "lemma%1:04:03::" in keys
+    adverbs = list(wndb.read_data_file(tmp_path / "data.adv"))
+    assert [r.words[0].lex_id for r in adverbs] == list(range(16))
+    assert "Skipped 4 senses of lemmas with too many senses" in caplog.text
+    assert "Skipped 4 synsets without senses" in caplog.text
+
+
+def test_data_record_offsets():
+    record = wndb.DataRecord(0, 3, "n", [wndb.Word("dog", 0)], [], [], "a dog")
+    header = wndb.format_header(["header"])
+    assert wndb.data_record_offsets([record, record], header) == [
+        len(header), len(header) + len(wndb.format_data_record(record))
+    ]
+    with pytest.raises(wndb.WNDBError):
+        wndb.format_data_record(record._replace(words=[]))
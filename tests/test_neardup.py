@@ -0,0 +1,47 @@
+from scripts import neardup
+
+
+def test_variant_key():
+    assert neardup.variant_key("E-Mail") == "email"
+    assert neardup.variant_key("ʻe mail’") == "ʻemail"
+    assert neardup.variant_key("Café_au-lait") == "cafeaulait"
+
+
+def test_jaro_winkler():
+    assert neardup.jaro_winkler("martha", "martha") == 1.0
+    assert round(neardup.jaro_winkler("martha", "marhta"), 3) == 0.961
+    assert round(neardup.jaro_winkler("dixon", "dicksonx"), 3) == 0.813
+    assert neardup.jaro_winkler("abc", "xyz") == 0.0
+    assert neardup.jaro_winkler("", "abc") == 0.0
+
+
+def test_candidate_pairs():
+    keys = ["abcd", "abce", "zbce", "abcf", "xxxx", "yyyy", "zzzz"]
+    pairs = neardup.candidate_pairs(keys, window=1)
+    assert (0, 1) in pairs  # forward neighbours
+    assert (1, 2) in pairs  # reverse neighbours
+    assert (0, 6) not in pairs
+    assert len(neardup.candidate_pairs(keys[:3], window=2)) == 3
+
+
+def test_find_clusters():
+    clusters = neardup.find_clusters([
+        "receive", "get", "recieve", "e-mail", "email", "E mail", "email",
+        "cat", "bat", "house", "mouse",
+    ])
+    assert clusters == [
+        neardup.Cluster(("receive", "recieve"), 0.967),
+        neardup.Cluster(("e-mail", "email", "E mail"), 1.0),
+    ]
+    assert neardup.find_clusters(["receive", "recieve"], min_score=0.99) == []
+    assert neardup.find_clusters(["receive"]) == []
+
+
+def test_find_clusters_chain():
+    # the score is that of the weakest pair joining the cluster
+    lemmas = ["abcdefgh", "abcdefgx", "abcdefyx"]
+    assert neardup.find_clusters(lemmas) == [neardup.Cluster(tuple(lemmas), 0.9)]
+    # the first and last lemmas are only joined through the second
+    assert neardup.find_clusters(lemmas, min_score=0.92) == [
+        neardup.Cluster(tuple(lemmas), 0.95)
+    ]
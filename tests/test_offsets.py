@@ -0,0 +1,58 @@
+from scripts import arrays, columnar
+from scripts.offsets import OffsetBitmap, check_synsets_table
+
+
+def test_from_wndb(datadir):
+    bitmap = OffsetBitmap.from_wndb(datadir / "wndb")
+    assert "00001740-n" in bitmap
+    assert "00100000-v" in bitmap
+    assert "00200200-s" in bitmap
+    assert "00200200-a" in bitmap  # satellites share the adjective bitmap
+    assert "00001740-v" not in bitmap
+    assert "00001741-n" not in bitmap
+    assert "99999999-n" not in bitmap
+    assert "00001740-x" not in bitmap
+    assert "entity-n" not in bitmap
+    assert 1740 not in bitmap
+    assert bitmap.missing(["00001740-n", "00001741-n", "00001741-n"]) == [
+        "00001741-n"
+    ]
+
+
+def test_from_ili_map(tmp_path):
+    path = tmp_path / "ili-map-pwn30.tab"
+    path.write_text("i1\t00001740-n\ni2\t00200200-s\n\n")
+    bitmap = OffsetBitmap.from_path(path)
+    assert len(bitmap) == 2
+    assert "00001740-n" in bitmap
+    assert "00200200-a" in bitmap
+
+
+def test_check_synsets_table(tmp_path):
+    builder = columnar.TableBuilder(columnar.TABLES["synsets"])
+    for row in [
+        ("omw-en", "omw-en-00001740-n", "i1", "n"),
+        ("omw-en", "omw-en-00002000-n", "i2", "n"),
+        ("omw-fr", "omw-fr-00001740-n", "i1", "n"),
+        ("omw-fr", "omw-fr-00002000-n", "i3", "n"),
+        ("omw-fr", "omw-fr-00003001-n", "", "n"),
+        ("omw-fr", "omw-fr-ABC", "", "n"),
+        ("omw-en31", "omw-en31-00002000-n", "i4", "n"),
+    ]:
+        builder.append((*row, "", 1, 1))
+    path = tmp_path / "synsets.npz"
+    arrays.save(path, builder.arrays())
+
+    conflicts, missing = check_synsets_table(path, exclude=["omw-en31*"])
+    assert missing == []
+    assert [(c.row, c.offset_pos, c.lexicon, c.other_lexicon) for c in conflicts] == [
+        (3, "00002000-n", "omw-fr", "omw-en")
+    ]
+    conflicts, _ = check_synsets_table(path)
+    assert len(conflicts) == 2
+
+    bitmap = OffsetBitmap()
+    bitmap.add(1740, "n")
+    bitmap.add(2000, "n")
+    _, missing = check_synsets_table(path, bitmap, exclude=["omw-en31*"])
+    assert missing == [(4, "omw-fr-00003001-n")]
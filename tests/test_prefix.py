@@ -0,0 +1,18 @@
+from scripts import prefix
+
+
+def test_prefix_index(wndb_lexicon, tmp_path):
+    prefix.write_prefix_index(wndb_lexicon, tmp_path)
+    index = prefix.PrefixIndex(tmp_path / "test-en.prefix.npz")
+
+    assert index.complete("nut") == ["nutrient", "nutrients"]
+    assert index.lookup("nut") == ["test-en-nutrient-n"]
+    assert index.complete("PA") == ["paris"]
+    assert index.lookup("pa") == ["test-en-Paris-n"]
+    assert index.complete("physical_e") == ["physical entity"]
+    assert index.complete("g") == ["good", "great"]
+    assert index.complete("g", limit=1) == ["good"]
+    assert index.lookup("g", limit=1) == ["test-en-good-a"]
+    assert index.complete("x") == []
+    assert index.lookup("x") == []
+    assert len(index.complete("")) == len(index.forms)
@@ -0,0 +1,111 @@
+import copy
+
+import pytest
+from wn.lmf import LexicalEntry, Lexicon, Sense, Synset
+
+from scripts import shard
+
+
+def test_shard_lexicon(wndb_lexicon):
+    shards = shard.shard_lexicon(wndb_lexicon, "pos")
+    assert list(shards) == ["a", "n", "r", "v"]
+    assert len(shards["n"]["synsets"]) == 7
+    assert len(shards["a"]["synsets"]) == 3  # with the satellite
+    assert shards["v"]["frames"]
+    assert shards["n"]["frames"] == []
+
+    shards = shard.shard_lexicon(wndb_lexicon, "lexfile")
+    assert "noun.Tops" in shards
+    assert all(
+        ss["lexfile"] == "noun.Tops" for ss in shards["noun.Tops"]["synsets"]
+    )
+
+    with pytest.raises(ValueError):
+        shard.shard_lexicon(wndb_lexicon, "lemma")
+
+
+def test_write_and_load_shards(wndb_lexicon, tmp_path):
+    destination = tmp_path / "test-en.xml"
+    manifest = shard.write_shards(wndb_lexicon, destination, "lexfile", "1.4")
+    path = shard.manifest_path(destination)
+    assert path.name == "test-en.shards.tsv"
+    assert shard.read_manifest(path) == manifest
+    assert all((tmp_path / s.file).is_file() for s in manifest)
+    assert not destination.exists()
+    assert sum(s.synsets for s in manifest) == len(wndb_lexicon["synsets"])
+
+    merged = shard.load_shards(path, processes=1)
+    assert len(merged["synsets"]) == len(wndb_lexicon["synsets"])
+    assert sorted(e["id"] for e in merged["entries"]) == sorted(
+        e["id"] for e in wndb_lexicon["entries"]
+    )
+    assert sum(len(e["senses"]) for e in merged["entries"]) == sum(
+        s.senses for s in manifest
+    )
+    assert len(merged["frames"]) <= len(wndb_lexicon["frames"])
+
+    verbs = shard.load_shards(path, shards=["verb.social"], processes=1)
+    assert {ss["partOfSpeech"] for ss in verbs["synsets"]} == {"v"}
+    with pytest.raises(KeyError):
+        shard.load_shards(path, shards=["noun.unknown"])
+
+
+def test_sense_order_round_trip(tmp_path):
+    synsets = [
+        Synset(id="test-1-n", ili="", partOfSpeech="n", lexfile="noun.animal"),
+        Synset(id="test-2-n", ili="", partOfSpeech="n", lexfile="noun.person"),
+        Synset(id="test-3-n", ili="", partOfSpeech="n", lexfile="noun.animal"),
+    ]
+    senses = [
+        Sense(id="test-dog-n-2", synset="test-2-n"),
+        Sense(id="test-dog-n-1", synset="test-1-n"),
+        Sense(id="test-dog-n-3", synset="test-3-n"),
+    ]
+    entry = LexicalEntry(
+        id="test-dog-n",
+        lemma={"writtenForm": "dog", "partOfSpeech": "n"},
+        senses=senses,
+    )
+    lexicon = Lexicon(
+        id="test",
+        label="Test",
+        language="en",
+        email="test@example.com",
+        license="https://example.com/license",
+        version="1",
+        entries=[entry],
+        synsets=synsets,
+        frames=[],
+    )
+    destination = tmp_path / "test.xml"
+    shard.write_shards(lexicon, destination, "lexfile", "1.4")
+    assert [s.get("n") for s in senses] == [None, None, None]  # not modified
+
+    merged = shard.load_shards(shard.manifest_path(destination), processes=1)
+    assert [s["id"] for s in merged["entries"][0]["senses"]] == [
+        "test-dog-n-2", "test-dog-n-1", "test-dog-n-3"
+    ]
+    with pytest.raises(ValueError):
+        shard.write_shards(lexicon, destination, "lexfile", "1.0")
+
+
+def test_sense_order_round_trip_without_indexes(wndb_lexicon, tmp_path):
+    from scripts import wndb2lmf
+
+    lexicon = copy.deepcopy(wndb_lexicon)
+    wndb2lmf._prune_unnecessary_indexes(lexicon, "none")  # sets n=0
+    # split test-en-thing-n so that its first sense is in the second shard
+    for synset in lexicon["synsets"]:
+        if synset["id"] == "test-en-00002000-n":
+            synset["lexfile"] = "noun.object"  # after noun.Tops
+    entry = next(e for e in lexicon["entries"] if e["id"] == "test-en-thing-n")
+    assert [s["n"] for s in entry["senses"]] == [0, 0]
+    destination = tmp_path / "test-en.xml"
+    shard.write_shards(lexicon, destination, "lexfile", "1.4")
+
+    merged = shard.load_shards(shard.manifest_path(destination), processes=1)
+    assert {
+        e["id"]: [s["id"] for s in e["senses"]] for e in merged["entries"]
+    } == {
+        e["id"]: [s["id"] for s in e["senses"]] for e in lexicon["entries"]
+    }
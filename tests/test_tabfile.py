@@ -0,0 +1,64 @@
+import pytest
+
+from scripts import tabfile
+from scripts.util import load_tsv
+
+
+def test_read_header(datadir):
+    header = tabfile.read_header(datadir / "test.tab")
+    assert header.split("\t") == [
+        "# Test Wordnet", "tst", "http://www.globalwordnet.org/test/", "CC BY 4.0"
+    ]
+
+
+def test_lines(datadir):
+    path = datadir / "test.tab"
+    lines = list(tabfile.lines(path))
+    assert lines[0] == (2, "00001234-n\ttst:lemma\tfoo")
+    assert lines[3] == (5, "00002345-n\ttst:lemma\tfoo")
+
+    content = path.read_bytes()
+    start = content.index(b"00002345-n")
+    end = content.index(b"00003456-s")
+    assert list(tabfile.lines(path, start, end, lineno=5)) == [
+        (5, "00002345-n\ttst:lemma\tfoo"),
+        (6, "00002345-n\ttst:lemma\tbaz"),
+        (7, "00002345-n\ttst:exe\t1\tI have a baz"),
+        (8, "00002345-n\ttst:exe\t0\tI have a foo"),
+        (9, ""),
+    ]
+
+
+def test_lines_empty(tmp_path):
+    path = tmp_path / "empty.tab"
+    path.write_bytes(b"")
+    assert tabfile.read_header(path) == ""
+    assert [line for _, line in tabfile.lines(path)] == [""]
+
+
+def test_iter_rows(datadir):
+    rows = list(tabfile.iter_rows(datadir / "test.tab"))
+    assert rows[0] == ("00001234-n", "tst:lemma", "foo", -1)
+    assert rows[2] == ("00001234-n", "tst:def", "a bar that foos", 0)
+    assert rows[0].is_lemma()
+    assert not rows[2].is_lemma()
+    lemmas = list(tabfile.iter_rows(datadir / "test.tab", lemmas_only=True))
+    assert lemmas == [row for row in rows if row.is_lemma()]
+
+
+def test_iter_rows_invalid(tmp_path):
+    path = tmp_path / "invalid.tab"
+    path.write_text("# header\n00001234-n\ttst:lemma\tfoo\n00001234-n\ttst:count\t2\n")
+    with pytest.raises(ValueError, match=":3: unexpected row type"):
+        list(tabfile.iter_rows(path))
+    assert len(list(tabfile.iter_rows(path, lemmas_only=True))) == 1
+    path.write_text("# header\n00001234-n\ttst:lemma\tfoo\tbar\n")
+    with pytest.raises(ValueError, match="unexpected number of columns"):
+        list(tabfile.iter_rows(path))
+
+
+def test_load_tsv(datadir):
+    header, rows = load_tsv(datadir / "test.tab")
+    assert header.startswith("# Test Wordnet\t")
+    assert len(rows) == 9
+    assert rows == list(tabfile.iter_rows(datadir / "test.tab"))
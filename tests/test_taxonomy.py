@@ -0,0 +1,86 @@
+from scripts import taxonomy
+
+
+def ssid(offset_pos):
+    return f"test-en-{offset_pos}"
+
+
+def test_hypernym_graph_cycles(wndb_lexicon):
+    graph = taxonomy.HypernymGraph(wndb_lexicon)
+    restrain = graph.ids.index(ssid("00100000-v"))
+    inhibit = graph.ids.index(ssid("00100100-v"))
+    # one edge of the restrain/inhibit loop is ignored
+    assert (inhibit in graph.parents[restrain]) != (restrain in graph.parents[inhibit])
+    position = {i: n for n, i in enumerate(graph.order)}
+    for i, parents in enumerate(graph.parents):
+        assert all(position[p] < position[i] for p in parents)
+
+
+def test_hypernym_index(wndb_lexicon, tmp_path):
+    taxonomy.write_closure(wndb_lexicon, tmp_path)
+    index = taxonomy.HypernymIndex(tmp_path / "test-en.hypernyms.npz")
+
+    food = ssid("00005000-n")
+    assert index.ancestors(food) == [
+        ssid("00001740-n"),
+        ssid("00002000-n"),
+        ssid("00003000-n"),
+        ssid("00004000-n"),
+    ]
+    assert index.ancestors(ssid("00001740-n")) == []
+    # instance hypernyms are included
+    assert index.ancestors(ssid("00007000-n"))[-1] == ssid("00003000-n")
+
+    assert sorted(index.descendants(ssid("00002000-n"))) == [
+        ssid("00003000-n"),
+        ssid("00004000-n"),
+        ssid("00005000-n"),
+        ssid("00007000-n"),
+    ]
+    # multiple inheritance: food is under both object and substance
+    assert index.descendants(ssid("00004000-n")) == [food]
+    assert index.is_a(food, ssid("00004000-n"))
+    assert index.is_a(food, ssid("00003000-n"))
+    assert index.is_a(food, ssid("00001740-n"))
+    assert not index.is_a(food, food)
+    assert not index.is_a(food, ssid("00006000-n"))
+    assert not index.is_a(ssid("00001740-n"), food)
+    assert not index.is_a(ssid("00200000-a"), ssid("00001740-n"))
+
+    for synset_id in index.ids:
+        for ancestor in index.ancestors(synset_id):
+            assert index.is_a(synset_id, ancestor)
+            assert synset_id in index.descendants(ancestor)
+
+
+def test_similarity_index(wndb_lexicon, tmp_path):
+    taxonomy.write_similarity(wndb_lexicon, tmp_path)
+    index = taxonomy.SimilarityIndex(tmp_path / "test-en.similarity.npz")
+
+    entity, obj, substance, food = (
+        ssid("00001740-n"), ssid("00003000-n"), ssid("00004000-n"), ssid("00005000-n")
+    )
+    paris, abstraction = ssid("00007000-n"), ssid("00006000-n")
+    assert index.min_depth(entity) == index.max_depth(entity) == 0
+    assert index.min_depth(food) == index.max_depth(food) == 3
+    assert index.max_depth(paris) == 3
+
+    # tree-only pairs
+    assert index.lowest_common_hypernym(obj, substance) == ssid("00002000-n")
+    assert index.lowest_common_hypernym(paris, abstraction) == entity
+    assert index.lowest_common_hypernym(obj, paris) == obj
+    assert index.shortest_path_distance(paris, abstraction) == 4
+    # pairs below multiple inheritance
+    assert index.lowest_common_hypernym(food, substance) == substance
+    assert index.shortest_path_distance(food, substance) == 1
+    assert index.shortest_path_distance(food, paris) == 2
+    assert index.shortest_path_distance(food, abstraction) == 4
+    # no common hypernym
+    assert index.lowest_common_hypernym(food, ssid("00100200-v")) is None
+    assert index.path_similarity(ssid("00200000-a"), ssid("00200100-a")) is None
+
+    assert index.path_similarity(food, food) == 1.0
+    assert index.path_similarity(food, substance) == 0.5
+    assert index.wup_similarity(obj, substance) == 2 * 2 / (1 + 1 + 2 * 2)
+    assert index.lch_similarity(food, substance) > index.lch_similarity(food, paris)
+    assert index.lch_similarity(food, ssid("00100200-v")) is None
@@ -104,3 +104,95 @@ def test_load_gap(datadir):
     assert "GAP!" not in n_00001234.members
     assert "GAP!" not in n_00002345.members
     assert "PSEUDOGAP!" not in s_00003456.members
+
+
+def test_project_relations(datadir):
+    data = tsv2lmf.load(datadir / "test.tab", "omw-tst")
+    relations = {
+        "00001234-n": [("hypernym", "00002345-n"), ("hypernym", "00009999-n")],
+        "00002345-n": [("hyponym", "00001234-n"), ("hyponym", "00001234-n")],
+        "00003456-a": [("similar", "00002345-n")],
+    }
+    tsv2lmf.project_relations(data, relations)
+    # relations to synsets outside of the lexicon are dropped
+    assert data.synsets["00001234-n"].relations == [("hypernym", "00002345-n")]
+    # redundant relations are suppressed
+    assert data.synsets["00002345-n"].relations == [("hyponym", "00001234-n")]
+    # satellites are joined on their normalized offset-pos
+    assert data.synsets["00003456-s"].relations == [("similar", "00002345-n")]
+
+
+def test_load_synset_relations(datadir):
+    relations = tsv2lmf.load_synset_relations(datadir / "wndb")
+    assert relations["00005000-n"] == [
+        ("hypernym", "00003000-n"),
+        ("hypernym", "00004000-n"),
+    ]
+    # satellites are normalized to -a and lexical relations are ignored
+    assert relations["00200000-a"] == [("similar", "00200200-a")]
+    assert "00200100-a" not in relations
+
+
+def test_load_subset(datadir):
+    data = tsv2lmf.load(
+        datadir / "test.tab", "omw-tst", subset={"00001234-n", "00003456-s"}
+    )
+    assert set(data.synsets) == {"00001234-n", "00003456-s"}
+    assert set(data.entries) == {"omw-tst-foo-n", "omw-tst-bar-n", "omw-tst-fooey-a"}
+    assert len(data.entries["omw-tst-foo-n"].senses) == 1
+
+
+def _write_large_tab(path):
+    rows = ["# Test Wordnet\ttst\thttp://example.com/\tCC BY 4.0"]
+    for i in range(60):
+        pwn_id = f"{i:08}-n"
+        rows.append(f"{pwn_id}\tlemma\tfoo{i % 7}")
+        rows.append(f"{pwn_id}\tcount\t{i}")
+        rows.append(f"{pwn_id}\tlemma\tbar")
+        rows.append(f"{pwn_id}\tpron\tbar{i}")
+        rows.append(f"{pwn_id}\twordform\tbars{i}")
+        rows.append("")
+        rows.append(f"{pwn_id}\tdef\t0\ta definition of {i}")
+        rows.append(f"{pwn_id}\texe\t0\tan example of {i}")
+    # a duplicate sense and a synset continued after other synsets
+    rows.append("00000003-n\tlemma\tfoo3")
+    rows.append("00000003-n\tdef\t1\tanother definition")
+    path.write_text("\n".join(rows) + "\n")
+
+
+def test_chunk_ranges(tmp_path, monkeypatch):
+    monkeypatch.setattr(tsv2lmf, "MIN_CHUNK_SIZE", 256)
+    path = tmp_path / "large.tab"
+    _write_large_tab(path)
+    content = path.read_bytes()
+    lines = content.splitlines(keepends=True)
+    ranges = tsv2lmf._chunk_ranges(path, 4)
+    assert len(ranges) == 4
+    assert ranges[0][0] == len(lines[0])
+    assert ranges[-1][1] == len(content)
+    for (_, end, _), (start, _, _) in zip(ranges, ranges[1:]):
+        assert end == start
+    for start, _, lineno in ranges:
+        assert content[start:].startswith(lines[lineno - 1])
+        previous = content[:start].rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        assert previous.split(b"\t")[0] != lines[lineno - 1].split(b"\t")[0]
+    # too small to split
+    assert len(tsv2lmf._chunk_ranges(path, 1000)) <= len(content) // 256
+
+
+def test_load_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(tsv2lmf, "MIN_CHUNK_SIZE", 256)
+    path = tmp_path / "large.tab"
+    _write_large_tab(path)
+    expected = tsv2lmf.load(path, "omw-tst")
+    data = tsv2lmf.load_parallel(path, "omw-tst", processes=3)
+    assert list(data.synsets) == list(expected.synsets)
+    assert list(data.entries) == list(expected.entries)
+    for pwn_id, sd in expected.synsets.items():
+        assert data.synsets[pwn_id] == sd
+    for eid, ed in expected.entries.items():
+        assert list(data.entries[eid].senses) == list(ed.senses)
+        assert data.entries[eid] == ed
+    assert data.sense_counts == expected.sense_counts
+    assert data.sense_counts["omw-tst-foo3-00000003-n"] == 2
+    assert data.synsets["00000003-n"].definitions[-1] == (1, "another definition")
@@ -0,0 +1,99 @@
+import argparse
+import importlib
+
+tsv_duplicates = importlib.import_module("scripts.tsv-duplicates")
+
+HEADER = "# Test\ttst\thttp://example.com/\tCC BY 4.0\n"
+
+
+def make_args(**kwargs):
+    options = dict(
+        TSV=[],
+        verbose=True,
+        check=True,
+        ignore_case=True,
+        underscore=True,
+        diacritics=True,
+        quotes=True,
+        polysemy_threshold=2,
+        ignore_lemma_type=False,
+        near=None,
+        near_min_score=0.9,
+        processes=1,
+    )
+    options.update(kwargs)
+    return argparse.Namespace(**options)
+
+
+def test_normalizer():
+    normalize = tsv_duplicates.make_normalizer(make_args())
+    assert normalize('"Élan_vital"') == "elan vital"
+    assert normalize("ﬁancé") == "fiance"  # NFKD
+    assert normalize("خَزَّنَ") == "خزن"
+    assert normalize.cache_info().misses == 3
+
+
+def test_audit_file(tmp_path):
+    path = tmp_path / "wn-data-tst.tab"
+    path.write_text(
+        HEADER
+        + "00001234-n\ttst:lemma\tfoo\n"
+        + "00001234-n\ttst:lemma:root\tfoo\n"
+        + "00001234-n\ttst:lemma\tfoo\n"
+        + "00001234-n\ttst:lemma\tFóo\n"
+        + "00001234-n\ttst:def\t0\ta foo\n"
+        + "00002345-n\ttst:lemma\tfoo\n"
+        + "00002345-n\ttst:lemma\tbar\n"
+    )
+    report = tsv_duplicates.audit_file(path, make_args())
+    assert (report.synsets, report.lemmas, report.polysemous) == (1, 2, 1)
+    assert report.duplicate_details == [
+        "\t00001234-n\texact\tfoo; foo",
+        "\t00001234-n\tiudq\tfoo; Fóo",
+    ]
+    assert report.polysemy_details == ["\tfoo\tpolysem\t00001234-n; 00002345-n"]
+
+    report = tsv_duplicates.audit_file(path, make_args(ignore_lemma_type=True))
+    assert report.lemmas == 3
+
+
+def test_audit_file_near(tmp_path):
+    path = tmp_path / "wn-data-tst.tab"
+    path.write_text(
+        HEADER
+        + "00001234-n\ttst:lemma\treceive\n"
+        + "00001234-n\ttst:lemma\trecieve\n"
+        + "00001234-n\ttst:lemma\tget\n"
+        + "00002345-n\ttst:lemma\temail\n"
+        + "00003456-n\ttst:lemma\te-mail\n"
+    )
+    report = tsv_duplicates.audit_file(path, make_args(near="synset"))
+    assert report.near == 1
+    assert report.near_details == ["\t00001234-n\tnear:0.97\treceive; recieve"]
+    assert report.lemmas == 0
+
+    report = tsv_duplicates.audit_file(path, make_args(near="lexicon"))
+    assert report.near_details == [
+        "\t*\tnear:0.97\treceive; recieve",
+        "\t*\tnear:1.00\temail; e-mail",
+    ]
+
+
+def test_main(tmp_path, capsys):
+    (tmp_path / "wn-data-tst.tab").write_text(HEADER + "00001234-n\ttst:lemma\tfoo\n")
+    (tmp_path / "wn-data-dup.tab").write_text(
+        HEADER + "00001234-n\ttst:lemma\tfoo\n00001234-n\ttst:lemma\t'foo'\n"
+    )
+    args = make_args(TSV=[tmp_path], verbose=False, polysemy_threshold=None)
+    assert tsv_duplicates.main(args) == 1
+    output = capsys.readouterr().out.splitlines()
+    assert output[0].endswith("wn-data-dup.tab")
+    assert output[-3:] == [
+        "Total for 2 files",
+        "  Synsets with redundant lemmas: 1",
+        "  Total count of redundant lemmas: 1",
+    ]
+    args.processes = 2
+    args.check = False
+    assert tsv_duplicates.main(args) == 0
+    assert capsys.readouterr().out.splitlines() == output
@@ -1,4 +1,4 @@
-from scripts.util import escape_lemma
+from scripts.util import edit_distance, escape_lemma, fold_diacritics
 
 def test_escape_lemma():
     assert escape_lemma("abc") == "abc"
@@ -9,3 +9,22 @@ def test_escape_lemma():
     assert escape_lemma("a-b-c") == "a--b--c"
     assert escape_lemma("a´b´c") == "a-acute-b-acute-c"
     assert escape_lemma("a_b_c") == "a-lowbar-b-lowbar-c"
+
+
+def test_fold_diacritics():
+    assert fold_diacritics("protégé") == "protege"
+    assert fold_diacritics("Ångström") == "Angstrom"
+    assert fold_diacritics("abc") == "abc"
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("kitten", "sitting", 2) == 3
+    assert edit_distance("abc", "abc", 0) == 0
+    assert edit_distance("", "abc", 3) == 3
+    assert edit_distance("abc", "", 1) == 2
+    assert edit_distance("flaw", "lawn", 2) == 2
+    assert edit_distance("recieve", "receive", 2) == 2
+    assert edit_distance("recieve", "receive", 1, transpositions=True) == 1
+    assert edit_distance("ca", "abc", 3, transpositions=True) == 3
+    assert edit_distance("abcdef", "abxdey", 1) == 2
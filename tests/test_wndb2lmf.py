@@ -0,0 +1,48 @@
+from wn.lmf import Lexicon
+from wn.util import ProgressHandler
+
+from scripts import wndb2lmf
+
+
+def test_filter_data(datadir):
+    source = datadir / "wndb"
+    ilimap = {
+        "00001740-n": "i1",
+        "00002000-n": "i2",
+        "00005000-n": "i5",
+        "00200000-a": "i20",
+        "00200100-a": "i21",
+    }
+    data = wndb2lmf._filter_data(
+        wndb2lmf._load_data(source), ilimap, {"i1", "i5", "i20"}
+    )
+    assert {pos: sorted(subdata) for pos, subdata in data.items()} == {
+        "n": [1740, 5000], "v": [], "a": [200000], "r": [],
+    }
+
+    lexicon = Lexicon(id="test-en", entries=[], synsets=[], frames=[])
+    wndb2lmf._build_lexicon(
+        lexicon,
+        data,
+        wndb2lmf._load_sense_index(source),
+        wndb2lmf._load_exceptions(source),
+        ilimap,
+        ProgressHandler(),
+    )
+    synset_ids = {ss["id"] for ss in lexicon["synsets"]}
+    sense_ids = {s["id"] for e in lexicon["entries"] for s in e["senses"]}
+    assert synset_ids == {
+        "test-en-00001740-n", "test-en-00005000-n", "test-en-00200000-a"
+    }
+    assert [e["lemma"]["writtenForm"] for e in lexicon["entries"]] == [
+        "entity", "food", "good", "nutrient"
+    ]
+    # relations to filtered-out synsets and senses are dropped
+    assert all(
+        rel["target"] in synset_ids
+        for ss in lexicon["synsets"] for rel in ss["relations"]
+    )
+    assert all(
+        rel["target"] in sense_ids
+        for e in lexicon["entries"] for s in e["senses"] for rel in s["relations"]
+    )